@@ -1,78 +1,269 @@
 import os
-import pkgutil
-import importlib
+import signal
 import sys
-from app.commands import CommandHandler, Command
-from dotenv import load_dotenv
+from app.commands import CommandHandler
+from app.commands.dispatch import DispatchTable, InvalidOperand, UnknownCommand
+from app.commands.lazy import LazyCommand
+from app.commands.metrics import metrics
+from app.commands.profiler import profiler
+from app.manifest import load_registry
+from app.numeric import get_mode
+from app.plugins import ENTRY_POINTS
+from app.reloader import PluginWatcher, reload_commands
+from app import bulk, pipeline, server
+from app.calculations import calculations
+from app.logqueue import enable_queue_logging
+from app.settings import Settings, load_settings
+from app.startup import StartupProfile, freeze, load_image
 import logging
 import logging.config
 
+PLUGINS_PACKAGE = 'app.plugins'
+PLUGINS_PATH = PLUGINS_PACKAGE.replace('.', '/')
+
+
 class App:
-    def __init__(self):
+    def __init__(self, profile: StartupProfile = None):
+        self.profile = profile or StartupProfile()
         os.makedirs('logs', exist_ok=True)
+        self.queue_logging = None
+        image_path = os.environ.get('STARTUP_IMAGE')
+        self.image = load_image(image_path, PLUGINS_PATH) if image_path else None
+        self.profile.mark('startup image')
+        self.settings = self.image.settings if self.image is not None else self.load_environment_variables()
+        self.profile.mark('settings')
         self.configure_logging()
-        load_dotenv()
-        self.settings = self.load_environment_variables()
-        self.settings.setdefault('ENVIRONMENT', 'TESTING')
+        logging.info("Environment variables loaded.")
+        self.profile.mark('logging')
         self.command_handler = CommandHandler()
+        self._async_handler = None
+        self.dispatch_table = None
+        self.plugin_watcher = None
+        self.apply_settings(self.settings)
+        self.profile.mark('apply settings')
 
     def configure_logging(self):
+        self.shutdown_logging()
         logging_conf_path = 'logging.conf'
-        if os.path.exists(logging_conf_path):
+        if self.image is not None and self.image.logging_config is not None:
+            logging.config.dictConfig(self.image.logging_config)
+        elif self.image is None and os.path.exists(logging_conf_path):
             logging.config.fileConfig(logging_conf_path, disable_existing_loggers=False)
         else:
             logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        if self.settings.log_level:
+            logging.getLogger().setLevel(self.settings.log_level)
+        if self.settings.log_queue:
+            self.queue_logging = enable_queue_logging(self.settings.log_queue_size, self.settings.log_queue_policy)
         logging.info("Logging configured.")
 
-    def load_environment_variables(self):
-        settings = {key: value for key, value in os.environ.items()}
-        logging.info("Environment variables loaded.")
-        return settings
+    def shutdown_logging(self):
+        """Drain and flush queued log records; a no-op unless queue logging is on."""
+        if self.queue_logging is not None:
+            self.queue_logging.stop()
+            self.queue_logging = None
+
+    def load_environment_variables(self, refresh: bool = False) -> Settings:
+        """Return the typed Settings; .env is only re-read when ``refresh`` is set."""
+        return load_settings(refresh=refresh)
+
+    def apply_settings(self, settings: Settings, previous: Settings = None):
+        """Configure history, caching, metrics and the worker pool; with ``previous``, only what changed."""
+        def changed(*fields):
+            return previous is None or any(getattr(settings, field) != getattr(previous, field) for field in fields)
+        if changed('history_capacity', 'history_policy'):
+            calculations.configure(settings.history_capacity, settings.history_policy)
+        if changed('result_cache_size'):
+            if settings.result_cache_size:
+                self.command_handler.enable_cache(settings.result_cache_size)
+            else:
+                self.command_handler.disable_cache()
+        if changed('metrics_enabled', 'metrics_slow_ms'):
+            if settings.metrics_enabled:
+                metrics.enable(settings.metrics_slow_ms / 1000)
+            elif previous is not None:
+                metrics.disable()
+        if changed('profile', 'profile_commands', 'profile_interval_ms'):
+            if settings.profile:
+                profiler.enable(settings.profile, settings.profile_commands, settings.profile_interval_ms / 1000)
+            elif previous is not None:
+                profiler.disable()
+        if changed('pool_max_workers', 'pool_kind', 'pool_chunksize'):
+            # Takes effect when the pool is next used.
+            self.command_handler.shutdown_pool()
+            self.command_handler.pool_options = {'max_workers': settings.pool_max_workers,
+                                                 'kind': settings.pool_kind, 'chunksize': settings.pool_chunksize}
+        if previous is not None and changed('log_level', 'log_queue', 'log_queue_size', 'log_queue_policy'):
+            self.configure_logging()
+        if previous is not None and changed('numeric_mode', 'numeric_modes'):
+            self.configure_numeric_modes()
+
+    def reload_settings(self) -> Settings:
+        """Re-read .env (or the settings snapshot) and the environment, and apply what changed."""
+        # A reload always goes back to the sources, so a frozen startup image no longer applies.
+        self.image = None
+        previous, self.settings = self.settings, self.load_environment_variables(refresh=True)
+        self.apply_settings(self.settings, previous)
+        logging.info("Settings reloaded.")
+        return self.settings
+
+    def install_reload_signal(self):
+        """Reload settings on SIGHUP, where the platform has it."""
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.reload_settings())
+
+    @property
+    def async_handler(self):
+        """An asyncio front end (AsyncCommandHandler) over this App's CommandHandler, shared by every caller."""
+        if self._async_handler is None:
+            # asyncio is a large import that only the async front end needs.
+            from app.commands.aio import AsyncCommandHandler  # pylint: disable=import-outside-toplevel
+            self._async_handler = AsyncCommandHandler(self.command_handler, self.settings.async_max_concurrency)
+        return self._async_handler
 
     def get_environment_variable(self, env_var: str = 'ENVIRONMENT'):
         return self.settings.get(env_var, None)
 
     def load_plugins(self):
-        plugins_package = 'app.plugins'
-        plugins_path = plugins_package.replace('.', '/')
-        if not os.path.exists(plugins_path):
-            logging.warning(f"Plugins directory '{plugins_path}' not found.")
+        if not os.path.exists(PLUGINS_PATH):
+            logging.warning(f"Plugins directory '{PLUGINS_PATH}' not found.")
             return
-        for _, plugin_name, is_pkg in pkgutil.iter_modules([plugins_path]):
-            if is_pkg:
-                try:
-                    plugin_module = importlib.import_module(f'{plugins_package}.{plugin_name}')
-                    self.register_plugin_commands(plugin_module, plugin_name)
-                except ImportError as e:
-                    logging.error(f"Error importing plugin {plugin_name}: {e}")
-
-    def register_plugin_commands(self, plugin_module, plugin_name):
-        for item_name in dir(plugin_module):
-            item = getattr(plugin_module, item_name)
-            if isinstance(item, type) and issubclass(item, Command) and item is not Command:
-                # Command names are now explicitly set to the plugin's folder name
-                self.command_handler.register_command(plugin_name, item())
-                logging.info(f"Command '{plugin_name}' from plugin '{plugin_name}' registered.")
+        # Plugin modules are only imported the first time their command runs.
+        registry = self.image.registry if self.image is not None else self.load_registry()
+        self.command_handler.update_commands({name: LazyCommand(target) for name, target in registry.items()})
+        for plugin_name, target in registry.items():
+            logging.info(f"Command '{plugin_name}' registered from {target}.")
+        if 'menu' in registry:
+            self.command_handler.commands['menu'].configure(handler=self.command_handler)
+        self.configure_numeric_modes()
+        self.profile.mark('load plugins')
+
+    def load_registry(self) -> dict:
+        """Command name to ``module:Class`` for every declared and discovered command."""
+        return load_registry(PLUGINS_PATH, PLUGINS_PACKAGE, ENTRY_POINTS, self.settings.plugin_manifest)
+
+    def freeze(self, path: str):
+        """Write a startup image of this App's settings, logging configuration and command registry."""
+        freeze(path, self.settings, self.load_registry(), PLUGINS_PATH)
+        logging.info(f"Startup image written to {path}.")
+
+    def configure_numeric_modes(self, command_names=None):
+        """Apply NUMERIC_MODE / NUMERIC_MODE_<COMMAND> settings to the registered commands."""
+        modes = dict(self.settings.numeric_modes)
+        commands = self.command_handler.commands
+        for command_name in commands if command_names is None else command_names:
+            spec = modes.get(command_name, self.settings.numeric_mode)
+            commands[command_name].configure(numeric=get_mode(spec) if spec else None)
+        if self.command_handler.cache is not None:
+            # Cached results were computed in the previous modes.
+            self.command_handler.cache.clear()
+
+    def reload_plugins(self, changed, removed=()):
+        """Re-import changed plugins and swap them, and any removals, into the command table."""
+        commands = reload_commands(PLUGINS_PATH, PLUGINS_PACKAGE, changed, ENTRY_POINTS, self.settings.plugin_manifest)
+        # A removed package that shared a declared command's name leaves that command in place.
+        removed = [plugin_name for plugin_name in removed if plugin_name not in ENTRY_POINTS]
+        self.command_handler.update_commands(commands, removed)
+        self.configure_numeric_modes(commands)
+        if self.dispatch_table is not None:
+            self.dispatch_table = DispatchTable(self.command_handler)
+        for plugin_name in commands:
+            logging.info(f"Command '{plugin_name}' reloaded.")
+        for plugin_name in removed:
+            logging.info(f"Command '{plugin_name}' removed.")
+
+    def watch_plugins(self, interval: float = None) -> PluginWatcher:
+        """Start polling the plugin directory and hot-reload plugins as they change."""
+        if self.plugin_watcher is None:
+            self.plugin_watcher = PluginWatcher(PLUGINS_PATH, self.reload_plugins,
+                                                interval or self.settings.plugin_reload_interval,
+                                                entry_points=ENTRY_POINTS).start()
+        return self.plugin_watcher
+
+    def stop_watching_plugins(self):
+        if self.plugin_watcher is not None:
+            self.plugin_watcher.stop()
+            self.plugin_watcher = None
+
+    def run_line(self, cmd_input: str):
+        """Execute one REPL line, printing its result or error; never raises for a bad line."""
+        try:
+            result = self.dispatch_table.execute_line(cmd_input)
+        except UnknownCommand as e:
+            logging.error(f"Unknown command: {cmd_input}")
+            print(e)
+        except InvalidOperand as e:
+            print(e)
+        except (ValueError, ArithmeticError, TypeError) as e:
+            logging.error(f"Command failed: {cmd_input}: {e}")
+            print(f"Error: {e}")
+        else:
+            if result is not None:
+                print(f"Result: {result}")
+
+    def run_batch(self, source: str, output=None) -> dict:
+        """Run a command file (or '-' for stdin) non-interactively; bad lines are reported, not fatal."""
+        self.load_plugins()
+        try:
+            return pipeline.run(source, self.command_handler, output)
+        finally:
+            self.command_handler.shutdown_pool()
+            self.shutdown_logging()
+
+    def run_bulk(self, source: str, output: str, workers: int = None) -> dict:
+        """Calculate a CSV file of operation,a,b rows into ``output``; workers default to the pool settings."""
+        self.load_plugins()
+        if workers is None:
+            workers = self.settings.pool_max_workers or os.cpu_count() or 1
+        try:
+            return bulk.run(source, self.command_handler, output, workers, self.settings.pool_kind)
+        finally:
+            self.shutdown_logging()
+
+    def serve(self, address):
+        """Serve commands over a TCP ('host:port') or Unix socket address until interrupted."""
+        self.load_plugins()
+        calculation_server = server.create_server(self.command_handler, server.parse_address(address))
+        self.install_reload_signal()
+        if self.settings.plugin_reload:
+            self.watch_plugins()
+        try:
+            calculation_server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Server interrupted and exiting gracefully.")
+        finally:
+            self.stop_watching_plugins()
+            calculation_server.server_close()
+            self.command_handler.shutdown_pool()
+            logging.info("Server shutdown.")
+            self.shutdown_logging()
 
     def start(self):
         self.load_plugins()
-        logging.info("Application started. Type 'exit' to exit.")
+        self.dispatch_table = DispatchTable(self.command_handler)
+        self.install_reload_signal()
+        if self.settings.plugin_reload:
+            self.watch_plugins()
+        logging.info("Application started. Type 'exit' to exit, 'reload' to reload settings.")
         try:
             while True:
                 cmd_input = input(">>> ").strip()
                 if cmd_input.lower() == 'exit':
                     logging.info("Application exit.")
                     sys.exit(0)  # Use sys.exit(0) for a clean exit, indicating success.
-                try:
-                    self.command_handler.execute_command(cmd_input)
-                except KeyError:  # Assuming execute_command raises KeyError for unknown commands
-                    logging.error(f"Unknown command: {cmd_input}")
-                    sys.exit(1)  # Use a non-zero exit code to indicate failure or incorrect command.
+                if cmd_input.lower() == 'reload':
+                    self.reload_settings()
+                    print("Settings reloaded.")
+                elif cmd_input:
+                    self.run_line(cmd_input)
         except KeyboardInterrupt:
             logging.info("Application interrupted and exiting gracefully.")
             sys.exit(0)  # Assuming a KeyboardInterrupt should also result in a clean exit.
         finally:
+            self.stop_watching_plugins()
+            self.command_handler.shutdown_pool()
             logging.info("Application shutdown.")
+            self.shutdown_logging()
 
 
 if __name__ == "__main__":
@@ -89,12 +280,30 @@ it makes use of the Decimal class and saves each result for probable future use.
 
 """
 
-from calculator.operations import add, subtract, divide, multiply
-from calculator.calculation import Calculation
-from calculator.calculations import calculations
+from app.cache import ResultCache, cache_key
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+from app.plugins.multiply_command import MultiplyCommand
+from app.plugins.subtract_command import SubtractCommand
 from decimal import Decimal
 from typing import Callable
 
+def add(a: Decimal, b: Decimal) -> Decimal:
+    """Return a + b, using the add plugin's arithmetic."""
+    return AddCommand().execute(a, b)
+
+def subtract(a: Decimal, b: Decimal) -> Decimal:
+    """Return a - b, using the subtract plugin's arithmetic."""
+    return SubtractCommand().execute(a, b)
+
+def multiply(a: Decimal, b: Decimal) -> Decimal:
+    """Return a * b, using the multiply plugin's arithmetic."""
+    return MultiplyCommand().execute(a, b)
+
+def divide(a: Decimal, b: Decimal) -> Decimal:
+    """Return a / b, using the divide plugin's arithmetic; raises ValueError when b is zero."""
+    return DivideCommand().execute(a, b)
+
 class Calculator:
     """
     A class that encapsulates basic arithmetic operations.
@@ -114,8 +323,32 @@ class Calculator:
         
         divide(a: Decimal, b: Decimal) -> Decimal:
             Returns the quotient of two Decimal numbers.
+
+        enable_cache(maxsize: int) -> ResultCache:
+            Memoizes perform() results in a size-bounded LRU cache (off by default).
     """
 
+    cache = None
+
+    @staticmethod
+    def enable_cache(maxsize: int = 4096) -> ResultCache:
+        """
+        Cache the results of perform() keyed on operation and operands.
+
+        Args:
+            maxsize (int): The maximum number of cached results.
+
+        Returns:
+            ResultCache: The cache, whose stats() report hits, misses and evictions.
+        """
+        Calculator.cache = ResultCache(maxsize)
+        return Calculator.cache
+
+    @staticmethod
+    def disable_cache():
+        """Stop caching perform() results."""
+        Calculator.cache = None
+
     @staticmethod
     def perform(a: Decimal, b: Decimal, operation: Callable[[Decimal, Decimal], Decimal]) -> Decimal:
         """
@@ -129,11 +362,13 @@ class Calculator:
         Returns:
             Decimal: The result of the operation.
         """
-        # Create a Calculation object and log it
-        calculation = Calculation.create(a, b, operation)
-        calculations.add_calculation(calculation)
-        # Execute the operation and return the result
-        return calculation.operate()
+        # Execute the operation (or reuse a cached result) and keep a compact record of it in the bounded history
+        if Calculator.cache is None:
+            result = operation(a, b)
+        else:
+            result = Calculator.cache.lookup(cache_key(operation, (a, b)), lambda: operation(a, b))
+        calculations.record(operation, a, b, result)
+        return result
     
     @staticmethod
     def add(a: Decimal, b: Decimal) -> Decimal:
@@ -190,7 +425,7 @@ class Calculator:
             Decimal: The result of a / b.
         
         Raises:
-            ZeroDivisionError: If b is zero.
+            ValueError: If b is zero.
         """
         return Calculator.perform(a, b, divide)
 
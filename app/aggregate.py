@@ -0,0 +1,161 @@
+"""
+Aggregate Module
+
+Reductions over a whole column of operands in one call: sum, product, mean,
+min, max and (sample) variance. Values may be any iterable, including
+generators, ``array.array`` buffers and NumPy arrays, and are consumed in a
+single pass.
+
+* ``exact=True`` works in Decimal. Sums use streaming pairwise summation
+  (blocks of BLOCK values, combined like a binary counter), so rounding error
+  grows with log(n) rather than n, in O(log n) memory.
+* ``exact=False`` works in float64. Sums use math.fsum, which is correctly
+  rounded; NumPy arrays are reduced with vectorized operations.
+* mean is the accurate sum divided by the count. variance uses Welford's
+  single-pass update; float64 NumPy arrays are folded in blocks with Chan's
+  combination of (count, mean, M2).
+
+An empty column raises ValueError, as does variance of fewer than two values.
+"""
+
+import math
+from decimal import Decimal
+from itertools import islice
+from typing import Iterable, NamedTuple
+
+from app.commands.batch import is_ndarray, numpy, to_decimal
+
+AGGREGATES = ('sum', 'product', 'mean', 'min', 'max', 'variance')
+BLOCK = 128
+ARRAY_BLOCK = 65536
+
+
+class Moments(NamedTuple):
+    """Running (count, mean, sum of squared deviations) for Welford's algorithm."""
+    count: int
+    mean: object
+    m2: object
+
+    def combine(self, other: 'Moments') -> 'Moments':
+        """Merge the moments of two disjoint parts of a column (Chan et al.)."""
+        if not self.count:
+            return other
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return Moments(count, self.mean + delta * other.count / count,
+                       self.m2 + other.m2 + delta * delta * self.count * other.count / count)
+
+
+def _empty(name: str) -> ValueError:
+    return ValueError(f"Cannot compute {name} of no values")
+
+
+def _numpy_floats(values):
+    """Return ``values`` as a float64 NumPy array if it already is a NumPy array, else None."""
+    if is_ndarray(values):
+        return values.astype(numpy().float64, copy=False)
+    return None
+
+
+def _column(values: Iterable, exact: bool):
+    if exact:
+        if is_ndarray(values):
+            values = values.tolist()
+        return map(to_decimal, values)
+    return map(float, values)
+
+
+def pairwise_sum(values: Iterable[Decimal]) -> Decimal:
+    """Sum Decimals in one pass with pairwise (cascade) summation."""
+    iterator = iter(values)
+    stack = []  # (level, partial sum); levels strictly decrease towards the top
+    while True:
+        block = list(islice(iterator, BLOCK))
+        if not block:
+            break
+        partial, level = sum(block, Decimal(0)), 0
+        while stack and stack[-1][0] == level:
+            partial = stack.pop()[1] + partial
+            level += 1
+        stack.append((level, partial))
+    total = Decimal(0)
+    for _, partial in reversed(stack):
+        total = partial + total
+    return total
+
+
+def moments(values: Iterable, exact: bool = True) -> Moments:
+    """Single-pass count, mean and M2 of a column."""
+    array = None if exact else _numpy_floats(values)
+    if array is not None:
+        result = Moments(0, 0.0, 0.0)
+        for start in range(0, len(array), ARRAY_BLOCK):
+            block = array[start:start + ARRAY_BLOCK]
+            mean = float(block.mean())
+            result = result.combine(Moments(len(block), mean, float(((block - mean) ** 2).sum())))
+        return result
+    count, mean, m2 = 0, Decimal(0) if exact else 0.0, Decimal(0) if exact else 0.0
+    for value in _column(values, exact):
+        count += 1
+        delta = value - mean
+        mean += delta / count
+        m2 += delta * (value - mean)
+    return Moments(count, mean, m2)
+
+
+def _counted(values: Iterable, exact: bool):
+    """Return (converted value iterator, function returning how many values it produced)."""
+    column = _column(values, exact)
+    if hasattr(values, '__len__'):
+        return column, lambda: len(values)
+    produced = [0]
+
+    def counting():
+        for value in column:
+            produced[0] += 1
+            yield value
+    return counting(), lambda: produced[0]
+
+
+def aggregate(name: str, values: Iterable, exact: bool = True):
+    """
+    Reduce a column of operands.
+
+    Args:
+        name: One of AGGREGATES.
+        values: The operands; any iterable, buffer or NumPy array.
+        exact: Decimal semantics when True, float64 when False.
+
+    Returns:
+        Tuple of (result, number of values).
+    """
+    if name not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate: {name}")
+    if name == 'variance':
+        result = moments(values, exact)
+        if result.count < 2:
+            raise ValueError("Variance needs at least two values")
+        return result.m2 / (result.count - 1), result.count
+    array = None if exact else _numpy_floats(values)
+    if array is not None:
+        if not len(array):
+            raise _empty(name)
+        reduced = {'sum': lambda: math.fsum(array.tolist()), 'mean': lambda: math.fsum(array.tolist()) / len(array),
+                   'product': lambda: float(numpy().prod(array)),
+                   'min': lambda: float(array.min()), 'max': lambda: float(array.max())}[name]()
+        return reduced, len(array)
+    column, count = _counted(values, exact)
+    if name in ('sum', 'mean'):
+        result = pairwise_sum(column) if exact else math.fsum(column)
+    elif name == 'product':
+        result = math.prod(column)
+    else:
+        result = (min if name == 'min' else max)(column, default=None)
+    if not count():
+        raise _empty(name)
+    if name == 'mean':
+        result = result / count()
+    return result, count()
+
@@ -0,0 +1,381 @@
+"""
+Benchmark Package
+
+Micro-benchmarks for the calculator's hot paths: CommandHandler dispatch,
+per-plugin execute() throughput, App startup, settings and plugin loading, history
+growth, multi-threaded dispatch, profiler overhead, bulk CSV blocks, and the batch and
+pool execution modes.
+
+Every benchmark times individual calls, or small fixed batches of very cheap
+calls, with ``perf_counter_ns`` and reports the distribution in microseconds
+per operation: min, p50, p90, p99, max and mean. Percentiles come from those
+per-call samples, never from averages over many calls, so p99 shows real tail
+latency. Results can be written as JSON and compared against a stored
+baseline on p50 and p99; see ``python -m app.bench --help``.
+"""
+
+import json
+import math
+import statistics
+import time
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+BENCHMARKS: Dict[str, Callable[[bool], dict]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark function taking ``quick`` and returning summarize() output."""
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+def _timer_overhead_ns() -> int:
+    """The cheapest back-to-back perf_counter_ns() pair, subtracted from every sample."""
+    timer = time.perf_counter_ns
+    overhead = None
+    for _ in range(1000):
+        started = timer()
+        elapsed = timer() - started
+        overhead = elapsed if overhead is None else min(overhead, elapsed)
+    return overhead
+
+
+def measure(function: Callable[[], object], number: int = 1000, repeat: int = 20, batch: int = 1) -> List[float]:
+    """Time ``repeat`` rounds of ``number`` calls, one sample per ``batch`` calls; return seconds per call for each sample.
+
+    ``batch`` > 1 is for calls so cheap that the timer itself would dominate a single-call sample.
+    """
+    timer = time.perf_counter_ns
+    overhead = _timer_overhead_ns()
+    samples = []
+    for _ in range(repeat):
+        for _ in range(max(number // batch, 1)):
+            started = timer()
+            for _ in range(batch):
+                function()
+            samples.append(max(timer() - started - overhead, 0) / batch / 1e9)
+    return samples
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def summarize(samples: List[float], ops_per_call: int = 1) -> dict:
+    """Turn per-call seconds into the microseconds-per-operation distribution and throughput."""
+    per_op = sorted(sample / ops_per_call * 1e6 for sample in samples)
+    mean = statistics.fmean(per_op)
+    return {
+        'samples': len(per_op),
+        'mean_us': mean,
+        'min_us': per_op[0],
+        'p50_us': _percentile(per_op, 0.50),
+        'p90_us': _percentile(per_op, 0.90),
+        'p99_us': _percentile(per_op, 0.99),
+        'max_us': per_op[-1],
+        'ops_per_sec': 1e6 / mean if mean > 0 else float('inf'),
+    }
+
+
+def _arithmetic_commands():
+    from app.plugins.add_command import AddCommand  # pylint: disable=import-outside-toplevel
+    from app.plugins.subtract_command import SubtractCommand  # pylint: disable=import-outside-toplevel
+    from app.plugins.multiply_command import MultiplyCommand  # pylint: disable=import-outside-toplevel
+    from app.plugins.divide_command import DivideCommand  # pylint: disable=import-outside-toplevel
+    return {'add': AddCommand(), 'subtract': SubtractCommand(),
+            'multiply': MultiplyCommand(), 'divide': DivideCommand()}
+
+
+def _handler():
+    from app.commands import CommandHandler  # pylint: disable=import-outside-toplevel
+    handler = CommandHandler()
+    for name, command in _arithmetic_commands().items():
+        handler.register_command(name, command)
+    return handler
+
+
+@benchmark('dispatch')
+def bench_dispatch(quick: bool) -> dict:
+    handler = _handler()
+    a, b = Decimal('12.5'), Decimal('3')
+    return summarize(measure(lambda: handler.dispatch('add', a, b), number=200 if quick else 2000, batch=10))
+
+
+@benchmark('repl_line')
+def bench_repl_line(quick: bool) -> dict:
+    """Per-line REPL overhead: the DispatchTable path vs. split + Decimal() + try/except KeyError."""
+    from app.commands.dispatch import DispatchTable  # pylint: disable=import-outside-toplevel
+    handler = _handler()
+    table = DispatchTable(handler)
+    line = 'multiply 12.5 3'
+
+    def naive():
+        name, *tokens = line.split()
+        try:
+            return handler.commands[name].execute(*(Decimal(token) for token in tokens))
+        except KeyError:
+            return None
+    number = 200 if quick else 5000
+    return {'table': summarize(measure(lambda: table.execute_line(line), number=number)),
+            'naive': summarize(measure(naive, number=number))}
+
+
+@benchmark('plugin_execute')
+def bench_plugin_execute(quick: bool) -> dict:
+    a, b = Decimal('12.5'), Decimal('3')
+    results = {}
+    for name, command in _arithmetic_commands().items():
+        results[name] = summarize(measure(lambda command=command: command.execute(a, b), number=200 if quick else 5000))
+    return results
+
+
+@benchmark('startup')
+def bench_startup(quick: bool) -> dict:
+    """Cold start in a fresh interpreter: import app, build App and load plugins."""
+    from app.debug import startup_report  # pylint: disable=import-outside-toplevel
+    reports = [startup_report() for _ in range(2 if quick else 5)]
+    summary = summarize([report['startup_ms'] / 1000 for report in reports])
+    summary.update(modules=reports[-1]['modules'], first_use_modules=reports[-1]['first_use_modules'])
+    return summary
+
+
+@benchmark('load_plugins')
+def bench_load_plugins(quick: bool) -> dict:
+    from app import App  # pylint: disable=import-outside-toplevel
+    app = App()
+    return summarize(measure(app.load_plugins, number=5 if quick else 50, repeat=5))
+
+
+@benchmark('settings')
+def bench_settings(quick: bool) -> dict:
+    """Settings loading: re-reading .env, with .env cached, and from a snapshot file."""
+    import os  # pylint: disable=import-outside-toplevel
+    import tempfile  # pylint: disable=import-outside-toplevel
+    from app.settings import load_settings  # pylint: disable=import-outside-toplevel
+    number = 20 if quick else 200
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = os.path.join(directory, 'settings.json')
+        load_settings().save(snapshot)
+        return {
+            'refresh': summarize(measure(lambda: load_settings(refresh=True), number=number, repeat=5)),
+            'cached': summarize(measure(load_settings, number=number, repeat=5)),
+            'snapshot': summarize(measure(lambda: load_settings(snapshot), number=number, repeat=5)),
+        }
+
+
+@benchmark('plugin_poll')
+def bench_plugin_poll(quick: bool) -> dict:
+    """One hot-reload poll of app/plugins with nothing changed."""
+    from app.reloader import PluginWatcher  # pylint: disable=import-outside-toplevel
+    watcher = PluginWatcher('app/plugins', lambda changed, removed: None)
+    return summarize(measure(watcher.poll, number=20 if quick else 200, repeat=5))
+
+
+@benchmark('history')
+def bench_history(quick: bool) -> dict:
+    """Cost of recording into a history that is already at the given size."""
+    from app.calculations import Calculations  # pylint: disable=import-outside-toplevel
+    results = {}
+    a, b = Decimal('1'), Decimal('2')
+    for size in ((1000,) if quick else (1000, 100000)):
+        history = Calculations(capacity=size)
+        for _ in range(size):
+            history.record('add', a, b, a + b)
+        results[f'size_{size}'] = summarize(measure(lambda history=history: history.record('add', a, b, a + b),
+                                                    number=200 if quick else 2000))
+    return results
+
+
+@benchmark('threads')
+def bench_threads(quick: bool) -> dict:
+    """Aggregate throughput of dispatch plus history recording from 1..8 threads sharing one handler."""
+    import threading  # pylint: disable=import-outside-toplevel
+    from app.calculations import Calculations  # pylint: disable=import-outside-toplevel
+    handler, history = _handler(), Calculations(capacity=100000)
+    a, b = Decimal('1'), Decimal('2')
+    number = 500 if quick else 20000
+
+    def work(barrier):
+        dispatch, record = handler.dispatch, history.record
+        barrier.wait()
+        for _ in range(number):
+            record('add', a, b, dispatch('add', a, b))
+
+    results = {}
+    for count in (1, 2, 4, 8):
+        samples = []
+        for _ in range(2 if quick else 5):
+            barrier = threading.Barrier(count + 1)
+            threads = [threading.Thread(target=work, args=(barrier,)) for _ in range(count)]
+            for thread in threads:
+                thread.start()
+            barrier.wait()
+            started = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            samples.append((time.perf_counter() - started) / number)
+        results[f'threads_{count}'] = summarize(samples, ops_per_call=count)
+    return results
+
+
+@benchmark('aggregate')
+def bench_aggregate(quick: bool) -> dict:
+    """Summing a column: one dispatch per value through 'add' versus one aggregate call."""
+    from app.aggregate import aggregate  # pylint: disable=import-outside-toplevel
+    handler = _handler()
+    size = 1000 if quick else 100000
+    column = [Decimal(index).scaleb(-2) for index in range(size)]
+    floats = [float(value) for value in column]
+
+    def dispatch_loop():
+        total = Decimal(0)
+        for value in column:
+            total = handler.dispatch('add', total, value)
+        return total
+
+    results = {'dispatch_add': summarize(measure(dispatch_loop, number=1, repeat=5), ops_per_call=size)}
+    for name in ('sum', 'mean', 'variance'):
+        results[f'{name}_exact'] = summarize(measure(lambda name=name: aggregate(name, column), number=1, repeat=5),
+                                             ops_per_call=size)
+        results[f'{name}_float'] = summarize(measure(lambda name=name: aggregate(name, floats, exact=False),
+                                                     number=1, repeat=5), ops_per_call=size)
+    return results
+
+
+@benchmark('bulk')
+def bench_bulk(quick: bool) -> dict:
+    """CSV rows: one pipeline line each through the dispatch table versus a grouped bulk block."""
+    import io  # pylint: disable=import-outside-toplevel
+    from app import bulk, pipeline  # pylint: disable=import-outside-toplevel
+    handler = _handler()
+    size = 1000 if quick else 100000
+    operations = ('add', 'subtract', 'multiply', 'divide')
+    rows = [(operations[index % 4], index % 97, index % 13) for index in range(size)]
+    block = ''.join(f"{operation},{a},{b}\n" for operation, a, b in rows).encode()
+    lines = ''.join(f"{operation} {a} {b}\n" for operation, a, b in rows)
+    commands = {name: command for name, command in handler.commands.items() if command.pure}
+
+    def line_at_a_time():
+        pipeline.write_outcomes(pipeline.dispatch(pipeline.parse_lines(pipeline.read_lines(io.StringIO(lines))),
+                                                  handler), io.StringIO())
+
+    return {'pipeline': summarize(measure(line_at_a_time, number=1, repeat=5), ops_per_call=size),
+            'bulk': summarize(measure(lambda: bulk.run_block(block, commands=commands), number=1, repeat=5),
+                              ops_per_call=size)}
+
+
+@benchmark('profiler')
+def bench_profiler(quick: bool) -> dict:
+    """Dispatch-table execution of 'add' with the profiler off, sampling, and tracing deterministically."""
+    from app.commands.dispatch import DispatchTable  # pylint: disable=import-outside-toplevel
+    from app.commands.profiler import profiler  # pylint: disable=import-outside-toplevel
+    table = DispatchTable(_handler())
+    tokens = ['12.5', '3']
+    number = 200 if quick else 5000
+    results = {'off': summarize(measure(lambda: table.execute('add', tokens), number=number))}
+    try:
+        for mode in ('sampling', 'deterministic'):
+            profiler.enable(mode)
+            results[mode] = summarize(measure(lambda: table.execute('add', tokens), number=number))
+            profiler.disable()
+    finally:
+        profiler.disable()
+        profiler.reset()
+    return results
+
+
+@benchmark('batch')
+def bench_batch(quick: bool) -> dict:
+    rows = 1000 if quick else 100000
+    a_values = [Decimal(i) for i in range(1, rows + 1)]
+    b_values = [Decimal(i % 97 + 1) for i in range(rows)]
+    command = _arithmetic_commands()['divide']
+    return {
+        'exact': summarize(measure(lambda: command.execute_batch(a_values, b_values), number=1, repeat=5), rows),
+        'float': summarize(measure(lambda: command.execute_batch(a_values, b_values, exact=False), number=1, repeat=5), rows),
+    }
+
+
+@benchmark('numeric')
+def bench_numeric(quick: bool) -> dict:
+    """Speed vs precision of DivideCommand under each numeric mode.
+
+    max_abs_error is measured against 50-digit Decimal division.
+    """
+    from decimal import localcontext  # pylint: disable=import-outside-toplevel
+    from app.numeric import get_mode  # pylint: disable=import-outside-toplevel
+    pairs = [(Decimal(i) / 7, Decimal(i % 89 + 3) / 3) for i in range(1, 201)]
+    with localcontext() as context:
+        context.prec = 50
+        reference = [a / b for a, b in pairs]
+    command = _arithmetic_commands()['divide']
+    results = {}
+    for spec in ('decimal:28', 'decimal:12', 'decimal:6', 'fixed:6', 'float'):
+        mode = get_mode(spec)
+        command.configure(numeric=mode)
+
+        def run_all():
+            for a, b in pairs:
+                command.execute(a, b)
+        summary = summarize(measure(run_all, number=1 if quick else 20, repeat=5 if quick else 20), len(pairs))
+        summary['max_abs_error'] = float(max(abs(Decimal(str(command.execute(a, b))) - expected)
+                                             for (a, b), expected in zip(pairs, reference)))
+        results[spec.replace(':', '_')] = summary
+    command.configure(numeric=None)
+    return results
+
+
+@benchmark('pool')
+def bench_pool(quick: bool) -> dict:
+    rows = [(Decimal(i), Decimal(3)) for i in range(1000 if quick else 50000)]
+    handler = _handler()
+    results = {}
+    for kind in ('thread', 'process'):
+        handler.configure_pool(kind=kind)
+        list(handler.map_command('multiply', rows[:10]))  # start the workers outside the timing
+        results[kind] = summarize(measure(lambda: list(handler.map_command('multiply', rows)), number=1, repeat=3), len(rows))
+    handler.shutdown_pool()
+    return results
+
+
+def run(names: Optional[List[str]] = None, quick: bool = False) -> dict:
+    """Run the named benchmarks (all by default) and return their results by name."""
+    return {name: BENCHMARKS[name](quick) for name in (names or BENCHMARKS)}
+
+
+def flatten(results: dict, prefix: str = '') -> Dict[str, dict]:
+    """Map dotted benchmark names (e.g. 'batch.exact') to their summaries."""
+    flat = {}
+    for key, value in results.items():
+        if 'p50_us' in value:
+            flat[prefix + key] = value
+        else:
+            flat.update(flatten(value, f'{prefix}{key}.'))
+    return flat
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25) -> List[str]:
+    """Return a description of every benchmark whose p50 or p99 is more than ``tolerance`` slower than baseline."""
+    regressions = []
+    base = flatten(baseline)
+    for name, summary in flatten(results).items():
+        if name not in base:
+            continue
+        for key in ('p50_us', 'p99_us'):
+            if key in summary and key in base[name] and summary[key] > base[name][key] * (1 + tolerance):
+                regressions.append(f"{name}: {key[:-3]} {summary[key]:.2f}us vs baseline {base[name][key]:.2f}us")
+    return regressions
+
+
+def save(results: dict, path: str):
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
@@ -0,0 +1,38 @@
+import argparse
+import sys
+
+from app import bench
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m app.bench', description="Run the calculator benchmarks")
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help=f"benchmarks to run (default: all of {', '.join(sorted(bench.BENCHMARKS))})")
+    parser.add_argument('--quick', action='store_true', help="fewer iterations, for smoke runs")
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON")
+    parser.add_argument('--baseline', metavar='PATH', help="compare against a JSON file from --json")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown vs baseline (default 0.25)")
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(bench.BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(sorted(unknown))}")
+
+    results = bench.run(args.names, quick=args.quick)
+    for name, summary in sorted(bench.flatten(results).items()):
+        print(f"{name:32} p50 {summary['p50_us']:10.2f}us  p90 {summary['p90_us']:10.2f}us  "
+              f"p99 {summary['p99_us']:10.2f}us  {summary['ops_per_sec']:14.0f} ops/s"
+              + (f"  max error {summary['max_abs_error']:.3g}" if 'max_abs_error' in summary else '')
+              + (f"  {summary['modules']} modules ({summary['first_use_modules']} after first use)"
+                 if 'modules' in summary else ''))
+    if args.json:
+        bench.save(results, args.json)
+    if args.baseline:
+        regressions = bench.compare(results, bench.load(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Cache Module
+
+A size-bounded LRU cache for the results of pure commands. Keys are built by
+cache_key(), so the cache is transparent: operands that are numerically equal
+but print differently (``Decimal('2')`` and ``Decimal('2.0')``) get separate
+entries, as do calls under a different numeric mode or Decimal context
+(precision, rounding and exponent limits). Errors are never cached.
+"""
+
+import decimal
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+
+MISSING = object()
+
+
+def operand_key(value):
+    """Key one operand by type and exact representation; a Decimal keeps its exponent and sign."""
+    if isinstance(value, Decimal):
+        return Decimal, value.as_tuple()
+    return type(value), value
+
+
+def cache_key(operation, args, numeric=None) -> tuple:
+    """Key a call by operation, numeric mode, the active Decimal context and its operands."""
+    context = decimal.getcontext()
+    return (operation, getattr(numeric, 'spec', None), context.prec, context.rounding, context.Emin,
+            context.Emax, tuple(map(operand_key, args)))
+
+
+class ResultCache:
+    """
+    LRU result cache with hit, miss and eviction counters.
+
+    Args:
+        maxsize: Maximum number of cached results.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError(f"Cache size must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            entries = self._entries
+            if key in entries:
+                entries.move_to_end(key)
+            elif len(entries) >= self.maxsize:
+                entries.popitem(last=False)
+                self.evictions += 1
+            entries[key] = value
+
+    def lookup(self, key, compute):
+        """Return the cached value for key, calling compute() and caching its result on a miss.
+
+        compute() runs outside the lock, so two threads missing the same key may both compute it.
+        """
+        value = self.get(key)
+        if value is MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {'size': len(self._entries), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,254 @@
+"""
+Calculations Module
+
+Bounded calculation history. Every calculation is kept as a compact
+CalculationRecord (operation name, operands and result in ``__slots__``)
+rather than a Calculation object holding a function reference, and the
+history never grows past its capacity.
+
+Two eviction policies are available:
+
+* ``'ring'``: a ring buffer; once full, the oldest record is dropped.
+* ``'lru'``: one record per distinct (operation, a, b); repeating a
+  calculation moves it to the newest position, and the least recently used
+  calculation is dropped once full.
+
+Thread safety: with the 'ring' policy every thread appends to its own shard
+(a deque only that thread appends to), so concurrent recording shares nothing
+but an atomic sequence counter. Capacity is global, not per shard: every
+``capacity // 4`` records, the thread that draws the sweep's sequence number
+drops the records that have fallen out of the newest ``capacity`` from every
+shard, so however many threads record, the shards together never hold more
+than ``capacity + capacity // 4`` records. Reads merge the shards lazily by
+sequence number into one oldest-to-newest view of the newest ``capacity``
+records; each shard is copied first (a C-level copy of its deque), so a read
+never fails or blocks because of concurrent writers. Shards of threads that
+have exited are folded into a shared shard when the next new thread records.
+The 'lru' policy needs one shared table to deduplicate, so it serializes
+writers with a lock.
+
+Reads are iterator based, so filtering and export never build a merged list
+of the history.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from decimal import Decimal
+from operator import attrgetter
+from typing import Iterator, List, Optional
+
+from app.historyfile import write_history
+
+DEFAULT_CAPACITY = 10000
+POLICIES = ('ring', 'lru')
+
+
+class CalculationRecord:
+    """A single history entry; ``timestamp`` is seconds since the epoch, ``sequence`` its order in the history."""
+    __slots__ = ('operation', 'a', 'b', 'result', 'timestamp', 'sequence')
+
+    def __init__(self, operation: str, a: Decimal, b: Decimal, result: Optional[Decimal] = None,
+                 timestamp: Optional[float] = None):
+        self.operation = operation
+        self.a = a
+        self.b = b
+        self.result = result
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.sequence = 0
+
+    def __repr__(self):
+        return f"CalculationRecord({self.operation!r}, {self.a!r}, {self.b!r}, {self.result!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, CalculationRecord):
+            return NotImplemented
+        return (self.operation, self.a, self.b, self.result) == (other.operation, other.a, other.b, other.result)
+
+    __hash__ = None
+
+
+def operation_name(operation) -> str:
+    """Return the history name of an operation given as a name or a function."""
+    return operation if isinstance(operation, str) else operation.__name__
+
+
+_by_sequence = attrgetter('sequence')
+
+
+class _Shard:
+    """One thread's records; only the owning thread appends, only a sweep (under the lock) pops."""
+    __slots__ = ('records', 'evictions', 'thread')
+
+    def __init__(self, thread: Optional[threading.Thread], records=()):
+        self.records = deque(records)
+        self.evictions = 0
+        self.thread = thread
+
+
+class Calculations:
+    """
+    History store with a fixed capacity and an eviction policy.
+
+    Args:
+        capacity: Maximum number of records kept.
+        policy: 'ring' or 'lru', see the module docstring.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, policy: str = 'ring'):
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self.configure(capacity, policy)
+
+    def configure(self, capacity: int = DEFAULT_CAPACITY, policy: str = 'ring'):
+        """Change capacity and policy, keeping the newest records that still fit."""
+        if capacity < 1:
+            raise ValueError(f"History capacity must be positive, got {capacity}")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown history policy: {policy}")
+        with self._lock:
+            existing = list(self._ordered())[-capacity:] if hasattr(self, 'policy') else []
+            self.capacity = capacity
+            self.policy = policy
+            self._sweep_every = max(1, capacity // 4)
+            self._local = threading.local()
+            self._shards: List[_Shard] = [_Shard(None, existing)] if policy == 'ring' and existing else []
+            self._lru = OrderedDict()
+            self._lru_evictions = 0
+            if policy == 'lru':
+                for record in existing:
+                    key = (record.operation, record.a, record.b)
+                    self._lru.pop(key, None)
+                    self._lru[key] = record
+
+    def record(self, operation, a: Decimal, b: Decimal, result: Optional[Decimal] = None) -> CalculationRecord:
+        """Add a calculation to the history and return its record."""
+        record = CalculationRecord(operation_name(operation), a, b, result)
+        record.sequence = next(self._sequence)
+        self._store(record)
+        return record
+
+    def _store(self, record: CalculationRecord):
+        if self.policy == 'ring':
+            try:
+                shard = self._local.shard
+            except AttributeError:
+                shard = self._new_shard()
+            shard.records.append(record)
+            if not record.sequence % self._sweep_every:
+                self._sweep(record.sequence - self.capacity)
+            return
+        key = (record.operation, record.a, record.b)
+        with self._lock:
+            records = self._lru
+            if key in records:
+                records.move_to_end(key)
+            elif len(records) == self.capacity:
+                records.popitem(last=False)
+                self._lru_evictions += 1
+            records[key] = record
+
+    def _new_shard(self) -> _Shard:
+        shard = self._local.shard = _Shard(threading.current_thread())
+        with self._lock:
+            live = [old for old in self._shards if old.thread is not None and old.thread.is_alive()]
+            finished = [old for old in self._shards if old not in live]
+            if len(finished) > 1:
+                # Fold the shards of exited threads into one, so they cannot pile up.
+                retired = _Shard(None, heapq.merge(*(old.records for old in finished), key=_by_sequence))
+                retired.evictions = sum(old.evictions for old in finished)
+                finished = [retired]
+            # Readers take self._shards without the lock, so it is replaced, never mutated.
+            self._shards = finished + live + [shard]
+        return shard
+
+    def _sweep(self, stale: int):
+        """Drop the records numbered ``stale`` or lower, which no longer fit in the history, from every shard."""
+        with self._lock:
+            # Owners only append on the right, so the left end is ours while the lock is held.
+            for shard in self._shards:
+                records = shard.records
+                while records and records[0].sequence <= stale:
+                    records.popleft()
+                    shard.evictions += 1
+
+    def _merged(self) -> Iterator[CalculationRecord]:
+        """Lazily merge the shards into the newest ``capacity`` ring records, oldest first."""
+        columns = [column for column in (tuple(shard.records) for shard in self._shards) if column]
+        stored = sum(map(len, columns))
+        merged = heapq.merge(*columns, key=_by_sequence) if len(columns) > 1 else iter(columns[0] if columns else ())
+        return itertools.islice(merged, max(0, stored - self.capacity), None)
+
+    def _ordered(self) -> Iterator[CalculationRecord]:
+        """Iterate the history, oldest first, without taking the lock."""
+        return self._merged() if self.policy == 'ring' else iter(list(self._lru.values()))
+
+    @property
+    def evictions(self) -> int:
+        """How many records have been dropped to stay within capacity."""
+        if self.policy == 'lru':
+            return self._lru_evictions
+        shards = self._shards
+        stored = sum(len(shard.records) for shard in shards)
+        return sum(shard.evictions for shard in shards) + max(0, stored - self.capacity)
+
+    def add_calculation(self, calculation):
+        """Add a Calculation-like object (with a, b and operation attributes)."""
+        return self.record(calculation.operation, calculation.a, calculation.b, getattr(calculation, 'result', None))
+
+    def __iter__(self) -> Iterator[CalculationRecord]:
+        """Iterate from oldest to newest over a snapshot of the history."""
+        if self.policy == 'ring':
+            return self._merged()
+        with self._lock:
+            return self._ordered()
+
+    def __len__(self):
+        if self.policy == 'lru':
+            return len(self._lru)
+        return min(self.capacity, sum(len(shard.records) for shard in self._shards))
+
+    def get_latest(self) -> Optional[CalculationRecord]:
+        if self.policy == 'lru':
+            with self._lock:
+                return self._lru[next(reversed(self._lru))] if self._lru else None
+        newest = []
+        for shard in self._shards:
+            try:
+                newest.append(shard.records[-1])
+            except IndexError:
+                continue
+        return max(newest, key=_by_sequence) if newest else None
+
+    def delete_calculation(self):
+        """Clear the history."""
+        with self._lock:
+            for shard in self._shards:
+                shard.records.clear()
+            self._lru.clear()
+
+    def iter_operation(self, operation) -> Iterator[CalculationRecord]:
+        """Lazily yield the records for one operation."""
+        name = operation_name(operation)
+        return (record for record in self if record.operation == name)
+
+    def filter_with_operation(self, operation) -> List[CalculationRecord]:
+        """Return only the records for one operation."""
+        return list(self.iter_operation(operation))
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """Yield (operation, a, b, result) tuples, e.g. for csv.writer.writerows."""
+        return ((record.operation, record.a, record.b, record.result) for record in self)
+
+    def save(self, path: str, chunk_size: int = 65536):
+        """Append the history to a columnar history file; read it back with app.historyfile.HistoryReader."""
+        write_history(path, self, chunk_size)
+
+    def print_all_calculation(self) -> List[CalculationRecord]:
+        """Return a list copy of the whole history; prefer iterating for large histories."""
+        return list(self)
+
+
+calculations = Calculations()
@@ -0,0 +1,81 @@
+"""
+Client Module
+
+A small client for the calculation server (see app.server). One client keeps
+one connection open, so repeated calls pay no connection or startup cost, and
+pipeline() sends a whole list of requests before reading any response.
+"""
+
+import socket
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, List, Sequence
+
+from app.server import Address
+
+
+class RemoteCommandError(Exception):
+    """A command failed on the server; the message is the server's error text."""
+
+
+def _decode(response: str):
+    status, _, payload = response.rstrip('\n').partition(' ')
+    if status == 'ERR':
+        return RemoteCommandError(payload)
+    if not payload:
+        return None
+    try:
+        return Decimal(payload)
+    except InvalidOperation:
+        return payload
+
+
+class CalculationClient:
+    """
+    Args:
+        address: ``(host, port)`` for TCP or a path for a Unix socket.
+        timeout: Socket timeout in seconds.
+    """
+
+    def __init__(self, address: Address, timeout: float = 10.0):
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(address)
+        self._reader = self._socket.makefile('r', encoding='utf-8', newline='\n')
+
+    @staticmethod
+    def _encode(command_name: str, args: Sequence) -> bytes:
+        return ' '.join([command_name, *map(str, args)]).encode('utf-8') + b'\n'
+
+    def call(self, command_name: str, *args):
+        """Run one command and return its result; raises RemoteCommandError on failure."""
+        self._socket.sendall(self._encode(command_name, args))
+        result = _decode(self._reader.readline())
+        if isinstance(result, RemoteCommandError):
+            raise result
+        return result
+
+    def pipeline(self, requests: Iterable[Sequence]) -> List:
+        """
+        Send every ``(command_name, *args)`` request, then read all responses.
+
+        Failed requests appear in the returned list as RemoteCommandError
+        instances rather than being raised, so one error does not hide the rest.
+        """
+        payload = b''.join(self._encode(name, args) for name, *args in requests)
+        self._socket.sendall(payload)
+        return [_decode(self._reader.readline()) for _ in range(payload.count(b'\n'))]
+
+    def close(self):
+        try:
+            self._socket.sendall(b'QUIT\n')
+        except OSError:
+            pass
+        self._reader.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,18 +1,96 @@
+import importlib
 from abc import ABC, abstractmethod
+import threading
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+from concurrent.futures import Future
+from app.cache import ResultCache, cache_key
+from app.commands.batch import BatchResult, _check_lengths
+from app.commands.metrics import metrics
+from app.commands.profiler import profiler
+from app.commands.pool import CommandError, CommandResult, WorkerPool
+from app.numeric import get_mode
+from app.plugins import ENTRY_POINTS
 
 class Command(ABC):
+    # Pure commands have no side effects and always return the same result for the same operands,
+    # so their results may be cached. Commands that print, log or read state must leave this False.
+    pure = False
+    # Commands that take text rather than numbers receive their REPL tokens unconverted.
+    raw_args = False
+    # Commands that parse the text themselves receive the rest of the line as one string.
+    raw_line = False
+    # Optional app.numeric.NumericMode; None means the thread's global Decimal context.
+    numeric = None
+
     @abstractmethod
     def execute(self):
         pass
 
+    def configure(self, **attributes):
+        """Set per-command options such as ``numeric``."""
+        for name, value in attributes.items():
+            setattr(self, name, value)
+
+    def execute_batch(self, a_values, b_values, exact: bool = True, numeric=None) -> BatchResult:
+        """Fallback batch path: run execute() row by row and collect per-row errors (``numeric`` is not applied)."""
+        a_values, b_values = list(a_values), list(b_values)
+        _check_lengths(a_values, b_values)
+        values, mask, errors = [], [], {}
+        for index, (a, b) in enumerate(zip(a_values, b_values)):
+            try:
+                values.append(self.execute(a, b))
+                mask.append(False)
+            except (ValueError, ArithmeticError) as e:
+                values.append(None)
+                mask.append(True)
+                errors[index] = str(e)
+        return BatchResult(values, mask, errors)
+
+    def execute_multiprocessing(self, a, b, queue):
+        """Process target: put the result, or the raised exception, on the queue."""
+        try:
+            queue.put(self.execute(a, b))
+        except Exception as e:  # pylint: disable=broad-except
+            queue.put(e)
+
 class CommandHandler:
+    """
+    Registry and dispatcher of commands, safe to share between threads.
+
+    ``commands`` is copy-on-write: registration builds a new dict under a lock
+    and installs it in one assignment, so dispatching never locks and always
+    sees a complete table, either the one before a registration or the one
+    after it. A command object that was looked up keeps running even if it is
+    replaced meanwhile. The result cache and metrics lock internally, the pool
+    is created once, and commands themselves must be thread-safe (the
+    arithmetic plugins are stateless).
+    """
+
     def __init__(self):
         self.commands = {}
+        self._lock = threading.Lock()
+        self.pool = None
+        # Keyword arguments for the pool created on first use (see configure_pool).
+        self.pool_options = {}
+        self.cache = None
 
     def register_command(self, command_name: str, command: Command):
-        self.commands[command_name] = command
+        self.update_commands({command_name: command})
 
-    def execute_command(self, command_name: str):
+    def update_commands(self, updated: Dict[str, Command], removed: Iterable[str] = ()):
+        """Swap in a new command table in one assignment; running commands keep their old objects."""
+        with self._lock:
+            commands = dict(self.commands)
+            replaced = any(command_name in commands for command_name in updated)
+            for command_name in removed:
+                replaced = commands.pop(command_name, None) is not None or replaced
+            commands.update(updated)
+            self.commands = commands
+        if self.cache is not None and replaced:
+            # Results of replaced commands must not be served from the cache.
+            self.cache.clear()
+
+    def execute_command(self, command_name: str, *args):
         """ Look before you leap (LBYL) - Use when its less likely to work
         if command_name in self.commands:
             self.commands[command_name].execute()
@@ -21,6 +99,91 @@ class CommandHandler:
         """
         """Easier to ask for forgiveness than permission (EAFP) - Use when its going to most likely work"""
         try:
-            self.commands[command_name].execute()
+            return self.dispatch(command_name, *args)
         except KeyError:
             print(f"No such command: {command_name}")
+            return None
+
+    def dispatch(self, command_name: str, *args):
+        """Execute a command and return its result; raises KeyError for an unknown command."""
+        return self.dispatch_command(command_name, self.commands[command_name], *args)
+
+    def dispatch_command(self, command_name: str, command: Command, *args):
+        """Like dispatch(), for a command already looked up, e.g. from a DispatchTable snapshot."""
+        if profiler.enabled:
+            return profiler.call(command_name, self._measured, command_name, command, args)
+        if metrics.enabled:
+            return metrics.timed(command_name, lambda: self._execute(command_name, command, args), args)
+        return self._execute(command_name, command, args)
+
+    def _measured(self, command_name: str, command: Command, args: tuple):
+        if metrics.enabled:
+            return metrics.timed(command_name, lambda: self._execute(command_name, command, args), args)
+        return self._execute(command_name, command, args)
+
+    def _execute(self, command_name: str, command: Command, args: tuple):
+        if self.cache is None or not args or not command.pure:
+            return command.execute(*args)
+        # A lazy command's numeric mode lives on the loaded command.
+        numeric = command.resolve().numeric if hasattr(command, 'resolve') else command.numeric
+        key = cache_key(command_name, args, numeric)
+        try:
+            hash(key)
+        except TypeError:
+            return command.execute(*args)
+        return self.cache.lookup(key, lambda: command.execute(*args))
+
+    def enable_cache(self, maxsize: int = 4096) -> ResultCache:
+        """Cache the results of pure commands in a size-bounded LRU cache."""
+        self.cache = ResultCache(maxsize)
+        return self.cache
+
+    def disable_cache(self):
+        self.cache = None
+
+    def execute_batch(self, command_name: str, a_values, b_values, exact: bool = True, numeric=None) -> BatchResult:
+        """Run a whole column of operands through one command in a single dispatch.
+
+        ``numeric`` is an optional NumericMode or mode spec (e.g. 'decimal:12') for this batch only.
+        Raises KeyError for an unknown command, since there is no single line to report it against.
+        """
+        if isinstance(numeric, str):
+            numeric = get_mode(numeric)
+        return self.commands[command_name].execute_batch(a_values, b_values, exact=exact, numeric=numeric)
+
+    def configure_pool(self, max_workers: Optional[int] = None, kind: str = 'process', chunksize: int = 1024) -> WorkerPool:
+        """Replace the worker pool; workers start on first use and are reused until shutdown_pool()."""
+        self.shutdown_pool()
+        self.pool = WorkerPool(max_workers=max_workers, kind=kind, chunksize=chunksize)
+        return self.pool
+
+    def submit(self, command_name: str, *args) -> Future:
+        """Run one calculation on the pool; the future resolves to a CommandResult."""
+        return self._get_pool().submit(self.commands[command_name], *args)
+
+    def map_command(self, command_name: str, rows: Iterable[Sequence], chunksize: Optional[int] = None) -> Iterator[CommandResult]:
+        """Stream ordered CommandResults for many calculations, spread over the pool in chunks."""
+        return self._get_pool().map(self.commands[command_name], rows, chunksize)
+
+    def shutdown_pool(self, wait: bool = True):
+        if self.pool is not None:
+            self.pool.shutdown(wait=wait)
+            self.pool = None
+
+    def _get_pool(self) -> WorkerPool:
+        pool = self.pool
+        if pool is None:
+            with self._lock:
+                if self.pool is None:
+                    self.configure_pool(**self.pool_options)
+                pool = self.pool
+        return pool
+
+
+def __getattr__(name: str):
+    """Re-export the declared command classes (``from app.commands import AddCommand``), importing on demand."""
+    for target in ENTRY_POINTS.values():
+        module_name, class_name = target.split(':')
+        if class_name == name:
+            return getattr(importlib.import_module(module_name), class_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,70 @@
+"""
+Asyncio front end for CommandHandler.
+
+AsyncCommandHandler wraps an existing CommandHandler so asyncio code can await
+commands without a thread per caller:
+
+* commands whose execute() returns an awaitable are awaited directly;
+* pure (CPU-bound, side-effect free) commands run on an executor so they do
+  not block the event loop;
+* other commands run inline on the loop, as they would in the REPL.
+
+A concurrency limit caps how many commands run at once, and ``max_pending``
+caps how many may be running or waiting; beyond that, execute() raises
+HandlerBusy immediately so callers can shed load instead of queueing forever.
+"""
+
+import asyncio
+import inspect
+from functools import partial
+from typing import Iterable, List, Optional, Sequence
+
+
+class HandlerBusy(RuntimeError):
+    """Raised when too many commands are already running or waiting."""
+
+
+class AsyncCommandHandler:
+    """
+    Args:
+        handler: The CommandHandler whose commands are executed.
+        max_concurrency: Maximum number of commands executing at once.
+        max_pending: Maximum number of commands running or waiting; None means unbounded.
+        executor: Executor for pure commands; None uses the loop's default executor.
+    """
+
+    def __init__(self, handler, max_concurrency: int = 32, max_pending: Optional[int] = None, executor=None):
+        self.handler = handler
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.executor = executor
+        self.pending = 0
+        self._semaphore = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def execute(self, command_name: str, *args):
+        """Execute a command and return its result; raises KeyError for an unknown command."""
+        command = self.handler.commands[command_name]
+        if self.max_pending is not None and self.pending >= self.max_pending:
+            raise HandlerBusy(f"{self.pending} commands pending, limit is {self.max_pending}")
+        self.pending += 1
+        try:
+            async with self.semaphore:
+                if command.pure:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self.executor, partial(self.handler.dispatch, command_name, *args))
+                result = self.handler.dispatch(command_name, *args)
+                if inspect.isawaitable(result):
+                    result = await result
+                return result
+        finally:
+            self.pending -= 1
+
+    async def execute_many(self, command_name: str, rows: Iterable[Sequence]) -> List:
+        """Execute a command for every row concurrently and return results in row order."""
+        return await asyncio.gather(*(self.execute(command_name, *row) for row in rows))
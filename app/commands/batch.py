@@ -0,0 +1,161 @@
+"""
+Batch Module
+
+Column-at-a-time helpers for the arithmetic commands. A batch takes two equal
+length columns of operands (lists, tuples, ``array.array`` buffers or NumPy
+arrays) and applies one operation to every row in a single call instead of
+dispatching through CommandHandler once per row.
+
+Two numeric paths are supported:
+
+* ``exact=True`` keeps Decimal semantics and returns a list of Decimals.
+* ``exact=False`` uses float64 and returns a NumPy array when NumPy is
+  installed, otherwise an ``array.array('d')``.
+
+NumPy is imported on first use of the float64 path (see numpy()), not with
+the package: it would otherwise dominate the cost of ``import app`` for runs
+that never leave the Decimal path.
+"""
+
+import sys
+from array import array
+from decimal import Decimal
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional
+
+
+@lru_cache(maxsize=None)
+def numpy():
+    """Return the numpy module, importing it on the first call, or None if it is not installed."""
+    try:
+        import numpy as module  # pylint: disable=import-outside-toplevel
+    except ImportError:  # pragma: no cover - NumPy is optional
+        return None
+    return module
+
+
+def is_ndarray(values) -> bool:
+    """True if ``values`` is a NumPy array; never imports NumPy, since no array exists before it is loaded."""
+    module = sys.modules.get('numpy')
+    return module is not None and isinstance(values, module.ndarray)
+
+
+class BatchResult:
+    """
+    Result of a batch execution.
+
+    Attributes:
+        values: One result per input row. Failed rows hold ``None`` on the
+            Decimal path and ``nan`` on the float64 path.
+        mask: One boolean per input row, ``True`` where the row failed, or
+            ``None`` when the operation cannot fail.
+        errors: Mapping of failed row index to its error message.
+    """
+    __slots__ = ('values', 'mask', 'errors')
+
+    def __init__(self, values, mask=None, errors: Optional[dict] = None):
+        self.values = values
+        self.mask = mask
+        self.errors = errors or {}
+
+    @property
+    def failed(self) -> List[int]:
+        """Indices of the rows that failed."""
+        return sorted(self.errors)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+
+def to_decimal(value) -> Decimal:
+    """Convert a single operand to Decimal without binary float artefacts."""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    return Decimal(str(value))
+
+
+def decimal_column(values: Iterable) -> List[Decimal]:
+    """Convert a column of operands to a list of Decimals."""
+    if is_ndarray(values):
+        values = values.tolist()
+    # The type check inline skips a call per value for columns that are already Decimal.
+    return [value if type(value) is Decimal else to_decimal(value) for value in values]  # pylint: disable=unidiomatic-typecheck
+
+
+def float_column(values: Iterable):
+    """Convert a column of operands to a float64 buffer."""
+    np = numpy()
+    if np is not None:
+        if isinstance(values, np.ndarray) and values.dtype == np.float64:
+            return values
+        if isinstance(values, array) and values.typecode == 'd':
+            return np.frombuffer(values, dtype=np.float64)
+        return np.asarray(values, dtype=np.float64)
+    if isinstance(values, array) and values.typecode == 'd':
+        return values
+    return array('d', (float(value) for value in values))
+
+
+def _check_lengths(a_values, b_values):
+    if len(a_values) != len(b_values):
+        raise ValueError(f"Operand columns differ in length: {len(a_values)} != {len(b_values)}")
+
+
+def apply_batch(operation: Callable, a_values, b_values, exact: bool = True) -> BatchResult:
+    """
+    Apply a binary operation that cannot fail to two operand columns.
+
+    Args:
+        operation: A function of two operands, e.g. ``operator.add``. It must
+            work on Decimals, floats and NumPy arrays alike.
+        a_values: The first operand column.
+        b_values: The second operand column.
+        exact: Use Decimal semantics when True, float64 when False.
+
+    Returns:
+        BatchResult: The results, with no mask.
+    """
+    if exact:
+        a_column, b_column = decimal_column(a_values), decimal_column(b_values)
+        _check_lengths(a_column, b_column)
+        return BatchResult(list(map(operation, a_column, b_column)))
+    a_column, b_column = float_column(a_values), float_column(b_values)
+    _check_lengths(a_column, b_column)
+    if numpy() is not None:
+        return BatchResult(operation(a_column, b_column))
+    return BatchResult(array('d', map(operation, a_column, b_column)))
+
+
+def divide_batch(a_values, b_values, exact: bool = True) -> BatchResult:
+    """
+    Divide two operand columns row by row.
+
+    Rows with a zero divisor do not abort the batch; they are flagged in the
+    result mask and reported in ``errors`` as "Cannot divide by zero".
+    """
+    message = "Cannot divide by zero"
+    if exact:
+        a_column, b_column = decimal_column(a_values), decimal_column(b_values)
+        _check_lengths(a_column, b_column)
+        mask = [b == 0 for b in b_column]
+        values = [None if failed else a / b for a, b, failed in zip(a_column, b_column, mask)]
+        errors = {index: message for index, failed in enumerate(mask) if failed}
+        return BatchResult(values, mask, errors)
+    a_column, b_column = float_column(a_values), float_column(b_values)
+    _check_lengths(a_column, b_column)
+    np = numpy()
+    if np is not None:
+        mask = b_column == 0
+        values = np.full(len(a_column), np.nan)
+        np.divide(a_column, b_column, out=values, where=~mask)
+        errors = {int(index): message for index in np.flatnonzero(mask)}
+        return BatchResult(values, mask, errors)
+    mask = [b == 0 for b in b_column]
+    values = array('d', (float('nan') if failed else a / b for a, b, failed in zip(a_column, b_column, mask)))
+    errors = {index: message for index, failed in enumerate(mask) if failed}
+    return BatchResult(values, mask, errors)
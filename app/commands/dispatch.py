@@ -0,0 +1,123 @@
+"""
+Dispatch Module
+
+A pre-resolved, read-only command table for line-oriented front ends (the
+REPL, batch mode and the socket server). It is built once after plugins are
+loaded, so each line costs one split, one dict lookup and cached operand
+conversion instead of a try/except KeyError round trip.
+
+Operands are converted to Decimal by parse_operand(), which validates the
+token (finite numbers only) and interns repeated literals in an LRU cache, so
+``add 1 1`` typed a million times converts "1" once. Commands that take text
+rather than numbers set ``raw_args = True`` and receive the tokens unchanged;
+commands that parse the text themselves set ``raw_line = True`` and receive
+everything after the command name as one string (tokens rejoined with single
+spaces), so ``expr (1 + 2) * 3`` reaches the expression parser intact.
+"""
+
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Tuple
+
+from app.commands.metrics import metrics
+from app.commands.profiler import profiler
+
+
+class UnknownCommand(KeyError):
+    """The line names a command that is not registered."""
+
+    def __init__(self, command_name: str):
+        super().__init__(command_name)
+        self.command_name = command_name
+
+    def __str__(self):
+        return f"No such command: {self.command_name}"
+
+
+class InvalidOperand(ValueError):
+    """An operand is not a finite decimal number."""
+
+    def __init__(self, token: str):
+        super().__init__(f"Invalid number input: {token} is not a valid number.")
+        self.token = token
+
+
+@lru_cache(maxsize=4096)
+def parse_operand(token: str) -> Decimal:
+    """Convert one token to a finite Decimal; repeated tokens return the same object."""
+    try:
+        value = Decimal(token)
+    except InvalidOperation:
+        raise InvalidOperand(token) from None
+    if not value.is_finite():
+        raise InvalidOperand(token)
+    return value
+
+
+def split_line(line: str) -> Tuple[str, List[str]]:
+    """Split a command line into the command name and its operand tokens."""
+    name, *tokens = line.split()
+    return name, tokens
+
+
+class DispatchTable:
+    """
+    Immutable snapshot of a CommandHandler's commands.
+
+    Rebuild it (``DispatchTable(handler)``) after registering or reloading
+    commands; an existing table never changes underneath a caller, including
+    when a call goes through the handler for caching or instrumentation.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.commands = MappingProxyType(dict(handler.commands))
+        # Bound execute methods, filled in on first use so lazily loaded plugins stay unimported until needed.
+        self._resolved = {}
+
+    def __contains__(self, command_name: str) -> bool:
+        return command_name in self.commands
+
+    def _resolve(self, command_name: str):
+        try:
+            command = self.commands[command_name]
+        except KeyError:
+            raise UnknownCommand(command_name) from None
+        command = command.resolve() if hasattr(command, 'resolve') else command
+        # The second field says how tokens become arguments: False (Decimals), True (tokens) or 'line'.
+        entry = self._resolved[command_name] = (command.execute, 'line' if command.raw_line else command.raw_args)
+        return entry
+
+    @staticmethod
+    def _arguments(raw, tokens: List[str]):
+        if not raw:
+            return map(parse_operand, tokens)
+        if raw == 'line':
+            return (' '.join(tokens),) if tokens else ()
+        return tokens
+
+    def parse_args(self, command_name: str, tokens: List[str]) -> tuple:
+        """Return the arguments for a command: raw tokens, the rest of the line, or validated Decimals."""
+        entry = self._resolved.get(command_name) or self._resolve(command_name)
+        return tuple(self._arguments(entry[1], tokens))
+
+    def execute(self, command_name: str, tokens: List[str]):
+        """Parse the tokens for a command and run it.
+
+        With the handler's cache and metrics off, the pre-resolved execute method is called directly
+        (through the profiler when it is on); otherwise the table's command goes through
+        CommandHandler.dispatch_command so caching and metrics apply.
+        """
+        execute, raw = self._resolved.get(command_name) or self._resolve(command_name)
+        args = map(parse_operand, tokens) if not raw else self._arguments(raw, tokens)
+        if self.handler.cache is None and not metrics.enabled:
+            if not profiler.enabled:
+                return execute(*args)
+            return profiler.call(command_name, execute, *args)
+        return self.handler.dispatch_command(command_name, self.commands[command_name], *args)
+
+    def execute_line(self, line: str):
+        """Execute one ``<command> [operand ...]`` line and return the command's result."""
+        name, tokens = split_line(line)
+        return self.execute(name, tokens)
@@ -0,0 +1,54 @@
+import importlib
+import logging
+from app.commands import Command
+
+class LazyCommand(Command):
+    """Stand-in for a plugin command whose module is imported the first time it runs."""
+
+    def __init__(self, target: str):
+        self.target = target
+        self._command = None
+        self._attributes = {}
+
+    def resolve(self) -> Command:
+        if self._command is None:
+            module_name, class_name = self.target.split(':')
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError as e:
+                logging.error(f"Error importing plugin {module_name}: {e}")
+                raise
+            command = getattr(module, class_name)()
+            command.configure(**self._attributes)
+            self._command = command
+        return self._command
+
+    def configure(self, **attributes):
+        """Apply options to the real command now if it is loaded, otherwise when it is."""
+        self._attributes.update(attributes)
+        if self._command is not None:
+            self._command.configure(**attributes)
+
+    @property
+    def pure(self) -> bool:
+        return self.resolve().pure
+
+    @property
+    def raw_args(self) -> bool:
+        return self.resolve().raw_args
+
+    @property
+    def raw_line(self) -> bool:
+        return self.resolve().raw_line
+
+    def execute(self, *args, **kwargs):
+        return self.resolve().execute(*args, **kwargs)
+
+    def execute_batch(self, a_values, b_values, exact: bool = True, numeric=None):
+        return self.resolve().execute_batch(a_values, b_values, exact=exact, numeric=numeric)
+
+    def __getattr__(self, name):
+        # Only reached for attributes LazyCommand lacks; private lookups (e.g. from pickle) must not import.
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
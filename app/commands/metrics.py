@@ -0,0 +1,122 @@
+"""
+Metrics Module
+
+Toggleable per-command instrumentation for CommandHandler dispatch: call and
+error counts, a latency histogram, and a bounded sample of slow calls. The
+module-level ``metrics`` instance is shared by every handler. While it is
+disabled, dispatch pays for a single attribute check and nothing else.
+
+Read the numbers with ``metrics.snapshot()`` (a dict), as Prometheus text
+with ``metrics.render_prometheus()``, or from the REPL with the ``metrics``
+command.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Optional
+
+# Histogram bucket upper bounds in seconds, Prometheus style; the last bucket is +Inf.
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, float('inf'))
+
+
+class CommandStats:
+    __slots__ = ('calls', 'errors', 'total_seconds', 'max_seconds', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def as_dict(self) -> dict:
+        return {'calls': self.calls, 'errors': self.errors, 'total_seconds': self.total_seconds,
+                'max_seconds': self.max_seconds, 'buckets': dict(zip(BUCKETS, self.buckets))}
+
+
+class CommandMetrics:
+    """
+    Args:
+        slow_threshold: Calls taking at least this many seconds are sampled.
+        slow_samples: How many of the most recent slow calls to keep.
+    """
+
+    def __init__(self, slow_threshold: float = 0.01, slow_samples: int = 100):
+        self.enabled = False
+        self.slow_threshold = slow_threshold
+        self.slow_calls = deque(maxlen=slow_samples)
+        self._stats: Dict[str, CommandStats] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, slow_threshold: Optional[float] = None):
+        if slow_threshold is not None:
+            self.slow_threshold = slow_threshold
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.slow_calls.clear()
+
+    def observe(self, command_name: str, seconds: float, failed: bool, args: tuple = ()):
+        """Record one dispatch of ``command_name`` that took ``seconds``."""
+        with self._lock:
+            stats = self._stats.get(command_name)
+            if stats is None:
+                stats = self._stats[command_name] = CommandStats()
+            stats.calls += 1
+            stats.errors += failed
+            stats.total_seconds += seconds
+            if seconds > stats.max_seconds:
+                stats.max_seconds = seconds
+            stats.buckets[bisect_left(BUCKETS, seconds)] += 1
+            if seconds >= self.slow_threshold:
+                self.slow_calls.append((time.time(), command_name, seconds, tuple(map(str, args))))
+
+    def timed(self, command_name: str, call, args: tuple = ()):
+        """Run ``call()`` and record its latency and outcome; ``args`` are kept if the call is slow."""
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = call()
+            failed = False
+            return result
+        finally:
+            self.observe(command_name, time.perf_counter() - started, failed, args)
+
+    def snapshot(self) -> dict:
+        """Return per-command stats and the recent slow calls as plain data."""
+        with self._lock:
+            return {'commands': {name: stats.as_dict() for name, stats in self._stats.items()},
+                    'slow_calls': list(self.slow_calls)}
+
+    def render_prometheus(self) -> str:
+        """Render the stats in the Prometheus text exposition format."""
+        lines = [
+            '# HELP command_calls_total Commands dispatched.',
+            '# TYPE command_calls_total counter',
+        ]
+        snapshot = self.snapshot()['commands']
+        for name, stats in sorted(snapshot.items()):
+            lines.append(f'command_calls_total{{command="{name}"}} {stats["calls"]}')
+        lines += ['# HELP command_errors_total Commands that raised.', '# TYPE command_errors_total counter']
+        for name, stats in sorted(snapshot.items()):
+            lines.append(f'command_errors_total{{command="{name}"}} {stats["errors"]}')
+        lines += ['# HELP command_latency_seconds Command dispatch latency.', '# TYPE command_latency_seconds histogram']
+        for name, stats in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in stats['buckets'].items():
+                cumulative += count
+                label = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'command_latency_seconds_bucket{{command="{name}",le="{label}"}} {cumulative}')
+            lines.append(f'command_latency_seconds_sum{{command="{name}"}} {stats["total_seconds"]}')
+            lines.append(f'command_latency_seconds_count{{command="{name}"}} {stats["calls"]}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = CommandMetrics()
@@ -0,0 +1,113 @@
+"""
+Pool Module
+
+A persistent worker pool for CommandHandler. Calculations are shipped to the
+workers in chunks so the per-item cost is one function call inside the worker
+rather than one process or future per calculation. Every item comes back as a
+CommandResult; a failing item carries a CommandError instead of raising, so
+one bad row (e.g. a zero divisor) never cancels the rest of the chunk.
+"""
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+
+class CommandError(NamedTuple):
+    """Structured description of an exception raised by a command."""
+    type: str
+    message: str
+
+
+class CommandResult(NamedTuple):
+    """Outcome of one calculation; exactly one of value/error is meaningful."""
+    index: int
+    value: Any = None
+    error: Optional[CommandError] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_item(command, index: int, args: Sequence) -> CommandResult:
+    """Execute one calculation, turning an exception into a CommandError."""
+    try:
+        return CommandResult(index, command.execute(*args))
+    except Exception as e:  # pylint: disable=broad-except
+        return CommandResult(index, error=CommandError(type(e).__name__, str(e)))
+
+
+def run_chunk(command, start: int, rows: Sequence[Sequence]) -> List[CommandResult]:
+    """Worker entry point: execute a chunk of rows with consecutive indices."""
+    return [run_item(command, index, args) for index, args in enumerate(rows, start)]
+
+
+class WorkerPool:
+    """
+    A lazily started, reusable process or thread pool.
+
+    Args:
+        max_workers: Number of workers; defaults to every available core.
+        kind: 'process' for CPU-bound work, 'thread' for commands that are
+            cheap or release the GIL.
+        chunksize: Rows sent to a worker per task by map().
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, kind: str = 'process', chunksize: int = 1024):
+        if kind not in ('process', 'thread'):
+            raise ValueError(f"Unknown pool kind: {kind}")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.kind = kind
+        self.chunksize = chunksize
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            executor_class = ProcessPoolExecutor if self.kind == 'process' else ThreadPoolExecutor
+            self._executor = executor_class(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, command, *args) -> Future:
+        """Schedule a single calculation; the future resolves to a CommandResult."""
+        return self.executor.submit(run_item, command, 0, args)
+
+    def submit_chunk(self, command, rows: Sequence[Sequence], start: int = 0) -> Future:
+        """Schedule a chunk of calculations; the future resolves to a list of CommandResults."""
+        return self.executor.submit(run_chunk, command, start, list(rows))
+
+    def map(self, command, rows: Iterable[Sequence], chunksize: Optional[int] = None) -> Iterator[CommandResult]:
+        """
+        Stream CommandResults for every row, in input order.
+
+        Only a bounded number of chunks are in flight at once (two per
+        worker), so arbitrarily long row iterables run in constant memory.
+        """
+        chunksize = chunksize or self.chunksize
+        rows = iter(rows)
+        pending = deque()
+        start = 0
+        while True:
+            while len(pending) < self.max_workers * 2:
+                chunk = list(islice(rows, chunksize))
+                if not chunk:
+                    break
+                pending.append(self.submit_chunk(command, chunk, start))
+                start += len(chunk)
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
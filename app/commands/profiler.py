@@ -0,0 +1,202 @@
+"""
+Profiler Module
+
+Built-in profiling of command dispatch, in one of two modes:
+
+* ``sampling``: a timer thread wakes every ``interval`` seconds and records
+  the stack of every thread that is running a command. Overhead is one
+  ``sys._current_frames()`` per tick, independent of how many calls run, so
+  it can stay on in production; short commands are only caught in
+  proportion to the time they take.
+* ``deterministic``: every call and return inside the profiled commands is
+  timed with ``sys.setprofile``. Exact, but costly, so it is meant to be
+  scoped to the commands under investigation.
+
+Both modes produce the same data: stacks rooted at ``command:<name>`` and
+weighted by samples or by nanoseconds. collapsed() renders them in the
+collapsed-stack format read by flamegraph.pl and speedscope, and summary()
+lists the top functions (by self weight) for each command. The module-level
+``profiler`` instance is shared by every handler; while it is disabled,
+dispatch pays for a single attribute check. In sampling mode the dispatch
+table's fast path stays in place: call() only records which command the
+thread is running around the direct call.
+
+Turn it on with the PROFILE setting or the ``profile`` REPL command.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from threading import get_ident
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MODES = ('sampling', 'deterministic')
+ROOT_PREFIX = 'command:'
+
+
+def _frame_name(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+def _builtin_name(function) -> str:
+    module = getattr(function, '__module__', None) or 'builtins'
+    return f"{module}.{getattr(function, '__qualname__', getattr(function, '__name__', '?'))}"
+
+
+class CommandProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.mode = 'sampling'
+        self.commands = frozenset()
+        self.interval = 0.005
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._running: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def enable(self, mode: str = 'sampling', commands: Iterable[str] = (), interval: Optional[float] = None):
+        """
+        Start profiling.
+
+        Args:
+            mode: 'sampling' or 'deterministic'. Switching modes discards what was recorded.
+            commands: Only profile these commands; all of them when empty.
+            interval: Seconds between samples in sampling mode.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.disable()
+        if mode != self.mode:
+            self.reset()
+        self.mode = mode
+        self.commands = frozenset(commands)
+        if interval is not None:
+            self.interval = interval
+        if mode == 'sampling':
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name='profiler', daemon=True)
+            self._sampler.start()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def call(self, command_name: str, function, *args):
+        """Call ``function(*args)`` (one dispatch of ``command_name``) under the profiler."""
+        if self.commands and command_name not in self.commands:
+            return function(*args)
+        if self.mode == 'deterministic':
+            return self._trace(command_name, function, args)
+        running, ident = self._running, get_ident()
+        outer = running.get(ident)
+        running[ident] = command_name
+        try:
+            return function(*args)
+        finally:
+            if outer is None:
+                del running[ident]
+            else:
+                running[ident] = outer
+
+    def _sample_loop(self):
+        own = get_ident()
+        call_code = CommandProfiler.call.__code__
+        while not self._stop.wait(self.interval):
+            running = dict(self._running)
+            if not running:
+                continue
+            frames = sys._current_frames()  # pylint: disable=protected-access
+            taken = []
+            for ident, command_name in running.items():
+                frame = frames.get(ident)
+                if frame is None or ident == own:
+                    continue
+                stack = []
+                # Only the frames below CommandProfiler.call belong to the command.
+                while frame is not None and frame.f_code is not call_code:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(ROOT_PREFIX + command_name)
+                taken.append(tuple(reversed(stack)))
+            with self._lock:
+                self._stacks.update(taken)
+                self.samples += 1
+
+    def _trace(self, command_name: str, function, args: tuple):
+        stack = [ROOT_PREFIX + command_name]
+        weights: Counter = Counter()
+        clock = time.perf_counter_ns
+        last = clock()
+
+        def hook(frame, event, arg):
+            nonlocal last
+            now = clock()
+            weights[tuple(stack)] += now - last
+            if event == 'call':
+                stack.append(_frame_name(frame))
+            elif event == 'c_call':
+                stack.append(_builtin_name(arg))
+            elif len(stack) > 1:
+                stack.pop()
+            last = clock()
+
+        previous = sys.getprofile()
+        sys.setprofile(hook)
+        try:
+            return function(*args)
+        finally:
+            sys.setprofile(previous)
+            weights[tuple(stack[:1])] += clock() - last
+            with self._lock:
+                self._stacks.update(weights)
+
+    @property
+    def unit(self) -> str:
+        return 'samples' if self.mode == 'sampling' else 'ns'
+
+    def stacks(self) -> Dict[Tuple[str, ...], int]:
+        with self._lock:
+            return {stack: weight for stack, weight in self._stacks.items() if weight}
+
+    def collapsed(self) -> str:
+        """The recorded stacks, one ``frame;frame;frame weight`` line each."""
+        return ''.join(f"{';'.join(stack)} {weight}\n" for stack, weight in sorted(self.stacks().items()))
+
+    def summary(self, top: int = 10) -> Dict[str, Tuple[int, List[Tuple[str, int]]]]:
+        """For each command: its total weight and the ``top`` functions by self weight."""
+        totals: Counter = Counter()
+        leaves: Dict[str, Counter] = {}
+        for stack, weight in self.stacks().items():
+            command_name = stack[0][len(ROOT_PREFIX):]
+            totals[command_name] += weight
+            leaves.setdefault(command_name, Counter())[stack[-1]] += weight
+        return {command_name: (total, leaves[command_name].most_common(top))
+                for command_name, total in totals.most_common()}
+
+    def render_summary(self, top: int = 10) -> str:
+        lines = []
+        for command_name, (total, functions) in self.summary(top).items():
+            lines.append(f"{command_name}: {total} {self.unit}")
+            lines.extend(f"  {weight / total:6.1%}  {function}" for function, weight in functions)
+        return '\n'.join(lines) + '\n' if lines else "No profile samples recorded.\n"
+
+    def dump(self, path: str, top: int = 10) -> str:
+        """Write the collapsed stacks to ``path`` and return the per-command summary."""
+        with open(path, 'w', encoding='utf-8') as output:
+            output.write(self.collapsed())
+        return self.render_summary(top)
+
+
+profiler = CommandProfiler()
@@ -0,0 +1,120 @@
+"""
+Debug Module
+
+Lazy debug tracing for plugins, plus an import-time budget check.
+
+trace() does nothing but one ``isEnabledFor`` check unless DEBUG logging is
+enabled for the logger. Only then does it import icecream (on first use) to
+format the value; the value itself can be passed as a zero-argument callable
+so even computing it is deferred. Plugins should call trace() instead of
+``logging.debug(ic(...))``, which formats eagerly on every call.
+
+import_cost_ms() measures how much a module adds to cold start, in a fresh
+interpreter with ``-X importtime``, so tests can hold plugins to a budget.
+startup_report() counts the modules and milliseconds a cold App start costs,
+before and after every registered command has been imported, and
+import_tree() shows which imports that time goes to.
+"""
+
+import json
+import logging
+import subprocess
+import sys
+from typing import Iterable, List, Tuple
+
+PLUGIN_IMPORT_BUDGET_MS = 20.0
+
+_formatter = None
+
+
+def _format(value) -> str:
+    global _formatter  # pylint: disable=global-statement
+    if _formatter is None:
+        try:
+            from icecream import argumentToString  # pylint: disable=import-outside-toplevel
+            _formatter = argumentToString
+        except ImportError:
+            _formatter = repr
+    return _formatter(value)
+
+
+def trace(label: str, value, logger: logging.Logger = None):
+    """
+    Log ``label: value`` at DEBUG level, doing no work when DEBUG is off.
+
+    Args:
+        label: Name shown before the value, like ic()'s argument text.
+        value: The value, or a zero-argument callable producing it.
+        logger: Logger to use; the root logger by default.
+    """
+    logger = logger or logging.getLogger()
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if callable(value) and not isinstance(value, type):
+        value = value()
+    logger.debug("ic| %s: %s", label, _format(value))
+
+
+def import_cost_ms(module: str, preload: Iterable[str] = ('app',)) -> float:
+    """
+    Return the cumulative import time of ``module`` in milliseconds, measured in a fresh interpreter.
+
+    Modules in ``preload`` are imported first so their cost (e.g. the app package itself) is not counted.
+    """
+    statements = [f'import {name}' for name in preload] + [f'import {module}']
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', '; '.join(statements)],
+                               capture_output=True, text=True, check=True)
+    for line in completed.stderr.splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    return 0.0
+
+
+def import_tree(module: str = 'app', min_fraction: float = 0.05, max_depth: int = 3) -> List[Tuple[int, str, float]]:
+    """
+    Return the expensive part of ``module``'s import tree, measured in a fresh interpreter.
+
+    Returns:
+        (depth, module, cumulative ms) for every import up to ``max_depth`` below ``module`` taking at
+        least ``min_fraction`` of the whole, in the order ``-X importtime`` reports them (children before their parent).
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True, check=True)
+    entries = []
+    for line in completed.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        entries.append(((len(name) - len(name.lstrip())) // 2, name.strip(), int(fields[1]) / 1000))
+    total = next((ms for _, name, ms in reversed(entries) if name == module), 0.0)
+    top = min((depth for depth, name, _ in entries if name == module), default=0)
+    return [(depth - top, name, ms) for depth, name, ms in entries
+            if ms >= total * min_fraction and top <= depth <= top + max_depth]
+
+
+STARTUP_CODE = """
+import json, sys, time
+started = time.perf_counter()
+from app import App
+application = App()
+application.load_plugins()
+report = {'modules': len(sys.modules), 'startup_ms': (time.perf_counter() - started) * 1000}
+for command in list(application.command_handler.commands.values()):
+    getattr(command, 'resolve', lambda: command)()
+report.update(first_use_modules=len(sys.modules), first_use_ms=(time.perf_counter() - started) * 1000)
+print(json.dumps(report))
+"""
+
+
+def startup_report() -> dict:
+    """
+    Measure a cold start in a fresh interpreter.
+
+    Returns:
+        dict: ``modules`` and ``startup_ms`` after App() and load_plugins(), and
+        ``first_use_modules`` and ``first_use_ms`` once every registered command is imported.
+    """
+    completed = subprocess.run([sys.executable, '-c', STARTUP_CODE], capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
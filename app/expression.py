@@ -0,0 +1,180 @@
+"""
+Expression Module
+
+Compiles arithmetic expressions such as ``(a + b) * c / d`` once and evaluates
+them many times. Expressions are parsed with ``ast`` into a tree of closures
+built on the arithmetic plugins (AddCommand, SubtractCommand, MultiplyCommand,
+DivideCommand), so they share the plugins' semantics, including "Cannot
+divide by zero".
+
+* Sub-expressions made only of literals are folded at compile time.
+* Compiled expressions are cached by their text (compile_expression is an LRU).
+* evaluate() takes one set of variable values; evaluate_columns() takes a
+  column per variable and runs each operator once per column through the
+  plugins' batch path, reporting failed rows in a mask instead of raising.
+
+Only numbers, variable names, parentheses, unary +/- and the four binary
+operators are accepted; anything else raises ValueError.
+"""
+
+import ast
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Callable, Dict, Mapping, Tuple
+
+from app.commands.batch import BatchResult, to_decimal
+from app.plugins.add_command import AddCommand
+from app.plugins.subtract_command import SubtractCommand
+from app.plugins.multiply_command import MultiplyCommand
+from app.plugins.divide_command import DivideCommand
+
+OPERATORS = {
+    ast.Add: AddCommand(),
+    ast.Sub: SubtractCommand(),
+    ast.Mult: MultiplyCommand(),
+    ast.Div: DivideCommand(),
+}
+
+
+class Node:
+    """A compiled expression node: a scalar evaluator plus a column evaluator."""
+    __slots__ = ('scalar', 'column', 'constant')
+
+    def __init__(self, scalar: Callable, column: Callable, constant=None):
+        self.scalar = scalar
+        self.column = column
+        self.constant = constant
+
+
+def _constant(value: Decimal) -> Node:
+    return Node(lambda env: value, lambda columns, size, exact, errors: [value] * size, value)
+
+
+def _variable(name: str) -> Node:
+    def scalar(env):
+        try:
+            return env[name]
+        except KeyError:
+            raise ValueError(f"Missing value for variable: {name}") from None
+
+    def column(columns, size, exact, errors):
+        try:
+            return columns[name]
+        except KeyError:
+            raise ValueError(f"Missing column for variable: {name}") from None
+    return Node(scalar, column)
+
+
+def _binary(command, left: Node, right: Node) -> Node:
+    if left.constant is not None and right.constant is not None:
+        return _constant(command.execute(left.constant, right.constant))
+    left_scalar, right_scalar, execute = left.scalar, right.scalar, command.execute
+
+    def column(columns, size, exact, errors):
+        result = command.execute_batch(left.column(columns, size, exact, errors),
+                                       right.column(columns, size, exact, errors), exact=exact)
+        if not result.errors:
+            return result.values
+        for index, message in result.errors.items():
+            errors.setdefault(index, message)
+        if exact:
+            # Keep failed rows computable downstream; they are blanked out at the end.
+            return [Decimal(0) if value is None else value for value in result.values]
+        return result.values
+    return Node(lambda env: execute(left_scalar(env), right_scalar(env)), column)
+
+
+def _negate(operand: Node) -> Node:
+    return _binary(OPERATORS[ast.Sub], _constant(Decimal(0)), operand)
+
+
+class CompiledExpression:
+    """A parsed, constant-folded expression ready for repeated evaluation."""
+
+    def __init__(self, text: str, root: Node, variables: Tuple[str, ...]):
+        self.text = text
+        self.variables = variables
+        self._root = root
+
+    @property
+    def is_constant(self) -> bool:
+        return self._root.constant is not None
+
+    def evaluate(self, values: Mapping = None, **kwargs) -> Decimal:
+        """Evaluate against one set of variable values; raises ValueError on e.g. division by zero."""
+        env = {name: _variable_value(name, value) for name, value in {**(values or {}), **kwargs}.items()}
+        try:
+            return self._root.scalar(env)
+        except RecursionError:
+            raise ValueError("Expression is nested too deeply to evaluate") from None
+
+    def evaluate_columns(self, columns: Mapping, exact: bool = True) -> BatchResult:
+        """
+        Evaluate against a column of values per variable.
+
+        Returns:
+            BatchResult: One value per row; rows that failed anywhere in the
+            expression are flagged in ``mask`` with their first error in ``errors``.
+        """
+        sizes = {len(column) for column in columns.values()}
+        if len(sizes) > 1:
+            raise ValueError(f"Variable columns differ in length: {sorted(sizes)}")
+        size = sizes.pop() if sizes else 1
+        errors: Dict[int, str] = {}
+        try:
+            values = self._root.column(columns, size, exact, errors)
+        except RecursionError:
+            raise ValueError("Expression is nested too deeply to evaluate") from None
+        if not errors:
+            return BatchResult(values)
+        mask = [index in errors for index in range(size)]
+        if exact:
+            values = [None if failed else value for value, failed in zip(values, mask)]
+        return BatchResult(values, mask, errors)
+
+    def __repr__(self):
+        return f"CompiledExpression({self.text!r})"
+
+
+def _variable_value(name: str, value) -> Decimal:
+    try:
+        return to_decimal(value)
+    except (InvalidOperation, ValueError, TypeError):
+        raise ValueError(f"Invalid value for variable {name}: {value!r} is not a number") from None
+
+
+def _compile_node(node: ast.AST, text: str, variables: set) -> Node:
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, text, variables)
+    if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+        return _binary(OPERATORS[type(node.op)], _compile_node(node.left, text, variables),
+                       _compile_node(node.right, text, variables))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _compile_node(node.operand, text, variables)
+        return _negate(operand) if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        # Use the literal text so 0.1 stays exactly Decimal('0.1').
+        segment = ast.get_source_segment(text, node)
+        try:
+            return _constant(Decimal(segment))
+        except InvalidOperation:
+            raise ValueError(f"Unsupported number literal: {segment}") from None
+    if isinstance(node, ast.Name):
+        variables.add(node.id)
+        return _variable(node.id)
+    raise ValueError(f"Unsupported expression element: {ast.get_source_segment(text, node) or type(node).__name__}")
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text: str) -> CompiledExpression:
+    """Parse and compile ``text``; repeated calls with the same text return the cached result."""
+    try:
+        tree = ast.parse(text.strip(), mode='eval')
+        variables = set()
+        root = _compile_node(tree, text.strip(), variables)
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {text}") from e
+    except (RecursionError, MemoryError):
+        # ast and the compiler recurse once per nesting level.
+        raise ValueError(f"Expression is nested too deeply: {text[:40]}...") from None
+    return CompiledExpression(text, root, tuple(sorted(variables)))
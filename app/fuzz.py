@@ -0,0 +1,276 @@
+"""
+Fuzz Module
+
+Large, reproducible correctness sweeps of the arithmetic commands. Instead of
+building one Faker record (and one pytest parameter) per calculation, run()
+streams chunks of random operands and checks each chunk in bulk:
+
+* operands come from a seeded RNG (NumPy's PCG64 when NumPy is installed,
+  otherwise ``random.Random``), seeded per chunk from (seed, chunk index), so
+  any chunk can be regenerated on its own to reproduce a mismatch;
+* every command is checked on three paths: execute() row by row, the exact
+  (Decimal) batch path and the float64 batch path;
+* the reference is computed from the integer operands: sums, differences and
+  products are exact integers, quotients are a single correctly rounded
+  Decimal division, and zero divisors must fail with "Cannot divide by zero";
+* chunks are spread over worker processes with a bounded number in flight,
+  and only the chunk index travels to a worker, never the operands.
+
+``python -m app.fuzz --records 1000000`` runs a sweep from the command line.
+"""
+
+import argparse
+import math
+import operator
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.commands import Command
+from app.commands.batch import numpy
+
+ZERO_DIVISION = "Cannot divide by zero"
+PATHS = ('scalar', 'exact', 'float')
+MAX_DIGITS = 9  # keeps every product inside int64 for the NumPy reference
+FLOAT_TOLERANCE = 4 * 2.0 ** -53
+
+
+class Mismatch(NamedTuple):
+    """One row whose result differs from the reference."""
+    command: str
+    path: str
+    chunk: int
+    row: int
+    a: Decimal
+    b: Decimal
+    expected: object
+    actual: object
+
+
+class FuzzReport(NamedTuple):
+    seed: int
+    records: int
+    checks: int
+    mismatch_count: int
+    mismatches: Tuple[Mismatch, ...]
+    seconds: float
+    backend: str
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatch_count == 0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else float('inf')
+
+
+def default_commands() -> Dict[str, Command]:
+    from app.plugins.add_command import AddCommand  # pylint: disable=import-outside-toplevel
+    from app.plugins.subtract_command import SubtractCommand  # pylint: disable=import-outside-toplevel
+    from app.plugins.multiply_command import MultiplyCommand  # pylint: disable=import-outside-toplevel
+    from app.plugins.divide_command import DivideCommand  # pylint: disable=import-outside-toplevel
+    return {'add': AddCommand(), 'subtract': SubtractCommand(),
+            'multiply': MultiplyCommand(), 'divide': DivideCommand()}
+
+
+def generate_chunk(seed: int, chunk: int, size: int, digits: int = 2) -> Tuple[List[int], List[int]]:
+    """Return two columns of ``size`` signed integers with up to ``digits`` digits for one chunk."""
+    if not 1 <= digits <= MAX_DIGITS:
+        raise ValueError(f"digits must be between 1 and {MAX_DIGITS}, got {digits}")
+    bound = 10 ** digits
+    np = numpy()
+    if np is not None:
+        rng = np.random.default_rng([seed, chunk])
+        columns = rng.integers(-bound + 1, bound, size=(2, size), dtype=np.int64)
+        return columns[0].tolist(), columns[1].tolist()
+    rng = random.Random(f'{seed}:{chunk}')
+    randrange = rng.randrange
+    return ([randrange(-bound + 1, bound) for _ in range(size)],
+            [randrange(-bound + 1, bound) for _ in range(size)])
+
+
+def _reference(name: str, a_ints: Sequence[int], b_ints: Sequence[int], scale: int) -> list:
+    """Exact expected results as Decimals; None where the command must fail."""
+    if name == 'divide':
+        return [None if b == 0 else Decimal(a) / Decimal(b) for a, b in zip(a_ints, b_ints)]
+    function = {'add': operator.add, 'subtract': operator.sub, 'multiply': operator.mul}[name]
+    exponent = -2 * scale if name == 'multiply' else -scale
+    values = map(function, a_ints, b_ints)
+    return [Decimal(value).scaleb(exponent) for value in values] if exponent else list(map(Decimal, values))
+
+
+class _Chunk(NamedTuple):
+    a_ints: List[int]
+    b_ints: List[int]
+    a: List[Decimal]
+    b: List[Decimal]
+    scale: int
+
+
+def _check_scalar(name, command, chunk, expected, report):
+    execute = command.execute
+    for row, (a, b, want) in enumerate(zip(chunk.a, chunk.b, expected)):
+        try:
+            got = execute(a, b)
+        except Exception as e:  # pylint: disable=broad-except
+            if not (want is None and isinstance(e, ValueError) and str(e) == ZERO_DIVISION):
+                report(row, ZERO_DIVISION if want is None else want, repr(e))
+            continue
+        if want is None or got != want:
+            report(row, ZERO_DIVISION if want is None else want, got)
+
+
+def _check_exact(name, command, chunk, expected, report):
+    result = command.execute_batch(chunk.a, chunk.b, exact=True)
+    for row in [row for row, (got, want) in enumerate(zip(result.values, expected)) if got != want]:
+        report(row, expected[row], result.values[row])
+    for row, want in enumerate(expected):
+        if want is None and result.errors.get(row) != ZERO_DIVISION:
+            report(row, ZERO_DIVISION, result.errors.get(row))
+
+
+def _check_float(name, command, chunk, expected, report):
+    """
+    float64 results must be within a few ulps of the exact result. For sums
+    and differences the bound scales with the operands, since rounding the
+    operands alone can cost that much when they nearly cancel.
+    """
+    np = numpy()
+    if np is None:
+        unit = 10.0 ** chunk.scale
+        a_floats, b_floats = [a / unit for a in chunk.a_ints], [b / unit for b in chunk.b_ints]
+        result = command.execute_batch(a_floats, b_floats, exact=False)
+        rows = []
+        for row, (got, want, a, b) in enumerate(zip(result.values, expected, a_floats, b_floats)):
+            if want is None:
+                if not math.isnan(got):
+                    rows.append(row)
+                continue
+            magnitude = abs(a) + abs(b) if name in ('add', 'subtract') else abs(float(want))
+            if abs(got - float(want)) > FLOAT_TOLERANCE * magnitude:
+                rows.append(row)
+    else:
+        unit = 10.0 ** chunk.scale
+        a_floats = np.asarray(chunk.a_ints, dtype=np.float64) / unit
+        b_floats = np.asarray(chunk.b_ints, dtype=np.float64) / unit
+        result = command.execute_batch(a_floats, b_floats, exact=False)
+        got = np.asarray(result.values, dtype=np.float64)
+        failed = np.fromiter((value is None for value in expected), dtype=bool, count=len(expected))
+        want = np.fromiter((0.0 if value is None else value for value in expected), dtype=np.float64,
+                           count=len(expected))
+        magnitude = np.abs(a_floats) + np.abs(b_floats) if name in ('add', 'subtract') else np.abs(want)
+        bad = np.where(failed, ~np.isnan(got), ~(np.abs(got - want) <= FLOAT_TOLERANCE * magnitude))
+        rows = np.flatnonzero(bad).tolist()
+    for row in rows:
+        report(row, expected[row], result.values[row])
+
+
+CHECKS = {'scalar': _check_scalar, 'exact': _check_exact, 'float': _check_float}
+
+
+def check_chunk(seed: int, chunk: int, size: int, digits: int = 2, scale: int = 0,
+                commands: Optional[Dict[str, Command]] = None, paths: Sequence[str] = PATHS,
+                max_mismatches: int = 20) -> Tuple[int, int, List[Mismatch]]:
+    """
+    Generate one chunk and check every command on every path against the reference.
+
+    Returns:
+        (checks, mismatch count, up to ``max_mismatches`` Mismatch rows)
+    """
+    commands = commands or default_commands()
+    a_ints, b_ints = generate_chunk(seed, chunk, size, digits)
+    if scale:
+        data = _Chunk(a_ints, b_ints, [Decimal(value).scaleb(-scale) for value in a_ints],
+                      [Decimal(value).scaleb(-scale) for value in b_ints], scale)
+    else:
+        data = _Chunk(a_ints, b_ints, list(map(Decimal, a_ints)), list(map(Decimal, b_ints)), scale)
+    checks, count, mismatches = 0, 0, []
+    for name, command in commands.items():
+        expected = _reference(name, a_ints, b_ints, scale)
+        for path in paths:
+            def report(row, want, got, name=name, path=path):
+                nonlocal count
+                count += 1
+                if len(mismatches) < max_mismatches:
+                    mismatches.append(Mismatch(name, path, chunk, row, data.a[row], data.b[row], want, got))
+            CHECKS[path](name, command, data, expected, report)
+            checks += size
+    return checks, count, mismatches
+
+
+def run(records: int, seed: int = 0, chunk_size: int = 10000, workers: int = 0, kind: str = 'process',
+        digits: int = 2, scale: int = 0, paths: Sequence[str] = PATHS,
+        commands: Optional[Dict[str, Command]] = None, max_mismatches: int = 100) -> FuzzReport:
+    """
+    Check ``records`` random operand pairs against every command.
+
+    Args:
+        records: Operand pairs to generate.
+        seed: RNG seed; the same seed, chunk_size and backend reproduce the same operands.
+        chunk_size: Pairs generated and checked per task.
+        workers: Worker count; 0 checks every chunk in this process.
+        kind: 'process' or 'thread' workers.
+        digits: Operands are integers with up to this many digits, ...
+        scale: ... divided by 10**scale.
+        paths: Any of 'scalar', 'exact' and 'float'.
+        commands: Commands to check by name; defaults to the arithmetic plugins.
+        max_mismatches: How many mismatching rows to keep in the report (all are counted).
+    """
+    unknown = set(paths) - set(PATHS)
+    if unknown:
+        raise ValueError(f"Unknown fuzz path: {', '.join(sorted(unknown))}")
+    started = time.perf_counter()
+    sizes = [min(chunk_size, records - start) for start in range(0, records, chunk_size)]
+    options = dict(digits=digits, scale=scale, commands=commands, paths=tuple(paths), max_mismatches=max_mismatches)
+    checks, count, mismatches = 0, 0, []
+
+    def collect(outcome):
+        nonlocal checks, count
+        checks += outcome[0]
+        count += outcome[1]
+        mismatches.extend(outcome[2][:max_mismatches - len(mismatches)])
+
+    if workers <= 0:
+        for chunk, size in enumerate(sizes):
+            collect(check_chunk(seed, chunk, size, **options))
+    else:
+        executor_class = ProcessPoolExecutor if kind == 'process' else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            pending = deque()
+            for chunk, size in enumerate(sizes):
+                if len(pending) >= workers * 2:
+                    collect(pending.popleft().result())
+                pending.append(executor.submit(check_chunk, seed, chunk, size, **options))
+            while pending:
+                collect(pending.popleft().result())
+    return FuzzReport(seed, records, checks, count, tuple(mismatches), time.perf_counter() - started,
+                      'numpy' if numpy() is not None else 'random')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m app.fuzz', description="Fuzz the arithmetic commands")
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=0, help="worker processes (default: check in-process)")
+    parser.add_argument('--digits', type=int, default=2)
+    parser.add_argument('--scale', type=int, default=0)
+    parser.add_argument('--paths', default=','.join(PATHS), help="comma separated: scalar,exact,float")
+    args = parser.parse_args(argv)
+    report = run(args.records, args.seed, args.chunk_size, args.workers, digits=args.digits, scale=args.scale,
+                 paths=args.paths.split(','))
+    print(f"{report.records} records, {report.checks} checks in {report.seconds:.2f}s "
+          f"({report.records_per_second:.0f} records/s, seed {report.seed}, {report.backend})")
+    for mismatch in report.mismatches:
+        print(f"MISMATCH {mismatch}")
+    print(f"{report.mismatch_count} mismatches")
+    return 0 if report.ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
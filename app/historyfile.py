@@ -0,0 +1,274 @@
+"""
+Historyfile Module
+
+Binary, columnar on-disk format for calculation history, read back through
+mmap without parsing.
+
+Layout (little endian)::
+
+    header   b'CALCHIST' | uint16 version | 6 bytes padding      (16 bytes)
+    name     b'NAME' | uint8 code | pad | uint16 length L         (8 bytes)
+             L bytes UTF-8 operation name, zero padded to 8 bytes
+    chunk    b'CHNK' | uint32 row count N                         (8 bytes)
+             N x uint8 operation code, zero padded to 8 bytes
+             N x float64 a
+             N x float64 b
+             N x float64 result (NaN when there is no result)
+             N x float64 timestamp
+    chunk    ...
+
+The four arithmetic operations have fixed codes 1-4. Any other operation gets
+the next free code the first time it is written, announced by a name record
+ahead of the chunk that uses it; once all 255 codes are taken, further names
+are stored as code 0 ("other").
+
+Writers buffer rows in ``array`` columns and append one chunk at a time, so
+writing is a handful of large writes and appending to an existing file is
+just adding chunks (after checking its header). Readers map the file and
+expose each chunk's columns as memoryviews; counting or filtering by
+operation works on the raw bytes.
+
+Operands and results are stored as float64, so this format is for scanning
+and analysis; the in-memory history keeps exact Decimals.
+"""
+
+import csv
+import math
+import mmap
+import os
+import struct
+from array import array
+from typing import IO, Iterable, Iterator, NamedTuple, Optional
+
+MAGIC = b'CALCHIST'
+VERSION = 2
+READABLE_VERSIONS = (1, 2)
+HEADER = struct.Struct('<8sH6x')
+CHUNK = struct.Struct('<4sI')
+CHUNK_MAGIC = b'CHNK'
+NAME = struct.Struct('<4sBxH')
+NAME_MAGIC = b'NAME'
+
+OPERATION_CODES = {'add': 1, 'subtract': 2, 'multiply': 3, 'divide': 4}
+OPERATION_NAMES = {code: name for name, code in OPERATION_CODES.items()}
+OTHER = 0
+MAX_CODE = 255
+
+
+def _padded(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _check_header(buffer, path: str, versions=READABLE_VERSIONS) -> int:
+    if len(buffer) < HEADER.size:
+        raise ValueError(f"{path} is not a calculation history file")
+    magic, version = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version not in versions:
+        raise ValueError(f"{path} is not a version {'/'.join(map(str, versions))} calculation history file")
+    return version
+
+
+def _index(buffer):
+    """Return the (offset, row count) of every chunk and the operation name of every code."""
+    chunks, names, offset, size = [], dict(OPERATION_NAMES), HEADER.size, len(buffer)
+    while offset < size:
+        if offset + CHUNK.size > size:
+            raise ValueError(f"Truncated history record at offset {offset}")
+        magic, count = CHUNK.unpack_from(buffer, offset)
+        if magic == NAME_MAGIC:
+            _, code, length = NAME.unpack_from(buffer, offset)
+            start = offset + NAME.size
+            offset = start + _padded(length)
+            if offset > size:
+                raise ValueError(f"Truncated history name at offset {start - NAME.size}")
+            names[code] = bytes(buffer[start:start + length]).decode('utf-8')
+            continue
+        if magic != CHUNK_MAGIC:
+            raise ValueError(f"Corrupt history chunk at offset {offset}")
+        end = offset + CHUNK.size + _padded(count) + 32 * count
+        if end > size:
+            raise ValueError(f"Truncated history chunk at offset {offset}")
+        chunks.append((offset + CHUNK.size, count))
+        offset = end
+    return chunks, names
+
+
+class Row(NamedTuple):
+    operation: str
+    a: float
+    b: float
+    result: float
+    timestamp: float
+
+
+class Chunk:
+    """Zero-copy views of one chunk's columns."""
+    __slots__ = ('ops', 'a', 'b', 'result', 'timestamp')
+
+    def __init__(self, view: memoryview, count: int):
+        offset = _padded(count)
+        self.ops = view[:count]
+        width = count * 8
+        self.a = view[offset:offset + width].cast('d')
+        self.b = view[offset + width:offset + 2 * width].cast('d')
+        self.result = view[offset + 2 * width:offset + 3 * width].cast('d')
+        self.timestamp = view[offset + 3 * width:offset + 4 * width].cast('d')
+
+    def __len__(self):
+        return len(self.ops)
+
+    def release(self):
+        for column in (self.ops, self.a, self.b, self.result, self.timestamp):
+            column.release()
+
+
+class HistoryWriter:
+    """
+    Append calculation records to a history file in chunks.
+
+    Args:
+        path: File to create, or to append to if it already exists.
+        chunk_size: Rows buffered in memory before a chunk is written.
+
+    Raises:
+        ValueError: If ``path`` exists but is not a current-version history file.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 65536):
+        self.chunk_size = chunk_size
+        self._codes = dict(OPERATION_CODES)
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            # Appending needs the file's header checked and the codes it has already assigned.
+            with open(path, 'rb') as existing, mmap.mmap(existing.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                _check_header(buffer, path, (VERSION,))
+                self._codes.update((name, code) for code, name in _index(buffer)[1].items() if code != OTHER)
+        self._file = open(path, 'ab')  # pylint: disable=consider-using-with
+        if not exists:
+            self._file.write(HEADER.pack(MAGIC, VERSION))
+        self._reset()
+
+    def _code(self, operation: str) -> int:
+        code = len(self._codes) + 1
+        if code > MAX_CODE:
+            return OTHER
+        name = operation.encode('utf-8')
+        self._file.write(NAME.pack(NAME_MAGIC, code, len(name)) + name + bytes(_padded(len(name)) - len(name)))
+        self._codes[operation] = code
+        return code
+
+    def _reset(self):
+        self._ops = array('B')
+        self._a, self._b, self._result, self._timestamp = array('d'), array('d'), array('d'), array('d')
+
+    def append(self, operation: str, a, b, result, timestamp: float):
+        code = self._codes.get(operation)
+        self._ops.append(self._code(operation) if code is None else code)
+        self._a.append(float(a))
+        self._b.append(float(b) if b is not None else math.nan)
+        self._result.append(float(result) if result is not None else math.nan)
+        self._timestamp.append(timestamp)
+        if len(self._ops) >= self.chunk_size:
+            self.flush()
+
+    def extend(self, records: Iterable):
+        """Append CalculationRecord-like objects (operation, a, b, result, timestamp)."""
+        for record in records:
+            self.append(record.operation, record.a, record.b, record.result, record.timestamp)
+
+    def flush(self):
+        count = len(self._ops)
+        if not count:
+            return
+        write = self._file.write
+        write(CHUNK.pack(CHUNK_MAGIC, count))
+        write(self._ops.tobytes())
+        write(bytes(_padded(count) - count))
+        for column in (self._a, self._b, self._result, self._timestamp):
+            write(column.tobytes())
+        self._reset()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_history(path: str, records: Iterable, chunk_size: int = 65536):
+    """Append every record to the history file at ``path``."""
+    with HistoryWriter(path, chunk_size) as writer:
+        writer.extend(records)
+
+
+class HistoryReader:
+    """Memory-mapped reader for a history file."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')  # pylint: disable=consider-using-with
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            _check_header(self._map, path)
+            self._chunks, self._names = _index(self._map)
+        except ValueError:
+            self.close()
+            raise
+        self._codes = {'other': OTHER, **{name: code for code, name in self._names.items()}}
+
+    def chunks(self) -> Iterator[Chunk]:
+        """Yield each chunk's columns as memoryviews over the mapped file."""
+        view = memoryview(self._map)
+        try:
+            for offset, count in self._chunks:
+                chunk = Chunk(view[offset:offset + _padded(count) + 32 * count], count)
+                try:
+                    yield chunk
+                finally:
+                    chunk.release()
+        finally:
+            view.release()
+
+    def __len__(self):
+        return sum(count for _, count in self._chunks)
+
+    def count(self, operation: Optional[str] = None) -> int:
+        """Count rows, optionally for one operation, by scanning the raw operation bytes."""
+        if operation is None:
+            return len(self)
+        if operation not in self._codes:
+            return 0
+        code = bytes([self._codes[operation]])
+        return sum(self._map[offset:offset + count].count(code) for offset, count in self._chunks)
+
+    def rows(self, operation: Optional[str] = None) -> Iterator[Row]:
+        """Yield rows, optionally only those for one operation."""
+        if operation is not None and operation not in self._codes:
+            return
+        wanted = None if operation is None else self._codes[operation]
+        names = self._names
+        for chunk in self.chunks():
+            ops, a, b, result, timestamp = chunk.ops, chunk.a, chunk.b, chunk.result, chunk.timestamp
+            for index in range(len(chunk)):
+                code = ops[index]
+                if wanted is None or code == wanted:
+                    yield Row(names.get(code, 'other'), a[index], b[index], result[index], timestamp[index])
+
+    def to_csv(self, output: IO[str], operation: Optional[str] = None):
+        """Stream the rows as CSV with a header line."""
+        writer = csv.writer(output)
+        writer.writerow(Row._fields)
+        writer.writerows(self.rows(operation))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,147 @@
+"""
+Logqueue Module
+
+Non-blocking logging for the hot path. enable_queue_logging() moves the root
+logger's handlers (the file and console handlers from logging.conf) behind a
+bounded queue: callers only enqueue a record, and a background listener
+thread writes records in batches. Stream and file handlers receive each batch
+as one write and one flush rather than a write and flush per record.
+
+When the queue is full, the 'drop' policy discards the new record (and counts
+it) so callers never wait on disk; the 'block' policy waits for space so no
+record is lost. stop() drains the queue, flushes and restores the original
+handlers.
+"""
+
+import logging
+import queue
+import threading
+from logging.handlers import BaseRotatingHandler, QueueHandler
+from typing import List
+
+POLICIES = ('drop', 'block')
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that drops or blocks when its bounded queue is full."""
+
+    def __init__(self, record_queue: queue.Queue, block: bool = False):
+        super().__init__(record_queue)
+        self.block = block
+        self.dropped = 0
+
+    def enqueue(self, record):
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener:
+    """Background thread that hands queued records to the real handlers in batches."""
+
+    _STOP = object()
+
+    def __init__(self, record_queue: queue.Queue, handlers: List[logging.Handler], batch_size: int = 256):
+        self.queue = record_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='log-listener', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write every queued record, flush the handlers and stop the thread."""
+        if self._thread is not None:
+            self.queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is self._STOP
+            records = [record for record in batch if record is not self._STOP]
+            if records:
+                for handler in self.handlers:
+                    self._emit_batch(handler, records)
+            if stop:
+                return
+
+    @staticmethod
+    def _emit_batch(handler: logging.Handler, records: List[logging.LogRecord]):
+        records = [record for record in records if record.levelno >= handler.level and handler.filter(record)]
+        if not records:
+            return
+        if not isinstance(handler, logging.StreamHandler):
+            for record in records:
+                handler.handle(record)
+            return
+        with handler.lock:
+            try:
+                if isinstance(handler, BaseRotatingHandler) and handler.shouldRollover(records[0]):
+                    handler.doRollover()
+                if handler.stream is None:
+                    handler.stream = handler._open()  # pylint: disable=protected-access
+                handler.stream.write(''.join(handler.format(record) + handler.terminator for record in records))
+                handler.stream.flush()
+            except Exception:  # pylint: disable=broad-except
+                handler.handleError(records[0])
+
+
+class QueueLogging:
+    """Handle returned by enable_queue_logging(); call stop() on shutdown."""
+
+    def __init__(self, root: logging.Logger, queue_handler: BoundedQueueHandler,
+                 listener: BatchingQueueListener, handlers: List[logging.Handler]):
+        self.root = root
+        self.queue_handler = queue_handler
+        self.listener = listener
+        self.handlers = handlers
+
+    @property
+    def dropped(self) -> int:
+        return self.queue_handler.dropped
+
+    def stop(self):
+        self.root.removeHandler(self.queue_handler)
+        self.listener.stop()
+        for handler in self.handlers:
+            self.root.addHandler(handler)
+
+
+def enable_queue_logging(maxsize: int = 10000, policy: str = 'drop', batch_size: int = 256,
+                         logger: logging.Logger = None) -> QueueLogging:
+    """
+    Route a logger's handlers (the root logger by default) through a bounded queue.
+
+    Args:
+        maxsize: Maximum queued records.
+        policy: 'drop' discards records when full, 'block' waits for space.
+        batch_size: Maximum records written per batch.
+
+    Returns:
+        QueueLogging: Call its stop() to drain, flush and restore the handlers.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown log queue policy: {policy}")
+    root = logger or logging.getLogger()
+    handlers = root.handlers[:]
+    for handler in handlers:
+        root.removeHandler(handler)
+    record_queue = queue.Queue(maxsize)
+    queue_handler = BoundedQueueHandler(record_queue, block=policy == 'block')
+    listener = BatchingQueueListener(record_queue, handlers, batch_size)
+    listener.start()
+    root.addHandler(queue_handler)
+    return QueueLogging(root, queue_handler, listener, handlers)
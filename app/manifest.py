@@ -0,0 +1,143 @@
+"""
+Manifest Module
+
+Builds and caches the plugin manifest: a mapping of command name to the
+``module:Class`` that implements it. The manifest is produced by reading the
+plugin sources with ``ast`` rather than importing them, and it is cached on
+disk together with a fingerprint (mtime and size of every plugin file). As
+long as the fingerprint matches, startup reads one small JSON file instead of
+scanning and importing every plugin package.
+
+load_registry() merges that manifest with the declared entry points (see
+app.plugins.ENTRY_POINTS) into the single name -> ``module:Class`` table the
+App registers from.
+"""
+
+import ast
+import importlib.util
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = os.path.join('__pycache__', 'manifest.json')
+
+
+def plugin_packages(plugins_path: str) -> Dict[str, str]:
+    """Map every plugin package name to its directory."""
+    packages = {}
+    for entry in os.scandir(plugins_path):
+        if entry.is_dir() and os.path.isfile(os.path.join(entry.path, '__init__.py')):
+            packages[entry.name] = entry.path
+    return packages
+
+
+def module_files(entry_points: Dict[str, str]) -> Dict[str, str]:
+    """Map each declared command to the source file of its module, located without importing the module."""
+    files = {}
+    for name, target in entry_points.items():
+        spec = importlib.util.find_spec(target.partition(':')[0])
+        if spec is not None and spec.has_location and spec.origin:
+            files[name] = spec.origin
+    return files
+
+
+def fingerprint(plugins_path: str, modules: Optional[Dict[str, str]] = None) -> Dict[str, list]:
+    """
+    Return the mtime and size of every Python file in every plugin package.
+
+    ``modules`` (command name to source file, see module_files) adds those files
+    too, keyed under the command name as if they were in a package of that name.
+    """
+    files = {}
+    for name, path in sorted(plugin_packages(plugins_path).items()):
+        for entry in os.scandir(path):
+            if entry.is_file() and entry.name.endswith('.py'):
+                stat = entry.stat()
+                files[f'{name}/{entry.name}'] = [stat.st_mtime_ns, stat.st_size]
+    for name, path in sorted((modules or {}).items()):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files[f'{name}/{os.path.basename(path)}'] = [stat.st_mtime_ns, stat.st_size]
+    return files
+
+
+def find_command_class(source: str) -> Optional[str]:
+    """Return the name of the first class in the source that derives from a *Command base."""
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.ClassDef):
+            for base in node.bases:
+                base_name = base.id if isinstance(base, ast.Name) else getattr(base, 'attr', '')
+                if base_name.endswith('Command'):
+                    return node.name
+    return None
+
+
+def scan(plugins_path: str, plugins_package: str) -> Dict[str, str]:
+    """Build the manifest from the plugin sources without importing them."""
+    entries = {}
+    for name, path in sorted(plugin_packages(plugins_path).items()):
+        with open(os.path.join(path, '__init__.py'), encoding='utf-8') as source:
+            try:
+                class_name = find_command_class(source.read())
+            except SyntaxError as e:
+                logging.error(f"Plugin '{name}' cannot be parsed: {e}")
+                continue
+        if class_name is None:
+            logging.warning(f"Plugin '{name}' does not define a command class.")
+            continue
+        entries[name] = f'{plugins_package}.{name}:{class_name}'
+    return entries
+
+
+def load_manifest(plugins_path: str, plugins_package: str, cache_path: Optional[str] = None) -> Dict[str, str]:
+    """
+    Return the plugin manifest, rebuilding the cached copy if any plugin changed.
+
+    Args:
+        plugins_path: Directory containing the plugin packages.
+        plugins_package: Dotted package name of that directory.
+        cache_path: Where to cache the manifest; defaults to the plugins' __pycache__.
+
+    Returns:
+        Dict[str, str]: Command name to ``module:Class``.
+    """
+    cache_path = cache_path or os.path.join(plugins_path, MANIFEST_FILE)
+    current = fingerprint(plugins_path)
+    try:
+        with open(cache_path, encoding='utf-8') as cache:
+            cached = json.load(cache)
+        if cached.get('version') == MANIFEST_VERSION and cached.get('fingerprint') == current:
+            return cached['entries']
+    except (OSError, ValueError):
+        pass
+    entries = scan(plugins_path, plugins_package)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as cache:
+            json.dump({'version': MANIFEST_VERSION, 'fingerprint': current, 'entries': entries}, cache)
+    except OSError as e:
+        logging.warning(f"Could not write plugin manifest {cache_path}: {e}")
+    logging.info("Plugin manifest rebuilt.")
+    return entries
+
+
+def load_registry(plugins_path: str, plugins_package: str, entry_points: Dict[str, str],
+                  cache_path: Optional[str] = None) -> Dict[str, str]:
+    """
+    Return every command once: declared entry points plus discovered plugin packages.
+
+    A package whose name is already declared is skipped with a warning, so a
+    name never resolves to two classes.
+    """
+    registry = dict(entry_points)
+    for name, target in load_manifest(plugins_path, plugins_package, cache_path).items():
+        if name in registry:
+            if registry[name] != target:
+                logging.warning(f"Plugin '{name}' ({target}) duplicates declared command {registry[name]}; skipped.")
+            continue
+        registry[name] = target
+    return registry
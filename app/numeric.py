@@ -0,0 +1,179 @@
+"""
+Numeric Module
+
+Numeric modes for the arithmetic commands. By default the commands use the
+thread's global Decimal context (28 digits); a NumericMode lets a command, or
+a single batch, trade precision for speed:
+
+* ``decimal[:prec[:rounding]]``: Decimal with an explicit precision and
+  rounding, e.g. ``decimal:12:ROUND_HALF_UP``. The Context is created once
+  and its bound methods are reused for every call.
+* ``fixed[:scale]``: fixed-point integers with ``scale`` decimal places
+  (default 6). Batches compute in integers and convert only the results
+  back to Decimals; single calls convert Decimals in and out.
+* ``float``: IEEE float64.
+
+Modes are parsed by get_mode(), which caches one instance per spec. App reads
+NUMERIC_MODE (all commands) and NUMERIC_MODE_<COMMAND> (e.g.
+NUMERIC_MODE_DIVIDE) from its settings.
+"""
+
+import decimal
+import operator
+from decimal import Context, Decimal
+from functools import lru_cache
+
+from app.commands.batch import BatchResult, apply_batch, decimal_column, divide_batch, to_decimal
+
+ZERO_DIVISION = "Cannot divide by zero"
+
+
+class NumericMode:
+    """Base class: subclasses provide add/subtract/multiply/divide and batch()."""
+    spec = ''
+
+    def apply(self, operation: str, a, b):
+        return getattr(self, operation)(a, b)
+
+    def batch(self, operation: str, a_values, b_values) -> BatchResult:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.spec!r})"
+
+
+class DecimalMode(NumericMode):
+    def __init__(self, prec: int = 28, rounding: str = decimal.ROUND_HALF_EVEN):
+        self.spec = f'decimal:{prec}:{rounding}'
+        self.context = Context(prec=prec, rounding=rounding)
+        self.add = self.context.add
+        self.subtract = self.context.subtract
+        self.multiply = self.context.multiply
+        self._divide = self.context.divide
+
+    def divide(self, a, b):
+        if b == 0:
+            raise ValueError(ZERO_DIVISION)
+        return self._divide(a, b)
+
+    def batch(self, operation: str, a_values, b_values) -> BatchResult:
+        a_column, b_column = decimal_column(a_values), decimal_column(b_values)
+        if operation != 'divide':
+            return apply_batch(getattr(self, operation), a_column, b_column)
+        mask = [b == 0 for b in b_column]
+        divide = self._divide
+        values = [None if failed else divide(a, b) for a, b, failed in zip(a_column, b_column, mask)]
+        return BatchResult(values, mask, {index: ZERO_DIVISION for index, failed in enumerate(mask) if failed})
+
+
+class FixedPointMode(NumericMode):
+    def __init__(self, scale: int = 6):
+        self.spec = f'fixed:{scale}'
+        self.scale = scale
+        self.unit = 10 ** scale
+        self._quantum = Decimal(1).scaleb(-scale)
+
+    def to_fixed(self, value) -> int:
+        """Round a number half-even to ``scale`` places and return it as a scaled integer."""
+        return int(to_decimal(value).quantize(self._quantum, rounding=decimal.ROUND_HALF_EVEN).scaleb(self.scale))
+
+    def from_fixed(self, value: int) -> Decimal:
+        return Decimal(value).scaleb(-self.scale)
+
+    def _multiply(self, a: int, b: int) -> int:
+        return _round_div(a * b, self.unit)
+
+    def _divide(self, a: int, b: int) -> int:
+        return _round_div(a * self.unit, b)
+
+    def _operator(self, operation: str):
+        return {'add': operator.add, 'subtract': operator.sub,
+                'multiply': self._multiply, 'divide': self._divide}[operation]
+
+    def apply(self, operation: str, a, b):
+        b_fixed = self.to_fixed(b)
+        if operation == 'divide' and b_fixed == 0:
+            raise ValueError(ZERO_DIVISION)
+        return self.from_fixed(self._operator(operation)(self.to_fixed(a), b_fixed))
+
+    def add(self, a, b):
+        return self.apply('add', a, b)
+
+    def subtract(self, a, b):
+        return self.apply('subtract', a, b)
+
+    def multiply(self, a, b):
+        return self.apply('multiply', a, b)
+
+    def divide(self, a, b):
+        return self.apply('divide', a, b)
+
+    def batch(self, operation: str, a_values, b_values) -> BatchResult:
+        """Compute in scaled integers and convert the results back to Decimals at the end."""
+        a_column = list(map(self.to_fixed, a_values))
+        b_column = list(map(self.to_fixed, b_values))
+        function, from_fixed = self._operator(operation), self.from_fixed
+        if operation != 'divide':
+            return BatchResult([from_fixed(value) for value in map(function, a_column, b_column)])
+        mask = [b == 0 for b in b_column]
+        values = [None if failed else from_fixed(function(a, b)) for a, b, failed in zip(a_column, b_column, mask)]
+        return BatchResult(values, mask, {index: ZERO_DIVISION for index, failed in enumerate(mask) if failed})
+
+
+def _round_div(numerator: int, denominator: int) -> int:
+    """Integer division rounding half to even, as Decimal's default rounding does."""
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if denominator < 0:
+        twice, denominator = -twice, -denominator
+    if twice > denominator or (twice == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+class FloatMode(NumericMode):
+    spec = 'float'
+
+    @staticmethod
+    def add(a, b):
+        return float(a) + float(b)
+
+    @staticmethod
+    def subtract(a, b):
+        return float(a) - float(b)
+
+    @staticmethod
+    def multiply(a, b):
+        return float(a) * float(b)
+
+    @staticmethod
+    def divide(a, b):
+        if b == 0:
+            raise ValueError(ZERO_DIVISION)
+        return float(a) / float(b)
+
+    def batch(self, operation: str, a_values, b_values) -> BatchResult:
+        if operation == 'divide':
+            return divide_batch(a_values, b_values, exact=False)
+        function = {'add': operator.add, 'subtract': operator.sub, 'multiply': operator.mul}[operation]
+        return apply_batch(function, a_values, b_values, exact=False)
+
+
+@lru_cache(maxsize=None)
+def get_mode(spec: str) -> NumericMode:
+    """Return the (shared) NumericMode for a spec such as 'decimal:12', 'fixed:4' or 'float'."""
+    kind, *params = spec.strip().lower().split(':')
+    try:
+        if kind == 'decimal':
+            prec = int(params[0]) if params and params[0] else 28
+            rounding = params[1].upper() if len(params) > 1 else decimal.ROUND_HALF_EVEN
+            if not hasattr(decimal, rounding) or not rounding.startswith('ROUND_'):
+                raise ValueError(rounding)
+            return DecimalMode(prec, rounding)
+        if kind == 'fixed':
+            return FixedPointMode(int(params[0]) if params and params[0] else 6)
+    except ValueError:
+        raise ValueError(f"Invalid numeric mode: {spec}") from None
+    if kind == 'float' and not params:
+        return FloatMode()
+    raise ValueError(f"Invalid numeric mode: {spec}")
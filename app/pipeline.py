@@ -0,0 +1,89 @@
+"""
+Pipeline Module
+
+Non-interactive command runner. Commands are read one line at a time from a
+file or stdin and flow through a chain of generators (read -> parse ->
+dispatch -> write), so memory use stays constant no matter how large the input
+is. A bad line produces an error line in the output and the run continues.
+
+Input lines look like the REPL's: ``<command> [operand ...]``. Blank lines and
+lines starting with ``#`` are skipped.
+"""
+
+import logging
+import sys
+import time
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.commands.dispatch import DispatchTable, split_line
+
+BUFFER_SIZE = 1 << 20
+
+
+class Outcome(NamedTuple):
+    """Result of one input line: either a value or an error message."""
+    line_no: int
+    value: object = None
+    error: Optional[str] = None
+
+
+def read_lines(stream: IO[str]) -> Iterator[Tuple[int, str]]:
+    """Yield (line number, stripped line) for every non-blank, non-comment line."""
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line_no, line
+
+
+def parse_lines(lines: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str, List[str]]]:
+    """Split each line into a command name and its operand tokens."""
+    for line_no, line in lines:
+        yield (line_no, *split_line(line))
+
+
+def dispatch(parsed: Iterable[Tuple[int, str, List[str]]], handler) -> Iterator[Outcome]:
+    """Run every parsed line through a DispatchTable, turning failures into error outcomes."""
+    table = DispatchTable(handler)
+    for line_no, name, tokens in parsed:
+        try:
+            yield Outcome(line_no, table.execute(name, tokens))
+        except Exception as e:  # pylint: disable=broad-except
+            yield Outcome(line_no, error=str(e))
+
+
+def write_outcomes(outcomes: Iterable[Outcome], output: IO[str]) -> dict:
+    """Write one line per outcome and return run statistics."""
+    stats = {'lines': 0, 'ok': 0, 'errors': 0}
+    write = output.write
+    for outcome in outcomes:
+        stats['lines'] += 1
+        if outcome.error is None:
+            stats['ok'] += 1
+            if outcome.value is not None:
+                write(f"{outcome.value}\n")
+        else:
+            stats['errors'] += 1
+            write(f"Error (line {outcome.line_no}): {outcome.error}\n")
+    output.flush()
+    return stats
+
+
+def run(source: str, handler, output: Optional[IO[str]] = None) -> dict:
+    """
+    Stream the commands in ``source`` (a path, or '-' for stdin) through a CommandHandler.
+
+    Returns:
+        dict: Line, success and error counts plus elapsed seconds and lines per second.
+    """
+    output = output or sys.stdout
+    started = time.perf_counter()
+    if source == '-':
+        stats = write_outcomes(dispatch(parse_lines(read_lines(sys.stdin)), handler), output)
+    else:
+        with open(source, encoding='utf-8', buffering=BUFFER_SIZE) as stream:
+            stats = write_outcomes(dispatch(parse_lines(read_lines(stream)), handler), output)
+    stats['seconds'] = time.perf_counter() - started
+    stats['lines_per_second'] = stats['lines'] / stats['seconds'] if stats['seconds'] else 0.0
+    logging.info(f"Batch finished: {stats['lines']} lines ({stats['errors']} errors) "
+                 f"in {stats['seconds']:.3f}s, {stats['lines_per_second']:.0f} lines/s.")
+    return stats
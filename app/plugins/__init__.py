@@ -0,0 +1,20 @@
+"""
+Plugins Package
+
+The canonical command registry. Plugin packages (``app/plugins/<name>/``)
+are discovered by the manifest; command classes that live in plain modules
+are declared here, entry-point style, as ``name = module:Class``. App merges
+the two into one table, so every command name is bound to exactly one class
+and nothing is imported until a command first runs.
+
+Keep this module free of imports: app.commands reads ENTRY_POINTS to resolve
+its ``AddCommand``-style re-exports.
+"""
+
+ENTRY_POINTS = {
+    'add': 'app.plugins.add_command:AddCommand',
+    'subtract': 'app.plugins.subtract_command:SubtractCommand',
+    'multiply': 'app.plugins.multiply_command:MultiplyCommand',
+    'divide': 'app.plugins.divide_command:DivideCommand',
+    'menu': 'app.plugins.menu_command:MenuCommand',
+}
@@ -0,0 +1,23 @@
+from decimal import Decimal
+from app.aggregate import aggregate
+from app.calculations import calculations
+from app.commands import Command
+from app.commands.dispatch import parse_operand
+
+class AggregateCommand(Command):
+    raw_args = True
+
+    def execute(self, name: str, *values, exact: bool = True):
+        """
+        Reduce many values in one call, e.g. ``aggregate mean 1 2 3 4``.
+
+        ``values`` are REPL tokens or numbers, or a single iterable, buffer or NumPy array.
+        One history entry is recorded per call, with the number of values as its first operand.
+        """
+        if len(values) == 1 and not isinstance(values[0], (str, bytes)) and hasattr(values[0], '__iter__'):
+            values = values[0]
+        elif values and isinstance(values[0], str):
+            values = [parse_operand(value) for value in values]
+        result, count = aggregate(name, values, exact)
+        calculations.record(name, Decimal(count), None, result)
+        return result
@@ -1,8 +1,19 @@
 from decimal import Decimal
 from app.commands import Command
+from app.commands.batch import BatchResult, divide_batch
 
 class DivideCommand(Command):
+    pure = True
+
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
         if b == 0:
             raise ValueError("Cannot divide by zero")
+        if self.numeric is not None:
+            return self.numeric.divide(a, b)
         return a / b
+
+    def execute_batch(self, a_values, b_values, exact: bool = True, numeric=None) -> BatchResult:
+        numeric = numeric or self.numeric
+        if numeric is not None:
+            return numeric.batch('divide', a_values, b_values)
+        return divide_batch(a_values, b_values, exact=exact)
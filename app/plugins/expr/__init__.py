@@ -0,0 +1,27 @@
+import re
+
+from app.commands import Command
+from app.expression import compile_expression
+
+ASSIGNMENT = re.compile(r'[A-Za-z_]\w*=[^=]')
+
+class ExpressionCommand(Command):
+    pure = True
+    raw_args = True
+    raw_line = True
+
+    def execute(self, expression: str, *assignments: str, **variables):
+        """Evaluate an expression; variables come as keywords or 'name=value' strings, e.g. expr (a+b)*c a=1 b=2 c=3.
+
+        From the REPL the whole line arrives as ``expression``; trailing 'name=value' words are split off it.
+        """
+        words = expression.split()
+        cut = len(words)
+        while cut > 1 and ASSIGNMENT.match(words[cut - 1]):
+            cut -= 1
+        if cut < len(words):
+            expression, assignments = ' '.join(words[:cut]), (*words[cut:], *assignments)
+        for assignment in assignments:
+            name, _, value = assignment.partition('=')
+            variables[name.strip()] = value.strip()
+        return compile_expression(expression).evaluate(variables)
@@ -1,10 +1,13 @@
 import logging
 from app.commands import Command
-from icecream import ic
-from app import App
+from app.debug import trace
+
+def _app_class():
+    from app import App  # pylint: disable=import-outside-toplevel
+    return App
 
 class GreetCommand(Command):
     def execute(self):
         logging.info("Hello, World!")
-        logging.debug(ic(App))
+        trace('App', _app_class)
         print("Hello, World!")
@@ -1,7 +1,12 @@
 from app.commands import Command
 
 class MenuCommand(Command):
-    def execute(self, commands_dict):
+    # The CommandHandler whose commands are listed when none are passed; App sets it on load.
+    handler = None
+
+    def execute(self, commands_dict=None):
+        if commands_dict is None:
+            commands_dict = self.handler.commands if self.handler is not None else {}
         print("Available commands:")
         for command in commands_dict.keys():
             print(f" - {command}")
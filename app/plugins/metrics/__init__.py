@@ -0,0 +1,18 @@
+from app.commands import Command
+from app.commands.metrics import metrics
+
+class MetricsCommand(Command):
+    raw_args = True
+
+    def execute(self, action: str = 'show'):
+        if action == 'on':
+            metrics.enable()
+            print("Metrics enabled.")
+        elif action == 'off':
+            metrics.disable()
+            print("Metrics disabled.")
+        elif action == 'reset':
+            metrics.reset()
+            print("Metrics reset.")
+        else:
+            print(metrics.render_prometheus(), end='')
@@ -1,6 +1,18 @@
+import operator
 from decimal import Decimal
 from app.commands import Command
+from app.commands.batch import BatchResult, apply_batch
 
 class MultiplyCommand(Command):
+    pure = True
+
     def execute(self, a: Decimal, b: Decimal) -> Decimal:
+        if self.numeric is not None:
+            return self.numeric.multiply(a, b)
         return a * b
+
+    def execute_batch(self, a_values, b_values, exact: bool = True, numeric=None) -> BatchResult:
+        numeric = numeric or self.numeric
+        if numeric is not None:
+            return numeric.batch('multiply', a_values, b_values)
+        return apply_batch(operator.mul, a_values, b_values, exact=exact)
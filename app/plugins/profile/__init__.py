@@ -0,0 +1,34 @@
+import os
+
+from app.commands import Command
+from app.commands.profiler import MODES, profiler
+
+DEFAULT_DUMP_PATH = os.path.join('logs', 'profile.folded')
+
+class ProfileCommand(Command):
+    """``profile on [sampling|deterministic] [command ...]``, ``profile off``, ``profile dump [path]``."""
+    raw_args = True
+
+    def execute(self, action: str = 'show', *args):
+        if action == 'on':
+            mode = args[0] if args and args[0] in MODES else 'sampling'
+            commands = args[1:] if args and args[0] in MODES else args
+            profiler.enable(mode, commands)
+            print(f"Profiling enabled ({mode}{': ' + ', '.join(commands) if commands else ''}).")
+        elif action == 'off':
+            profiler.disable()
+            print("Profiling disabled.")
+        elif action == 'reset':
+            profiler.reset()
+            print("Profile reset.")
+        elif action == 'dump':
+            path = args[0] if args else DEFAULT_DUMP_PATH
+            try:
+                summary = profiler.dump(path)
+            except OSError as e:
+                print(f"Cannot write the profile to {path}: {e.strerror or e}")
+                return
+            print(summary, end='')
+            print(f"Collapsed stacks written to {path}.")
+        else:
+            print(profiler.render_summary(), end='')
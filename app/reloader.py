@@ -0,0 +1,143 @@
+"""
+Reloader Module
+
+Hot plugin reload for long-running processes (the REPL and the server).
+PluginWatcher polls the plugin directory with the manifest's fingerprint
+(one scandir and stat per plugin file, plus one stat per declared entry-point
+module; nothing imported) and reports which commands were added, changed or
+removed. reload_commands() resolves those names through
+app.manifest.load_registry, exactly as startup does, so a package whose name
+collides with a declared entry point is still rejected; it re-imports just
+the modules behind them and returns fresh command objects. The caller swaps
+them into the CommandHandler in one assignment, so commands already running
+keep the object they started with.
+
+Polling is stdlib only and its cost is measured: every poll is timed, and if
+polls take more than ``max_overhead`` of the interval (1% by default) the
+interval is stretched to keep the overhead within that bound.
+"""
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from app.commands import Command
+from app.manifest import fingerprint, load_registry, module_files
+
+
+def _by_package(files: Dict[str, list]) -> Dict[str, Dict[str, list]]:
+    packages: Dict[str, Dict[str, list]] = {}
+    for path, stamp in files.items():
+        package, _, file_name = path.partition('/')
+        packages.setdefault(package, {})[file_name] = stamp
+    return packages
+
+
+def diff_fingerprints(old: Dict[str, list], new: Dict[str, list]) -> Tuple[Set[str], Set[str]]:
+    """Return (changed or added packages, removed packages) between two fingerprints."""
+    old_packages, new_packages = _by_package(old), _by_package(new)
+    changed = {name for name, files in new_packages.items() if old_packages.get(name) != files}
+    return changed, set(old_packages) - set(new_packages)
+
+
+def reload_commands(plugins_path: str, plugins_package: str, names: Iterable[str],
+                    entry_points: Optional[Dict[str, str]] = None,
+                    cache_path: Optional[str] = None) -> Dict[str, Command]:
+    """
+    Re-import the modules behind the named commands and instantiate them.
+
+    Names are resolved with load_registry(), so declared entry points win over
+    plugin packages of the same name. A command that fails to import, or a
+    package that defines no command, is logged and left out of the result, so
+    the caller keeps whatever it had registered before.
+    """
+    importlib.invalidate_caches()
+    registry = load_registry(plugins_path, plugins_package, entry_points or {}, cache_path)
+    commands = {}
+    for name in sorted(names):
+        target = registry.get(name)
+        if target is None:
+            logging.warning(f"Plugin '{name}' does not define a command class.")
+            continue
+        module_name, _, class_name = target.partition(':')
+        try:
+            for loaded in [key for key in sys.modules if key == module_name or key.startswith(module_name + '.')]:
+                del sys.modules[loaded]
+            commands[name] = getattr(importlib.import_module(module_name), class_name)()
+        except Exception as e:  # pylint: disable=broad-except
+            logging.error(f"Reloading plugin '{name}' failed, keeping the loaded version: {e}")
+    return commands
+
+
+class PluginWatcher:
+    """
+    Poll a plugin directory and report changed plugin packages and entry-point modules.
+
+    Args:
+        plugins_path: Directory containing the plugin packages.
+        on_change: Called with (changed or added names, removed names) after a poll finds changes.
+        interval: Seconds between polls.
+        max_overhead: Largest fraction of wall time polling may take; the interval grows to respect it.
+        entry_points: Declared commands (name to ``module:Class``) whose modules are watched too.
+    """
+
+    def __init__(self, plugins_path: str, on_change: Callable[[Set[str], Set[str]], None],
+                 interval: float = 1.0, max_overhead: float = 0.01, entry_points: Optional[Dict[str, str]] = None):
+        self.plugins_path = plugins_path
+        self.on_change = on_change
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.polls = 0
+        self.last_poll_seconds = 0.0
+        self.max_poll_seconds = 0.0
+        self._modules = module_files(entry_points or {})
+        self._fingerprint = fingerprint(plugins_path, self._modules)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def effective_interval(self) -> float:
+        """The interval actually used: ``interval``, stretched if polls are slow."""
+        return max(self.interval, self.last_poll_seconds / self.max_overhead)
+
+    def poll(self) -> bool:
+        """Check once for changes, calling on_change if there are any; returns whether there were."""
+        started = time.perf_counter()
+        current = fingerprint(self.plugins_path, self._modules)
+        changed, removed = diff_fingerprints(self._fingerprint, current) if current != self._fingerprint else ((), ())
+        self.last_poll_seconds = time.perf_counter() - started
+        self.max_poll_seconds = max(self.max_poll_seconds, self.last_poll_seconds)
+        self.polls += 1
+        if not (changed or removed):
+            return False
+        self._fingerprint = current
+        logging.info(f"Plugin changes detected: changed {sorted(changed)}, removed {sorted(removed)}")
+        self.on_change(set(changed), set(removed))
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.effective_interval):
+            try:
+                self.poll()
+            except Exception as e:  # pylint: disable=broad-except
+                logging.error(f"Plugin watcher poll failed: {e}")
+
+    def start(self) -> 'PluginWatcher':
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='plugin-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {'polls': self.polls, 'last_poll_seconds': self.last_poll_seconds,
+                'max_poll_seconds': self.max_poll_seconds, 'interval': self.effective_interval}
@@ -0,0 +1,100 @@
+"""
+Server Module
+
+A long-running calculation server so jobs can reuse one warm App (logging,
+settings and plugins already loaded) instead of starting the REPL per job.
+
+Protocol: UTF-8, one request per line, using the same syntax and command
+names as the REPL and batch mode::
+
+    add 2 3\\n          ->  OK 5\\n
+    divide 1 0\\n       ->  ERR Cannot divide by zero\\n
+    QUIT\\n             ->  (connection closed)
+
+Connections are persistent and requests may be pipelined: a client can send
+many lines before reading, and responses come back one per request, in order.
+Every line gets a response, so a blank line, a ``#`` comment or a line that is
+not UTF-8 is answered with an ``ERR`` line rather than skipped. An address
+given as ``(host, port)`` serves TCP; a string path serves a Unix socket.
+"""
+
+import logging
+import os
+import socketserver
+import stat
+from typing import Tuple, Union
+
+from app.commands.dispatch import DispatchTable
+
+Address = Union[Tuple[str, int], str]
+
+
+class CalculationRequestHandler(socketserver.StreamRequestHandler):
+    """Serve one persistent connection until the client sends QUIT or disconnects."""
+
+    def handle(self):
+        table = DispatchTable(self.server.command_handler)
+        for raw in self.rfile:
+            try:
+                line = raw.decode('utf-8').strip()
+            except UnicodeDecodeError:
+                response = 'ERR Request is not valid UTF-8'
+            else:
+                if line == 'QUIT':
+                    return
+                response = _respond(table, line)
+            self.wfile.write(response.encode('utf-8') + b'\n')
+
+
+def _respond(table: DispatchTable, line: str) -> str:
+    """Run one request line and return its response, without the newline."""
+    if not line or line.startswith('#'):
+        return 'ERR Empty request'
+    try:
+        value = table.execute_line(line)
+    except Exception as e:  # pylint: disable=broad-except
+        return f'ERR {e}'
+    return 'OK' if value is None else f'OK {value}'
+
+
+class TCPCalculationServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class UnixCalculationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def create_server(command_handler, address: Address):
+    """
+    Bind a threaded server for ``command_handler`` to ``address``.
+
+    Use port 0 to let the OS choose a free port; the bound address is
+    available as ``server.server_address``. A stale Unix socket at the path is
+    replaced, but any other existing file raises FileExistsError.
+    """
+    if isinstance(address, str):
+        try:
+            mode = os.stat(address).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"Refusing to replace {address}: it exists and is not a socket")
+            os.unlink(address)
+        server = UnixCalculationServer(address, CalculationRequestHandler)
+    else:
+        server = TCPCalculationServer(address, CalculationRequestHandler)
+    server.command_handler = command_handler
+    logging.info(f"Calculation server listening on {server.server_address}.")
+    return server
+
+
+def parse_address(value: str) -> Address:
+    """Turn 'host:port' into a TCP address; anything else is a Unix socket path."""
+    host, sep, port = value.rpartition(':')
+    if sep and port.isdigit():
+        return host or '127.0.0.1', int(port)
+    return value
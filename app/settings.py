@@ -0,0 +1,207 @@
+"""
+Settings Module
+
+Typed, immutable application settings. Only the keys the application reads
+are parsed, from the process environment layered over ``.env`` (the
+environment wins, as with load_dotenv). ``.env`` is read once per process
+and the parsed Settings is a plain NamedTuple, so it can be pickled to
+worker processes instead of being re-parsed there.
+
+Startup can skip ``.env`` and the environment entirely by pointing
+SETTINGS_SNAPSHOT at a snapshot written by ``python -m app.settings PATH``.
+A snapshot records the ``.env`` fingerprint it was built from and is
+ignored, with a warning, once ``.env`` changes.
+"""
+
+import json
+import logging
+import os
+import sys
+from typing import Mapping, NamedTuple, Optional, Tuple
+
+from dotenv import dotenv_values, find_dotenv
+
+from app.calculations import DEFAULT_CAPACITY
+
+SNAPSHOT_VERSION = 1
+NUMERIC_MODE_PREFIX = 'NUMERIC_MODE_'
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+def _flag(value: str) -> bool:
+    return value.strip().lower() in TRUE_VALUES
+
+
+def _upper(value: str) -> str:
+    return value.strip().upper()
+
+
+def _profile_mode(value: str) -> Optional[str]:
+    """PROFILE: 'sampling' or 'deterministic'; a true flag means sampling and a false one means off."""
+    value = value.strip().lower()
+    if value in TRUE_VALUES:
+        return 'sampling'
+    if value in ('0', 'false', 'no', 'off'):
+        return None
+    if value not in ('sampling', 'deterministic'):
+        raise ValueError(value)
+    return value
+
+
+def _names(value: str) -> Tuple[str, ...]:
+    return tuple(name.strip() for name in value.split(',') if name.strip())
+
+
+class Settings(NamedTuple):
+    """
+    Parsed settings; each field is read from the upper-cased environment key
+    of the same name (``history_capacity`` from HISTORY_CAPACITY, ...).
+    ``numeric_modes`` holds the NUMERIC_MODE_<COMMAND> keys as (command, spec) pairs.
+    """
+    environment: str = 'TESTING'
+    log_level: Optional[str] = None
+    log_queue: bool = False
+    log_queue_size: int = 10000
+    log_queue_policy: str = 'drop'
+    history_capacity: int = DEFAULT_CAPACITY
+    history_policy: str = 'ring'
+    result_cache_size: int = 0
+    metrics_enabled: bool = False
+    metrics_slow_ms: float = 10.0
+    async_max_concurrency: int = 32
+    pool_max_workers: Optional[int] = None
+    pool_kind: str = 'process'
+    pool_chunksize: int = 1024
+    plugin_manifest: Optional[str] = None
+    plugin_reload: bool = False
+    plugin_reload_interval: float = 1.0
+    numeric_mode: Optional[str] = None
+    profile: Optional[str] = None
+    profile_commands: Tuple[str, ...] = ()
+    profile_interval_ms: float = 5.0
+    numeric_modes: Tuple[Tuple[str, str], ...] = ()
+
+    def get(self, key: str, default=None):
+        """Mapping-style lookup by environment key, e.g. ``get('HISTORY_CAPACITY')``."""
+        if key.startswith(NUMERIC_MODE_PREFIX):
+            return dict(self.numeric_modes).get(key[len(NUMERIC_MODE_PREFIX):].lower(), default)
+        value = getattr(self, key.lower(), None) if key.lower() in self._fields else None
+        return default if value is None else value
+
+    def save(self, path: str, dotenv_path: Optional[str] = None):
+        """Write a snapshot of these settings for SETTINGS_SNAPSHOT."""
+        snapshot = {'version': SNAPSHOT_VERSION, 'dotenv': dotenv_fingerprint(dotenv_path),
+                    'settings': self._asdict()}
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as output:
+            json.dump(snapshot, output)
+        os.replace(temporary, path)
+
+    @classmethod
+    def from_mapping(cls, values: Mapping[str, str]) -> 'Settings':
+        """Parse the known keys of an environment-style mapping; empty values count as unset."""
+        parsed = {}
+        for field, default in cls._field_defaults.items():
+            raw = values.get(field.upper())
+            if field == 'numeric_modes' or raw is None or raw == '':
+                continue
+            parser = PARSERS.get(field, type(default))
+            try:
+                parsed[field] = parser(raw)
+            except ValueError:
+                raise ValueError(f"Invalid setting {field.upper()}={raw!r}") from None
+        parsed['numeric_modes'] = tuple(sorted((key[len(NUMERIC_MODE_PREFIX):].lower(), value)
+                                               for key, value in values.items()
+                                               if key.startswith(NUMERIC_MODE_PREFIX) and value))
+        return cls(**parsed)
+
+    @classmethod
+    def from_snapshot(cls, path: str, dotenv_path: Optional[str] = None) -> Optional['Settings']:
+        """Load a snapshot, or return None if it is missing, unreadable or stale."""
+        try:
+            with open(path, encoding='utf-8') as source:
+                snapshot = json.load(source)
+            if snapshot.get('version') != SNAPSHOT_VERSION:
+                return None
+            if snapshot.get('dotenv') != dotenv_fingerprint(dotenv_path):
+                logging.warning(f"Settings snapshot {path} is older than .env; ignoring it.")
+                return None
+            values = snapshot['settings']
+            values['numeric_modes'] = tuple(map(tuple, values.get('numeric_modes', ())))
+            values['profile_commands'] = tuple(values.get('profile_commands', ()))
+            return cls(**values)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+PARSERS = {
+    'environment': _upper,
+    'log_level': _upper,
+    'log_queue': _flag,
+    'metrics_enabled': _flag,
+    'metrics_slow_ms': float,
+    'pool_max_workers': int,
+    'plugin_manifest': str,
+    'plugin_reload': _flag,
+    'numeric_mode': str,
+    'profile': _profile_mode,
+    'profile_commands': _names,
+}
+
+_dotenv_cache = {}
+_dotenv_paths = {}
+
+
+def _find_dotenv(dotenv_path: Optional[str], refresh: bool = False) -> str:
+    # find_dotenv walks the call stack and the directory tree, so remember its answer.
+    if dotenv_path:
+        return dotenv_path
+    if refresh or None not in _dotenv_paths:
+        _dotenv_paths[None] = find_dotenv()
+    return _dotenv_paths[None]
+
+
+def dotenv_fingerprint(dotenv_path: Optional[str] = None) -> Optional[list]:
+    """Return [mtime_ns, size] of the .env file, or None when there is none."""
+    path = _find_dotenv(dotenv_path)
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def read_dotenv(dotenv_path: Optional[str] = None, refresh: bool = False) -> dict:
+    """Return the .env values, reading the file once per process unless ``refresh`` is set."""
+    path = _find_dotenv(dotenv_path, refresh)
+    if refresh or path not in _dotenv_cache:
+        _dotenv_cache[path] = {key: value for key, value in dotenv_values(path).items() if value is not None} if path else {}
+    return _dotenv_cache[path]
+
+
+def load_settings(snapshot: Optional[str] = None, dotenv_path: Optional[str] = None,
+                  refresh: bool = False) -> Settings:
+    """
+    Load the application settings.
+
+    Args:
+        snapshot: Snapshot file to try first; defaults to $SETTINGS_SNAPSHOT.
+        dotenv_path: The .env file; by default it is found the way load_dotenv finds it.
+        refresh: Re-read .env even if this process already read it (used on reload).
+
+    Returns:
+        Settings: From the snapshot if it is current, otherwise from .env and the environment.
+    """
+    snapshot = snapshot or os.environ.get('SETTINGS_SNAPSHOT')
+    if snapshot:
+        settings = Settings.from_snapshot(snapshot, dotenv_path)
+        if settings is not None:
+            return settings
+    return Settings.from_mapping({**read_dotenv(dotenv_path, refresh), **os.environ})
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m app.settings SNAPSHOT_PATH")
+    Settings.from_mapping({**read_dotenv(), **os.environ}).save(sys.argv[1])
+    print(f"Settings snapshot written to {sys.argv[1]}")
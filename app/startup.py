@@ -0,0 +1,183 @@
+"""
+Startup Module
+
+Frozen startup images for short-lived CLI runs. ``python -m app.startup PATH``
+resolves what App() and load_plugins() otherwise work out on every start
+(the settings, the logging configuration in logging.conf and the command
+registry) and pickles it into one file. App loads it with a single read when
+STARTUP_IMAGE points at it: no .env parsing, no configparser, no manifest.
+
+An image is only used if its format version, the Python version and the
+Settings fields match, and none of its sources (logging.conf, .env, the
+declared entry points and the plugin packages) changed since it was frozen.
+Otherwise App starts the normal way and logs why. Like a settings snapshot,
+an image does not see later changes to the process environment.
+
+An image is unpickled, so loading one can run arbitrary code: point
+STARTUP_IMAGE only at files you built yourself and keep them as trusted as
+logging.conf, which fileConfig likewise evaluates.
+
+StartupProfile records the wall time of each startup phase; ``python main.py
+--profile-startup`` prints it.
+"""
+
+import configparser
+import logging
+import logging.handlers  # pylint: disable=unused-import  # build_handler resolves 'handlers.X'
+import os
+import pickle
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.manifest import fingerprint
+from app.settings import Settings, dotenv_fingerprint
+
+IMAGE_VERSION = 1
+LOGGING_CONF = 'logging.conf'
+ENTRY_POINTS_SOURCE = os.path.join(os.path.dirname(__file__), 'plugins', '__init__.py')
+
+# A module logger: these warnings can come before logging is configured, and must not trigger basicConfig().
+logger = logging.getLogger(__name__)
+
+
+class StartupImage(NamedTuple):
+    settings: Settings
+    logging_config: Optional[dict]
+    registry: Dict[str, str]
+    sources: dict
+
+
+def _header() -> dict:
+    return {'version': IMAGE_VERSION, 'python': tuple(sys.version_info[:2]), 'fields': Settings._fields}
+
+
+def _stamp(path: str) -> Optional[list]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def sources(plugins_path: str, logging_conf: str = LOGGING_CONF, dotenv_path: Optional[str] = None) -> dict:
+    """Fingerprint everything an image is built from."""
+    return {'logging.conf': _stamp(logging_conf), '.env': dotenv_fingerprint(dotenv_path),
+            'entry_points': _stamp(ENTRY_POINTS_SOURCE), 'plugins': fingerprint(plugins_path)}
+
+
+def build_handler(handler_class: str, args: str = '()', kwargs: str = '{}') -> logging.Handler:
+    """dictConfig factory that creates a handler exactly as fileConfig would, from its class and argument text."""
+    namespace = vars(logging)
+    # Same evaluation rules as logging.config.fileConfig; logging.conf is trusted local configuration.
+    klass = eval(handler_class, namespace)  # pylint: disable=eval-used
+    return klass(*eval(args, namespace), **eval(kwargs, namespace))  # pylint: disable=eval-used
+
+
+def resolve_logging_config(path: str = LOGGING_CONF) -> Optional[dict]:
+    """Translate a fileConfig ini file into the equivalent dictConfig dict; None if there is no file."""
+    if not os.path.exists(path):
+        return None
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(path, encoding='utf-8')
+
+    def keys(section):
+        return [key.strip() for key in parser.get(section, 'keys', fallback='').split(',') if key.strip()]
+
+    def names(section, option):
+        return [name.strip() for name in parser.get(section, option, fallback='').split(',') if name.strip()]
+
+    formatters = {}
+    for name in keys('formatters'):
+        section = parser[f'formatter_{name}']
+        formatter = {'format': section.get('format'), 'datefmt': section.get('datefmt') or None,
+                     'style': section.get('style', '%')}
+        if 'class' in section:
+            formatter['class'] = section['class']
+        formatters[name] = formatter
+    handlers = {}
+    for name in keys('handlers'):
+        section = parser[f'handler_{name}']
+        handler = {'()': 'app.startup.build_handler', 'handler_class': section['class'],
+                   'args': section.get('args', '()'), 'kwargs': section.get('kwargs', '{}')}
+        if 'level' in section:
+            handler['level'] = section['level']
+        if section.get('formatter'):
+            handler['formatter'] = section['formatter']
+        handlers[name] = handler
+    config = {'version': 1, 'disable_existing_loggers': False, 'formatters': formatters, 'handlers': handlers,
+              'loggers': {}}
+    for name in keys('loggers'):
+        section = parser[f'logger_{name}']
+        entry = {'handlers': names(f'logger_{name}', 'handlers')}
+        if 'level' in section:
+            entry['level'] = section['level']
+        if name == 'root':
+            config['root'] = entry
+        else:
+            entry['propagate'] = section.getint('propagate', 1) != 0
+            config['loggers'][section['qualname']] = entry
+    return config
+
+
+def freeze(path: str, settings: Settings, registry: Dict[str, str], plugins_path: str,
+           logging_conf: str = LOGGING_CONF, dotenv_path: Optional[str] = None) -> StartupImage:
+    """Write a startup image for STARTUP_IMAGE and return it."""
+    image = StartupImage(settings, resolve_logging_config(logging_conf), dict(registry),
+                         sources(plugins_path, logging_conf, dotenv_path))
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as output:
+        pickle.dump(_header(), output, pickle.HIGHEST_PROTOCOL)
+        pickle.dump(image, output, pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+    return image
+
+
+def load_image(path: str, plugins_path: str, logging_conf: str = LOGGING_CONF,
+               dotenv_path: Optional[str] = None) -> Optional[StartupImage]:
+    """Load a startup image, or return None if it is missing, unreadable, from another version or stale."""
+    try:
+        with open(path, 'rb') as source:
+            if pickle.load(source) != _header():
+                logger.warning(f"Startup image {path} was built by another version; ignoring it.")
+                return None
+            image = pickle.load(source)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, TypeError, ValueError) as e:
+        logger.warning(f"Startup image {path} could not be read; ignoring it: {e}")
+        return None
+    if image.sources != sources(plugins_path, logging_conf, dotenv_path):
+        logger.warning(f"Startup image {path} is older than its sources; ignoring it.")
+        return None
+    return image
+
+
+class StartupProfile:
+    """Wall time of each startup phase, in the order the phases ran."""
+
+    def __init__(self, started: Optional[float] = None):
+        self.phases: List[Tuple[str, float]] = []
+        self._last = time.perf_counter() if started is None else started
+
+    def mark(self, phase: str):
+        """Record that ``phase`` has just finished."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return sum(seconds for _, seconds in self.phases)
+
+    def report(self) -> str:
+        total = self.total or float('inf')
+        lines = [f"{phase:20} {seconds * 1000:9.2f} ms {seconds / total:7.1%}" for phase, seconds in self.phases]
+        lines.append(f"{'total':20} {self.total * 1000:9.2f} ms")
+        return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m app.startup IMAGE_PATH")
+    from app import App  # pylint: disable=import-outside-toplevel
+    App().freeze(sys.argv[1])
+    print(f"Startup image written to {sys.argv[1]}")
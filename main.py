@@ -1,5 +1,46 @@
 # main.py
-from app import App    
+import time
+# Taken before the other imports so --profile-startup can include them.
+STARTED = time.perf_counter()
+
+# pylint: disable=wrong-import-position
+import argparse
+import sys
+from app import App
+from app.debug import import_tree
+from app.startup import StartupProfile
+# pylint: enable=wrong-import-position
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Plugin calculator")
+    parser.add_argument('--batch', metavar='FILE', help="run commands from FILE ('-' for stdin) instead of the REPL")
+    parser.add_argument('--bulk', metavar='CSV', help="calculate a CSV file of operation,a,b rows (see --output)")
+    parser.add_argument('--output', metavar='CSV', default='results.csv', help="where --bulk writes its results")
+    parser.add_argument('--workers', type=int, help="worker processes for --bulk (default: POOL_MAX_WORKERS or all cores)")
+    parser.add_argument('--serve', metavar='ADDRESS', help="serve commands on HOST:PORT or a Unix socket path")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print where cold-start time goes (imports, settings, logging, plugins) and exit")
+    return parser.parse_args(argv)
+
+def profile_startup(started: float = STARTED) -> StartupProfile:
+    """Start the App as the REPL would, recording each phase from the top of main.py."""
+    profile = StartupProfile(started)
+    profile.mark('import app')
+    App(profile).load_plugins()
+    return profile
 
 if __name__ == "__main__":
-    App().start()
+    args = parse_args()
+    if args.profile_startup:
+        print(profile_startup().report(), file=sys.stderr)
+        print("\nimport app, by module (cumulative, fresh interpreter):", file=sys.stderr)
+        for depth, module, ms in reversed(import_tree('app')):
+            print(f"{'  ' * depth}{module:{40 - 2 * depth}} {ms:9.2f} ms", file=sys.stderr)
+    elif args.bulk:
+        App().run_bulk(args.bulk, args.output, args.workers)
+    elif args.batch:
+        App().run_batch(args.batch)
+    elif args.serve:
+        App().serve(args.serve)
+    else:
+        App().start()
@@ -7,7 +7,7 @@ create dynamic tests for validating the behavior of arithmetic operations.
 '''
 from decimal import Decimal
 from faker import Faker
-from app.operations import add, subtract, multiply, divide
+from app import add, subtract, multiply, divide
 
 fake = Faker()
 
@@ -35,7 +35,7 @@ def generate_test_data(num_records):
                 expected_result = "ZeroDivisionError"
             else:
                 expected_result = operation_function(operand1, operand2)
-        except ZeroDivisionError:
+        except (ZeroDivisionError, ValueError):
             expected_result = "ZeroDivisionError"
         yield operand1, operand2, operation_name, operation_function, expected_result
 
@@ -44,6 +44,11 @@ def pytest_addoption(parser):
     Adds command line options for pytest.
     """
     parser.addoption("--num_records", action="store", default=5, type=int, help="Number of test records to generate")
+    parser.addoption("--fuzz-records", action="store", default=20000, type=int,
+                     help="Number of random records for the bulk fuzz sweep (see app.fuzz)")
+    parser.addoption("--fuzz-seed", action="store", default=0, type=int, help="Seed for the bulk fuzz sweep")
+    parser.addoption("--fuzz-workers", action="store", default=0, type=int,
+                     help="Worker processes for the bulk fuzz sweep (0 runs it in-process)")
 
 def pytest_generate_tests(metafunc):
     """
@@ -0,0 +1,70 @@
+"""Tests for the aggregate commands."""
+import statistics
+from array import array
+from decimal import Decimal
+
+import pytest
+
+from app.aggregate import aggregate, pairwise_sum
+from app.calculations import calculations
+from app.plugins.aggregate import AggregateCommand
+
+VALUES = [Decimal(value).scaleb(-2) for value in range(-500, 1500, 7)]
+
+@pytest.mark.parametrize('name, expected', [
+    ('sum', sum(VALUES)), ('mean', statistics.mean(VALUES)), ('min', min(VALUES)), ('max', max(VALUES)),
+    ('variance', statistics.variance(VALUES)), ('product', Decimal(6)),
+])
+def test_exact_aggregates(name, expected):
+    """Decimal aggregates match the reference, for lists and one-shot generators alike."""
+    values = [Decimal(1), Decimal(2), Decimal(3)] if name == 'product' else VALUES
+    for column in (values, iter(values)):
+        result, count = aggregate(name, column)
+        assert abs(result - expected) <= abs(expected) * Decimal('1e-26')
+        assert count == len(values)
+
+def test_float_aggregates_use_accurate_summation():
+    """The float64 path is correctly rounded for sums and agrees across buffer types."""
+    assert aggregate('sum', [0.1] * 10, exact=False) == (1.0, 10)
+    floats = [float(value) for value in VALUES]
+    for column in (floats, array('d', floats), floats.__iter__):
+        mean, _ = aggregate('mean', column() if callable(column) else column, exact=False)
+        variance, _ = aggregate('variance', column() if callable(column) else column, exact=False)
+        assert mean == pytest.approx(statistics.fmean(floats), rel=1e-12)
+        assert variance == pytest.approx(statistics.variance(floats), rel=1e-12)
+
+def test_pairwise_sum_of_a_long_stream():
+    """Pairwise summation keeps tiny terms that naive summation rounds away one by one."""
+    tiny = Decimal('1e-21')
+    def stream():
+        return (tiny if index else Decimal(10 ** 7) for index in range(100001))
+    assert sum(stream()) == 10 ** 7
+    assert abs(pairwise_sum(stream()) - (10 ** 7 + tiny * 100000)) < Decimal('1e-18')
+
+def test_invalid_aggregates():
+    """Empty columns, short variances and unknown names raise ValueError."""
+    with pytest.raises(ValueError, match="no values"):
+        aggregate('sum', [])
+    with pytest.raises(ValueError, match="at least two"):
+        aggregate('variance', [Decimal(1)])
+    with pytest.raises(ValueError, match="Unknown aggregate"):
+        aggregate('median', VALUES)
+
+def test_command_records_one_history_entry():
+    """The aggregate command takes REPL tokens or an iterable and records a single entry."""
+    command = AggregateCommand()
+    before = len(calculations)
+    assert command.execute('sum', '0.1', '0.2', '0.3') == Decimal('0.6')
+    assert command.execute('max', (Decimal(value) for value in range(1000))) == 999
+    assert len(calculations) == min(before + 2, calculations.capacity)
+    latest = calculations.get_latest()
+    assert (latest.operation, latest.a, latest.b, latest.result) == ('max', 1000, None, 999)
+
+def test_numpy_columns_are_reduced_vectorized():
+    """NumPy float columns give the same answers as lists."""
+    np = pytest.importorskip('numpy')
+    floats = [float(value) for value in VALUES]
+    column = np.array(floats)
+    for name in ('sum', 'mean', 'min', 'max', 'variance'):
+        assert aggregate(name, column, exact=False)[0] == pytest.approx(aggregate(name, floats, exact=False)[0],
+                                                                        rel=1e-12)
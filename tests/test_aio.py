@@ -0,0 +1,49 @@
+"""Tests for the asyncio front end of the command dispatcher."""
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from app.commands import Command, CommandHandler
+from app.commands.aio import AsyncCommandHandler, HandlerBusy
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+
+class SleepCommand(Command):
+    """A native coroutine command."""
+    async def execute(self, delay):
+        await asyncio.sleep(delay)
+        return delay
+
+def make_handler():
+    """Build a handler with pure and awaitable commands registered."""
+    handler = CommandHandler()
+    handler.register_command('add', AddCommand())
+    handler.register_command('divide', DivideCommand())
+    handler.register_command('sleep', SleepCommand())
+    return handler
+
+def test_execute_runs_pure_and_awaitable_commands():
+    """Pure commands run on the executor, coroutine commands are awaited."""
+    async def scenario():
+        async_handler = AsyncCommandHandler(make_handler())
+        assert await async_handler.execute('add', Decimal(2), Decimal(3)) == Decimal(5)
+        assert await async_handler.execute('sleep', 0) == 0
+        with pytest.raises(ValueError):
+            await async_handler.execute('divide', Decimal(1), Decimal(0))
+        rows = [(Decimal(i), Decimal(i)) for i in range(10)]
+        assert await async_handler.execute_many('add', rows) == [Decimal(2 * i) for i in range(10)]
+    asyncio.run(scenario())
+
+def test_max_pending_sheds_load():
+    """Once max_pending commands are in flight, new calls fail fast with HandlerBusy."""
+    async def scenario():
+        async_handler = AsyncCommandHandler(make_handler(), max_concurrency=1, max_pending=2)
+        first = asyncio.ensure_future(async_handler.execute('sleep', 0.05))
+        second = asyncio.ensure_future(async_handler.execute('sleep', 0.05))
+        await asyncio.sleep(0)
+        with pytest.raises(HandlerBusy):
+            await async_handler.execute('sleep', 0)
+        assert await asyncio.gather(first, second) == [0.05, 0.05]
+        assert async_handler.pending == 0
+    asyncio.run(scenario())
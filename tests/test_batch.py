@@ -0,0 +1,62 @@
+"""Tests for the batch (column-at-a-time) execution path of the arithmetic commands."""
+import math
+import subprocess
+import sys
+from array import array
+from decimal import Decimal
+
+import pytest
+
+from app.commands import Command, CommandHandler
+from app.plugins.add_command import AddCommand
+from app.plugins.subtract_command import SubtractCommand
+from app.plugins.multiply_command import MultiplyCommand
+from app.plugins.divide_command import DivideCommand
+
+def test_exact_batch_matches_execute():
+    """Decimal batches give the same results as calling execute() per row."""
+    a_values = [Decimal('1.1'), Decimal('2'), Decimal('-3.5')]
+    b_values = [Decimal('2.2'), Decimal('4'), Decimal('0.5')]
+    for command in (AddCommand(), SubtractCommand(), MultiplyCommand(), DivideCommand()):
+        result = command.execute_batch(a_values, b_values)
+        assert list(result) == [command.execute(a, b) for a, b in zip(a_values, b_values)]
+        assert not result.errors
+
+def test_float_batch_accepts_array_buffers():
+    """The float64 path accepts array.array columns."""
+    result = MultiplyCommand().execute_batch(array('d', [1.5, 2.0]), array('d', [2.0, 4.0]), exact=False)
+    assert list(result) == [3.0, 8.0]
+
+def test_divide_batch_masks_zero_divisors():
+    """A zero divisor flags its row instead of failing the whole batch."""
+    for exact in (True, False):
+        result = DivideCommand().execute_batch([10, 1, 9], [2, 0, 3], exact=exact)
+        assert list(result.mask) == [False, True, False]
+        assert result.failed == [1]
+        assert result.errors[1] == "Cannot divide by zero"
+        assert result.values[0] == 5 and result.values[2] == 3
+        if exact:
+            assert result.values[1] is None
+        else:
+            assert math.isnan(result.values[1])
+
+def test_command_handler_execute_batch():
+    """CommandHandler dispatches a whole column with one lookup."""
+    handler = CommandHandler()
+    handler.register_command('add', AddCommand())
+    assert list(handler.execute_batch('add', [1, 2], [3, 4])) == [Decimal('4'), Decimal('6')]
+
+class PowerCommand(Command):
+    def execute(self, a, b):
+        return Decimal(a) ** Decimal(b)
+
+def test_fallback_batch_rejects_ragged_columns():
+    """The row-by-row fallback checks column lengths like the vectorised path instead of dropping rows."""
+    assert list(PowerCommand().execute_batch([2, 3], [3, 2])) == [Decimal('8'), Decimal('9')]
+    with pytest.raises(ValueError, match="differ in length"):
+        PowerCommand().execute_batch([2, 3, 4], [3, 2])
+
+def test_import_does_not_load_numpy():
+    """NumPy is imported on the first float64 batch, not with the package."""
+    code = "import sys, app, app.aggregate, app.fuzz; assert 'numpy' not in sys.modules"
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -0,0 +1,31 @@
+"""Tests for the benchmark helpers."""
+import pytest
+
+from app import bench
+
+def test_summarize_reports_percentiles():
+    """p50/p90/p99 are nearest-rank percentiles of the per-call samples, in microseconds per operation."""
+    summary = bench.summarize([0.000001 * i for i in range(1, 101)])
+    assert summary['samples'] == 100
+    assert (summary['p50_us'], summary['p90_us'], summary['p99_us']) == \
+        pytest.approx((50, 90, 99))
+    assert summary['min_us'] < summary['p50_us'] < summary['p99_us'] <= summary['max_us']
+
+def test_measure_samples_each_call():
+    """measure() yields one sample per call, or per fixed batch of calls."""
+    assert len(bench.measure(lambda: None, number=50, repeat=2)) == 100
+    assert len(bench.measure(lambda: None, number=50, repeat=2, batch=10)) == 10
+
+def test_compare_flags_regressions():
+    """Only benchmarks slower than baseline by more than the tolerance, at p50 or p99, are reported."""
+    baseline = {'dispatch': {'p50_us': 1.0, 'p99_us': 2.0}, 'batch': {'exact': {'p50_us': 2.0, 'p99_us': 4.0}},
+                'pool': {'p50_us': 1.0, 'p99_us': 2.0}}
+    results = {'dispatch': {'p50_us': 1.1, 'p99_us': 2.1}, 'batch': {'exact': {'p50_us': 3.0, 'p99_us': 4.0}},
+               'pool': {'p50_us': 1.0, 'p99_us': 5.0}}
+    regressions = bench.compare(results, baseline, tolerance=0.25)
+    assert sorted(regression.split(':')[0] for regression in regressions) == ['batch.exact', 'pool']
+    assert any('p99' in regression for regression in regressions)
+
+def test_dispatch_benchmark_runs():
+    """A quick dispatch benchmark produces a summary."""
+    assert bench.run(['dispatch'], quick=True)['dispatch']['ops_per_sec'] > 0
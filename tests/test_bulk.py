@@ -0,0 +1,83 @@
+"""Tests for bulk CSV calculation."""
+import csv
+import io
+
+import pytest
+
+from app import App, bulk
+from app.commands import CommandHandler
+from app.numeric import get_mode
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+from app.plugins.menu_command import MenuCommand
+
+@pytest.fixture
+def handler():
+    """A handler with two pure commands and one that must never be shipped to workers."""
+    command_handler = CommandHandler()
+    command_handler.register_command('add', AddCommand())
+    command_handler.register_command('divide', DivideCommand())
+    command_handler.register_command('menu', MenuCommand())
+    return command_handler
+
+def test_read_blocks_split_on_line_boundaries():
+    """Blocks always end at a newline and together reproduce the input."""
+    data = b''.join(b'add,%d,%d\n' % (i, i) for i in range(1000)) + b'add,1,2'
+    blocks = list(bulk.read_blocks(io.BytesIO(data), block_size=64))
+    assert b''.join(blocks) == data
+    assert all(block.endswith(b'\n') for block in blocks[:-1])
+
+def test_results_keep_input_order_and_report_errors(tmp_path, handler):
+    """Rows are grouped internally but written back in input order, failures included."""
+    source = tmp_path / 'in.csv'
+    source.write_text('b,id,operation,a\n2,1,add,1\n0,2,divide,1\n4,3,divide,"2"\nx,4,add,1\n1,5,menu,1\n'
+                      '3,6,add,4\n')
+    stats = bulk.run(str(source), handler, str(tmp_path / 'out.csv'), block_size=16)
+    assert (tmp_path / 'out.csv').read_text().splitlines() == [
+        'b,id,operation,a,result,error',
+        '2,1,add,1,3,',
+        '0,2,divide,1,,Cannot divide by zero',
+        '4,3,divide,"2",0.5,',
+        'x,4,add,1,,Invalid number input: x is not a valid number.',
+        '1,5,menu,1,,No such command: menu',
+        '3,6,add,4,7,',
+    ]
+    assert (stats['rows'], stats['errors']) == (6, 3)
+
+@pytest.mark.parametrize('header', ['', 'operation,a,b,note\n'])
+def test_short_rows_are_padded_to_the_header_width(tmp_path, handler, header):
+    """A row missing fields still yields result and error in the right columns."""
+    source = tmp_path / 'in.csv'
+    source.write_text(header + '4,multiply\nadd,1,2' + (',x' if header else '') + '\n')
+    bulk.run(str(source), handler, str(tmp_path / 'out.csv'))
+    rows = list(csv.reader(io.StringIO((tmp_path / 'out.csv').read_text())))
+    assert {len(row) for row in rows} == {len(rows[0])}
+    assert rows[1][-2:] == ['', 'Invalid number input: multiply is not a valid number.']
+    assert rows[2][-2:] == ['3', '']
+
+@pytest.mark.parametrize('kind', ['thread', 'process'])
+def test_workers_match_in_process_output(tmp_path, handler, kind):
+    """Output is identical however many workers calculate the blocks."""
+    source = tmp_path / 'in.csv'
+    source.write_text(''.join(f"{('add', 'divide')[i % 2]},{i},{i % 7}\n" for i in range(2000)))
+    bulk.run(str(source), handler, str(tmp_path / 'serial.csv'), workers=0, block_size=512)
+    bulk.run(str(source), handler, str(tmp_path / 'parallel.csv'), workers=2, kind=kind, block_size=512)
+    serial = (tmp_path / 'serial.csv').read_text()
+    assert serial.splitlines()[0] == 'operation,a,b,result,error'
+    assert len(serial.splitlines()) == 2001
+    assert (tmp_path / 'parallel.csv').read_text() == serial
+
+def test_fixed_point_results_are_decimals(handler):
+    """Scaled integers from a fixed-point batch are converted back before writing."""
+    handler.commands['divide'].configure(numeric=get_mode('fixed:2'))
+    text, rows, errors = bulk.run_block(b'divide,1,3\n', commands=dict(handler.commands))
+    assert (text, rows, errors) == ('divide,1,3,0.33,\n', 1, 0)
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_app_bulk_uses_fixed_point_mode(tmp_path, monkeypatch, workers):
+    """Lazily loaded plugin commands honour NUMERIC_MODE in bulk runs, in-process and in workers."""
+    monkeypatch.setenv('NUMERIC_MODE', 'fixed:2')
+    source = tmp_path / 'in.csv'
+    source.write_text('divide,1,3\nadd,1.005,2\n')
+    App().run_bulk(str(source), str(tmp_path / 'out.csv'), workers=workers)
+    assert (tmp_path / 'out.csv').read_text().splitlines()[1:] == ['divide,1,3,0.33,', 'add,1.005,2,3.00,']
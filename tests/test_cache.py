@@ -0,0 +1,71 @@
+"""Tests for result memoization of pure commands."""
+from decimal import Decimal, localcontext
+
+from app import App, Calculator
+from app.cache import ResultCache
+from app.commands import Command, CommandHandler
+from app.commands.dispatch import DispatchTable
+from app.plugins.add_command import AddCommand
+
+class CountingCommand(Command):
+    """An impure command that counts how often it really runs."""
+    def __init__(self):
+        self.calls = 0
+
+    def execute(self, a, b):
+        self.calls += 1
+        return a + b
+
+def test_result_cache_lru_and_counters():
+    """The cache evicts the least recently used entry and counts hits and misses."""
+    cache = ResultCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b', None) is None
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 1, 'evictions': 1}
+
+def test_handler_caches_only_pure_commands():
+    """Pure commands are served from the cache; impure ones always run."""
+    handler = CommandHandler()
+    counting = CountingCommand()
+    handler.register_command('add', AddCommand())
+    handler.register_command('count', counting)
+    cache = handler.enable_cache(16)
+    for _ in range(3):
+        assert handler.execute_command('add', Decimal('2'), Decimal('3')) == Decimal('5')
+        handler.execute_command('count', 1, 2)
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert counting.calls == 3
+
+def test_calculator_cache_is_opt_in():
+    """Calculator.perform only uses the cache once enabled."""
+    cache = Calculator.enable_cache(8)
+    try:
+        Calculator.add(Decimal('1'), Decimal('2'))
+        Calculator.add(Decimal('1'), Decimal('2'))
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert Calculator.add(Decimal('1.0'), Decimal('2')) == Decimal('3.0')
+        assert cache.misses == 2
+    finally:
+        Calculator.disable_cache()
+
+def test_cache_is_transparent(monkeypatch, capsys):
+    """The same REPL lines print the same output with the cache on and off."""
+    lines = ['add 2.0 2', 'add 2 2', 'add 1.50 1', 'add 1.5 1', 'divide 1 3', 'multiply -0 1', 'multiply 0 1']
+    outputs = []
+    for size in ('0', '64'):
+        monkeypatch.setenv('RESULT_CACHE_SIZE', size)
+        app = App()
+        app.load_plugins()
+        app.dispatch_table = DispatchTable(app.command_handler)
+        for line in lines:
+            app.run_line(line)
+        outputs.append(capsys.readouterr().out)
+        with localcontext() as context:
+            context.prec = 5
+            app.run_line('divide 1 3')
+        outputs.append(capsys.readouterr().out)
+    assert outputs[0] == outputs[2] and outputs[1] == outputs[3]
+    assert 'Result: 4.0\nResult: 4\n' in outputs[0] and outputs[1] == 'Result: 0.33333\n'
@@ -0,0 +1,62 @@
+"""Stress tests for sharing CommandHandler and the history between threads."""
+import threading
+from decimal import Decimal
+
+from app.calculations import Calculations
+from app.commands import CommandHandler
+from app.plugins.add_command import AddCommand
+
+THREADS = 8
+CALLS = 2000
+
+def run_threads(target, count=THREADS):
+    """Start ``count`` threads running target(index) together and wait for them."""
+    barrier = threading.Barrier(count)
+    def run(index):
+        barrier.wait()
+        target(index)
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_concurrent_registration_and_dispatch():
+    """Registrations from many threads are all kept while other threads dispatch."""
+    handler = CommandHandler()
+    handler.register_command('add', AddCommand())
+    errors = []
+    def work(index):
+        try:
+            for call in range(CALLS // 10):
+                handler.register_command(f'add_{index}_{call}', AddCommand())
+                assert handler.dispatch('add', Decimal(index), Decimal(call)) == index + call
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+    run_threads(work)
+    assert not errors
+    assert len(handler.commands) == 1 + THREADS * (CALLS // 10)
+
+def test_sharded_history_keeps_every_record_in_order():
+    """Records from many threads are all kept, each once, in sequence order."""
+    history = Calculations(capacity=THREADS * CALLS)
+    run_threads(lambda index: [history.record('add', Decimal(index), Decimal(call), None) for call in range(CALLS)])
+    records = list(history)
+    assert len(records) == len(history) == THREADS * CALLS
+    assert [record.sequence for record in records] == sorted(record.sequence for record in records)
+    for index in range(THREADS):
+        assert [record.b for record in records if record.a == index] == [Decimal(call) for call in range(CALLS)]
+    assert history.get_latest() is records[-1]
+
+def test_sharded_history_respects_capacity_across_threads():
+    """The merged view holds only the newest ``capacity`` records and counts the rest as evicted."""
+    history = Calculations(capacity=100)
+    for _ in range(3):
+        run_threads(lambda index: [history.record('add', Decimal(index), Decimal(call)) for call in range(CALLS)])
+    total = 3 * THREADS * CALLS
+    assert [record.sequence for record in history] == list(range(total - 99, total + 1))
+    assert history.evictions == total - 100
+    # The capacity bounds what the shards store together, not each thread's shard.
+    assert sum(len(shard.records) for shard in history._shards) <= 125  # pylint: disable=protected-access
+    history.record('add', Decimal(0), Decimal(0))
+    assert len(history._shards) <= THREADS + 2  # pylint: disable=protected-access
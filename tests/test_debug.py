@@ -0,0 +1,30 @@
+"""Tests for lazy debug tracing and the plugin import-time budget."""
+import logging
+
+from app import debug
+
+def test_trace_is_lazy_when_debug_is_off():
+    """The value factory is never called unless DEBUG is enabled."""
+    logger = logging.getLogger('test_debug_off')
+    logger.setLevel(logging.INFO)
+    calls = []
+    debug.trace('value', lambda: calls.append(1), logger)
+    assert not calls
+
+def test_trace_formats_when_debug_is_on(caplog):
+    """With DEBUG on, the value is computed and logged."""
+    logger = logging.getLogger('test_debug_on')
+    logger.setLevel(logging.DEBUG)
+    with caplog.at_level(logging.DEBUG, logger='test_debug_on'):
+        debug.trace('answer', lambda: 42, logger)
+    assert "ic| answer: 42" in caplog.text
+
+def test_greet_plugin_import_budget():
+    """Importing the greet plugin must not add heavy dependencies to cold start."""
+    assert debug.import_cost_ms('app.plugins.greet') < debug.PLUGIN_IMPORT_BUDGET_MS
+
+def test_startup_report_counts_modules():
+    """Resolving every command can only add modules to a cold start."""
+    report = debug.startup_report()
+    assert 0 < report['modules'] <= report['first_use_modules']
+    assert 0 < report['startup_ms'] <= report['first_use_ms']
@@ -0,0 +1,67 @@
+"""Tests for the pre-resolved dispatch table and REPL line handling."""
+from decimal import Decimal
+
+import pytest
+
+from app import App
+from app.commands import CommandHandler
+from app.commands.dispatch import DispatchTable, InvalidOperand, UnknownCommand, parse_operand
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+from app.plugins.expr import ExpressionCommand
+
+@pytest.fixture
+def table():
+    """A table over add, divide and the raw-argument expr command."""
+    handler = CommandHandler()
+    handler.register_command('add', AddCommand())
+    handler.register_command('divide', DivideCommand())
+    handler.register_command('expr', ExpressionCommand())
+    return DispatchTable(handler)
+
+def test_execute_line_parses_operands(table):
+    """Operands are converted to Decimal and the result returned."""
+    assert table.execute_line('add 2 3') == Decimal(5)
+    assert table.execute_line('expr (a+b)*2 a=1 b=2') == Decimal(6)
+    assert table.execute_line('expr (1 + 2) * 3') == Decimal(9)
+    assert table.execute_line('expr (a + b) * 2 a=1 b=2') == Decimal(6)
+
+def test_handler_fallback_uses_the_snapshot(table):
+    """With the cache on, calls still run the command the table was built with."""
+    table.handler.enable_cache(16)
+    table.handler.register_command('add', DivideCommand())
+    assert table.execute_line('add 6 3') == Decimal(9)
+
+def test_parse_operand_validates_and_interns():
+    """Repeated literals share one Decimal; non-numbers and non-finite values are rejected."""
+    assert parse_operand('1.5') is parse_operand('1.5')
+    for token in ('x', 'nan', 'inf'):
+        with pytest.raises(InvalidOperand):
+            parse_operand(token)
+
+def test_errors(table):
+    """Unknown commands raise UnknownCommand; command errors propagate."""
+    with pytest.raises(UnknownCommand, match="nope"):
+        table.execute_line('nope 1 2')
+    with pytest.raises(ValueError, match="Cannot divide by zero"):
+        table.execute_line('divide 1 0')
+
+def test_table_is_a_snapshot(table):
+    """Registering a command later does not change an existing table."""
+    table.handler.register_command('more', AddCommand())
+    assert 'more' not in table
+    with pytest.raises(TypeError):
+        table.commands['more'] = AddCommand()
+
+def test_repl_reports_results_and_errors(monkeypatch, capsys):
+    """The REPL prints results and per-line errors, then exits on 'exit'."""
+    inputs = iter(['greet', 'bogus', 'expr 1/0', 'expr 2*3', 'exit'])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    with pytest.raises(SystemExit) as exit_info:
+        App().start()
+    assert exit_info.value.code == 0
+    out = capsys.readouterr().out
+    assert "Hello, World!" in out
+    assert "No such command: bogus" in out
+    assert "Error: Cannot divide by zero" in out
+    assert "Result: 6" in out
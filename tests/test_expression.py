@@ -0,0 +1,57 @@
+"""Tests for the compiled expression engine."""
+from decimal import Decimal
+
+import pytest
+
+from app.expression import compile_expression
+from app.plugins.expr import ExpressionCommand
+
+def test_evaluate_single_operand_set():
+    """An expression is evaluated with Decimal semantics."""
+    compiled = compile_expression('(a + b) * c / d')
+    assert compiled.variables == ('a', 'b', 'c', 'd')
+    assert compiled.evaluate(a=1, b=2, c=3, d=4) == Decimal('2.25')
+    assert compile_expression('0.1 + 0.2').evaluate() == Decimal('0.3')
+
+def test_compiled_expressions_are_cached_and_folded():
+    """The same text compiles once, and literal sub-expressions are folded."""
+    assert compile_expression('x * (2 + 3)') is compile_expression('x * (2 + 3)')
+    assert compile_expression('-(2 + 3) * 4').is_constant
+    assert compile_expression('-(2 + 3) * 4').evaluate() == Decimal(-20)
+
+def test_evaluate_columns_masks_failed_rows():
+    """Column evaluation reports division by zero per row."""
+    compiled = compile_expression('(a + b) / c')
+    for exact in (True, False):
+        result = compiled.evaluate_columns({'a': [1, 2, 3], 'b': [1, 2, 3], 'c': [2, 0, 3]}, exact=exact)
+        assert list(result.mask) == [False, True, False]
+        assert result.errors == {1: "Cannot divide by zero"}
+        assert result.values[0] == 1 and result.values[2] == 2
+
+def test_errors():
+    """Unsupported syntax, missing variables and zero divisors raise ValueError."""
+    with pytest.raises(ValueError):
+        compile_expression('a ** 2')
+    with pytest.raises(ValueError):
+        compile_expression('__import__("os")')
+    with pytest.raises(ValueError, match="Missing value"):
+        compile_expression('a + b').evaluate(a=1)
+    with pytest.raises(ValueError, match="Cannot divide by zero"):
+        compile_expression('a / 0').evaluate(a=1)
+    with pytest.raises(ValueError, match="Cannot divide by zero"):
+        compile_expression('1 / (2 - 2)')
+
+def test_deep_nesting_and_bad_values_raise_readable_errors():
+    """Nesting past the recursion limit and non-numeric assignments become ValueErrors with a message."""
+    for text in ('-' * 5000 + '1', '(' * 1000 + '1' + ')' * 1000, '+'.join(['a'] * 5000)):
+        with pytest.raises(ValueError):
+            compile_expression(text)
+    with pytest.raises(ValueError, match="Invalid value for variable a: 'x'"):
+        ExpressionCommand().execute('a + 1', 'a=x')
+    for literal in ('0x10', '0b1', '0o7'):
+        with pytest.raises(ValueError, match=f"Unsupported number literal: {literal}"):
+            compile_expression(f'{literal} + 1')
+
+def test_expression_command():
+    """The expr plugin accepts name=value assignments."""
+    assert ExpressionCommand().execute('(a+b)*c', 'a=1', 'b=2', c=3) == Decimal(9)
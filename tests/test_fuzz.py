@@ -0,0 +1,37 @@
+"""Tests for the bulk fuzz harness."""
+from decimal import Decimal
+
+from app import fuzz
+from app.plugins.add_command import AddCommand
+
+class OffByOneAddCommand(AddCommand):
+    """Wrong on the scalar path only, for rows where both operands are equal."""
+
+    def execute(self, a: Decimal, b: Decimal) -> Decimal:
+        return a + b + (1 if a == b else 0)
+
+def test_chunks_are_reproducible_from_seed_and_index():
+    """A chunk depends only on (seed, chunk index)."""
+    assert fuzz.generate_chunk(7, 3, 100) == fuzz.generate_chunk(7, 3, 100)
+    assert fuzz.generate_chunk(7, 3, 100) != fuzz.generate_chunk(7, 4, 100)
+    a_values, b_values = fuzz.generate_chunk(1, 0, 1000, digits=1)
+    assert all(-9 <= value <= 9 for value in a_values + b_values) and 0 in b_values
+
+def test_mismatches_are_found_and_reported():
+    """A faulty command is caught on the path where it is wrong, with the failing operands."""
+    report = fuzz.run(20000, seed=3, digits=1, commands={'add': OffByOneAddCommand()}, max_mismatches=5)
+    assert not report.ok
+    assert len(report.mismatches) == 5 and report.mismatch_count > 5
+    mismatch = report.mismatches[0]
+    assert mismatch.path == 'scalar' and mismatch.a == mismatch.b
+    assert mismatch.actual == mismatch.expected + 1
+
+def test_sweep(request):
+    """The arithmetic commands agree with the reference on every path (size set by --fuzz-records)."""
+    records = request.config.getoption('--fuzz-records', 20000)
+    report = fuzz.run(records, seed=request.config.getoption('--fuzz-seed', 0),
+                      workers=request.config.getoption('--fuzz-workers', 0), digits=6, scale=3)
+    assert report.ok, report.mismatches
+    assert report.checks == records * 4 * len(fuzz.PATHS)
+    # One-digit operands make every tenth divisor zero.
+    assert fuzz.run(5000, seed=1, digits=1).ok
@@ -0,0 +1,46 @@
+"""Tests for the bounded calculation history store."""
+from decimal import Decimal
+
+import pytest
+
+from app.calculations import Calculations, CalculationRecord
+
+def test_ring_policy_drops_oldest():
+    """A full ring buffer evicts the oldest record."""
+    history = Calculations(capacity=3)
+    for i in range(5):
+        history.record('add', Decimal(i), Decimal(1), Decimal(i + 1))
+    assert len(history) == 3
+    assert [record.a for record in history] == [Decimal(2), Decimal(3), Decimal(4)]
+    assert history.evictions == 2
+    assert history.get_latest() == CalculationRecord('add', Decimal(4), Decimal(1), Decimal(5))
+
+def test_lru_policy_refreshes_repeated_calculations():
+    """Repeating a calculation moves it to the newest slot instead of duplicating it."""
+    history = Calculations(capacity=2, policy='lru')
+    history.record('add', Decimal(1), Decimal(1), Decimal(2))
+    history.record('multiply', Decimal(2), Decimal(3), Decimal(6))
+    history.record('add', Decimal(1), Decimal(1), Decimal(2))
+    history.record('subtract', Decimal(5), Decimal(3), Decimal(2))
+    assert [record.operation for record in history] == ['add', 'subtract']
+    assert history.get_latest().operation == 'subtract'
+
+def test_filter_and_export_are_lazy():
+    """Filtering and export yield records without building the full list."""
+    history = Calculations()
+    history.record('add', Decimal(1), Decimal(2), Decimal(3))
+    history.record('divide', Decimal(9), Decimal(3), Decimal(3))
+    matches = history.iter_operation('divide')
+    assert next(matches).b == Decimal(3)
+    assert list(history.iter_rows())[0] == ('add', Decimal(1), Decimal(2), Decimal(3))
+    assert len(history.filter_with_operation('add')) == 1
+
+def test_configure_keeps_newest_records():
+    """Shrinking the capacity keeps the most recent records."""
+    history = Calculations(capacity=5)
+    for i in range(5):
+        history.record('add', Decimal(i), Decimal(0), Decimal(i))
+    history.configure(capacity=2, policy='lru')
+    assert [record.a for record in history] == [Decimal(3), Decimal(4)]
+    with pytest.raises(ValueError):
+        history.configure(capacity=0)
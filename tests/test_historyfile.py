@@ -0,0 +1,73 @@
+"""Tests for the memory-mapped columnar history file."""
+import io
+import math
+from decimal import Decimal
+
+import pytest
+
+from app.calculations import Calculations
+from app.historyfile import HistoryReader, HistoryWriter
+
+def test_round_trip_across_chunks_and_appends(tmp_path):
+    """Records written in several chunks and sessions read back in order."""
+    path = str(tmp_path / 'history.bin')
+    history = Calculations()
+    for i in range(10):
+        history.record('add' if i % 2 else 'divide', Decimal(i), Decimal(2), Decimal(i) + 2)
+    history.save(path, chunk_size=3)
+    with HistoryWriter(path) as writer:
+        writer.append('multiply', 3, 4, None, 1.0)
+    with HistoryReader(path) as reader:
+        assert len(reader) == 11
+        assert len(list(reader.chunks())) == 5
+        rows = list(reader.rows())
+        assert rows[1][:4] == ('add', 1.0, 2.0, 3.0)
+        assert rows[-1].operation == 'multiply' and math.isnan(rows[-1].result)
+        assert reader.count('add') == 5 and reader.count('divide') == 5
+        assert [row.a for row in reader.rows('add')] == [1.0, 3.0, 5.0, 7.0, 9.0]
+
+def test_csv_export(tmp_path):
+    """CSV export streams a header and one line per row."""
+    path = str(tmp_path / 'history.bin')
+    with HistoryWriter(path) as writer:
+        writer.append('subtract', 5, 3, 2, 100.0)
+    output = io.StringIO()
+    with HistoryReader(path) as reader:
+        reader.to_csv(output)
+    assert output.getvalue().splitlines() == ['operation,a,b,result,timestamp', 'subtract,5.0,3.0,2.0,100.0']
+
+def test_rejects_other_files(tmp_path):
+    """Files without the history header are refused."""
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a history file at all')
+    with pytest.raises(ValueError):
+        HistoryReader(str(path))
+
+def test_other_operations_keep_their_names(tmp_path):
+    """Operations beyond the arithmetic four are named in the file, across appends."""
+    path = str(tmp_path / 'history.bin')
+    with HistoryWriter(path) as writer:
+        writer.append('sum', 1, 2, 3, 1.0)
+        writer.append('mean', 1, 2, 1.5, 2.0)
+    with HistoryWriter(path) as writer:
+        writer.append('sum', 4, 5, 9, 3.0)
+        writer.append('power', 2, 3, 8, 4.0)
+    with HistoryReader(path) as reader:
+        assert [row.operation for row in reader.rows()] == ['sum', 'mean', 'sum', 'power']
+        assert reader.count('sum') == 2 and reader.count('max') == 0
+        assert [row.a for row in reader.rows('sum')] == [1.0, 4.0]
+        assert list(reader.rows('max')) == []
+
+def test_truncated_and_foreign_files_are_refused(tmp_path):
+    """A cut-off chunk fails when read, and the writer never appends to a foreign file."""
+    path = tmp_path / 'history.bin'
+    with HistoryWriter(str(path)) as writer:
+        writer.append('add', 1, 2, 3, 1.0)
+    path.write_bytes(path.read_bytes()[:-8])
+    with pytest.raises(ValueError, match="Truncated"):
+        HistoryReader(str(path))
+    other = tmp_path / 'other.bin'
+    other.write_bytes(b'not a history file at all')
+    with pytest.raises(ValueError):
+        HistoryWriter(str(other))
+    assert other.read_bytes() == b'not a history file at all'
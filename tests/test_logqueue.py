@@ -0,0 +1,47 @@
+"""Tests for the queue-based logging pipeline."""
+import logging
+
+import pytest
+
+from app.logqueue import enable_queue_logging
+
+@pytest.fixture
+def logger(tmp_path):
+    """A private logger writing to a file, isolated from the root logger."""
+    test_logger = logging.getLogger('test_logqueue')
+    test_logger.propagate = False
+    test_logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(tmp_path / 'test.log')
+    handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+    test_logger.addHandler(handler)
+    yield test_logger, tmp_path / 'test.log'
+    for existing in test_logger.handlers[:]:
+        test_logger.removeHandler(existing)
+        existing.close()
+
+def test_records_are_written_after_stop(logger):
+    """Every record reaches the file once the queue is drained on stop()."""
+    test_logger, path = logger
+    queue_logging = enable_queue_logging(maxsize=1000, policy='block', logger=test_logger)
+    for i in range(500):
+        test_logger.info("record %d", i)
+    queue_logging.stop()
+    lines = path.read_text().splitlines()
+    assert len(lines) == 500
+    assert lines[0] == "INFO record 0" and lines[-1] == "INFO record 499"
+    assert isinstance(test_logger.handlers[0], logging.FileHandler)
+
+def test_drop_policy_never_blocks(logger):
+    """With a tiny queue and the drop policy, overflow is counted instead of waited on."""
+    test_logger, _ = logger
+    queue_logging = enable_queue_logging(maxsize=1, policy='drop', logger=test_logger)
+    queue_logging.listener.stop()  # nothing consumes the queue, so it fills immediately
+    for i in range(10):
+        test_logger.info("record %d", i)
+    assert queue_logging.dropped == 9
+    queue_logging.stop()
+
+def test_unknown_policy_is_rejected():
+    """Only the drop and block policies exist."""
+    with pytest.raises(ValueError):
+        enable_queue_logging(policy='spill')
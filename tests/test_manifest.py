@@ -0,0 +1,77 @@
+"""Tests for the cached plugin manifest and lazily imported plugin commands."""
+import json
+import os
+import sys
+
+from app import App
+from app.commands.lazy import LazyCommand
+from app.manifest import load_manifest, load_registry
+
+PLUGIN_SOURCE = '''from app.commands import Command
+
+class EchoCommand(Command):
+    def execute(self, value):
+        return value
+'''
+
+def make_plugin(root, name, source=PLUGIN_SOURCE):
+    """Create a plugin package under root and return its directory."""
+    package = root / name
+    package.mkdir()
+    (package / '__init__.py').write_text(source)
+    return package
+
+def test_manifest_maps_command_to_class_without_import(tmp_path):
+    """The manifest is read from source, so the plugin module is not imported."""
+    make_plugin(tmp_path, 'echo')
+    manifest = load_manifest(str(tmp_path), 'fakeplugins', str(tmp_path / 'manifest.json'))
+    assert manifest == {'echo': 'fakeplugins.echo:EchoCommand'}
+    assert 'fakeplugins.echo' not in sys.modules
+
+def test_manifest_cache_is_invalidated_by_changes(tmp_path):
+    """A new plugin changes the fingerprint and forces a rebuild."""
+    cache_path = tmp_path / 'cache' / 'manifest.json'
+    plugins = tmp_path / 'plugins'
+    plugins.mkdir()
+    make_plugin(plugins, 'echo')
+    load_manifest(str(plugins), 'fakeplugins', str(cache_path))
+    assert json.loads(cache_path.read_text())['entries'] == {'echo': 'fakeplugins.echo:EchoCommand'}
+    make_plugin(plugins, 'shout')
+    manifest = load_manifest(str(plugins), 'fakeplugins', str(cache_path))
+    assert set(manifest) == {'echo', 'shout'}
+
+def test_lazy_command_imports_on_first_execute(tmp_path, monkeypatch):
+    """LazyCommand defers the import until execute() is called."""
+    make_plugin(tmp_path, 'lazyecho')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    command = LazyCommand('lazyecho:EchoCommand')
+    assert 'lazyecho' not in sys.modules
+    assert command.execute(42) == 42
+    assert 'lazyecho' in sys.modules
+
+def test_app_load_plugins_registers_lazy_commands(tmp_path, monkeypatch):
+    """App.load_plugins registers every plugin package from the manifest."""
+    monkeypatch.setenv('PLUGIN_MANIFEST', os.path.join(str(tmp_path), 'manifest.json'))
+    app = App()
+    app.load_plugins()
+    assert isinstance(app.command_handler.commands['greet'], LazyCommand)
+
+def test_registry_declares_each_command_once(tmp_path):
+    """A plugin package cannot shadow a declared entry point."""
+    make_plugin(tmp_path, 'echo')
+    make_plugin(tmp_path, 'add')
+    registry = load_registry(str(tmp_path), 'fakeplugins', {'add': 'app.plugins.add_command:AddCommand'},
+                             str(tmp_path / 'manifest.json'))
+    assert registry == {'add': 'app.plugins.add_command:AddCommand', 'echo': 'fakeplugins.echo:EchoCommand'}
+
+def test_app_registers_declared_commands(tmp_path, monkeypatch, capsys):
+    """Declared commands resolve to the one canonical class, which app.commands re-exports."""
+    from app.commands import AddCommand
+    from app.plugins.add_command import AddCommand as PluginAddCommand
+    monkeypatch.setenv('PLUGIN_MANIFEST', os.path.join(str(tmp_path), 'manifest.json'))
+    app = App()
+    app.load_plugins()
+    assert AddCommand is PluginAddCommand
+    assert type(app.command_handler.commands['add'].resolve()) is AddCommand
+    app.command_handler.execute_command('menu')
+    assert " - add" in capsys.readouterr().out
@@ -0,0 +1,58 @@
+"""Tests for per-command dispatch instrumentation."""
+from decimal import Decimal
+
+import pytest
+
+from app.commands import CommandHandler
+from app.commands.metrics import CommandMetrics, metrics
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+from app.plugins.metrics import MetricsCommand
+
+@pytest.fixture
+def handler():
+    """A handler with metrics enabled for the duration of the test."""
+    command_handler = CommandHandler()
+    command_handler.register_command('add', AddCommand())
+    command_handler.register_command('divide', DivideCommand())
+    metrics.reset()
+    metrics.enable(slow_threshold=0)
+    yield command_handler
+    metrics.disable()
+    metrics.reset()
+
+def test_dispatch_counts_calls_and_errors(handler):
+    """Each dispatch is counted per command, including failures."""
+    handler.dispatch('add', Decimal(1), Decimal(2))
+    handler.dispatch('add', Decimal(1), Decimal(2))
+    with pytest.raises(ValueError):
+        handler.dispatch('divide', Decimal(1), Decimal(0))
+    commands = metrics.snapshot()['commands']
+    assert (commands['add']['calls'], commands['add']['errors']) == (2, 0)
+    assert (commands['divide']['calls'], commands['divide']['errors']) == (1, 1)
+    assert sum(commands['add']['buckets'].values()) == 2
+    assert metrics.snapshot()['slow_calls'][-1][1] == 'divide'
+
+def test_disabled_metrics_record_nothing():
+    """Nothing is recorded while metrics are off."""
+    metrics.reset()
+    command_handler = CommandHandler()
+    command_handler.register_command('add', AddCommand())
+    command_handler.dispatch('add', Decimal(1), Decimal(2))
+    assert metrics.snapshot()['commands'] == {}
+
+def test_render_prometheus():
+    """The text dump follows the Prometheus exposition format."""
+    local = CommandMetrics()
+    local.observe('add', 0.0002, False)
+    text = local.render_prometheus()
+    assert 'command_calls_total{command="add"} 1' in text
+    assert 'command_latency_seconds_bucket{command="add",le="0.0001"} 0' in text
+    assert 'command_latency_seconds_bucket{command="add",le="0.0005"} 1' in text
+    assert 'command_latency_seconds_bucket{command="add",le="+Inf"} 1' in text
+
+def test_metrics_repl_command(handler, capsys):
+    """The metrics command prints the Prometheus dump."""
+    handler.dispatch('add', Decimal(1), Decimal(2))
+    MetricsCommand().execute()
+    assert 'command_calls_total{command="add"} 1' in capsys.readouterr().out
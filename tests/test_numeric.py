@@ -0,0 +1,68 @@
+"""Tests for per-command numeric modes."""
+from decimal import Decimal
+
+import pytest
+
+from app import App
+from app.commands import CommandHandler
+from app.commands.lazy import LazyCommand
+from app.numeric import get_mode
+from app.plugins.divide_command import DivideCommand
+
+def test_decimal_mode_precision_and_rounding():
+    """Decimal modes use their own precision and rounding."""
+    assert get_mode('decimal:6').divide(Decimal(1), Decimal(3)) == Decimal('0.333333')
+    assert get_mode('decimal:2:round_up').divide(Decimal(1), Decimal(3)) == Decimal('0.34')
+    assert get_mode('decimal:6') is get_mode('decimal:6')
+
+def test_fixed_point_rounds_half_even():
+    """Fixed-point results are rounded half to even at the configured scale."""
+    mode = get_mode('fixed:2')
+    assert mode.divide(Decimal(1), Decimal(8)) == Decimal('0.12')
+    assert mode.divide(Decimal(3), Decimal(8)) == Decimal('0.38')
+    assert mode.multiply(Decimal('1.5'), Decimal('1.5')) == Decimal('2.25')
+    assert mode.batch('add', [1, 2], ['0.5', '0.25']).values == [Decimal('1.50'), Decimal('2.25')]
+
+def test_float_mode_returns_floats():
+    """Float mode converts operands and returns floats."""
+    assert get_mode('float').divide(Decimal(1), Decimal(4)) == 0.25
+    assert isinstance(get_mode('float').add(Decimal(1), Decimal(2)), float)
+
+def test_zero_divisor_raises_in_every_mode():
+    """Every mode keeps the plugins' division by zero error."""
+    for spec in ('decimal:6', 'fixed:4', 'float'):
+        with pytest.raises(ValueError, match="Cannot divide by zero"):
+            get_mode(spec).divide(Decimal(1), Decimal(0))
+        assert get_mode(spec).batch('divide', [1, 1], [0, 2]).errors == {0: "Cannot divide by zero"}
+
+def test_command_and_batch_modes():
+    """A command can be configured with a mode, and a batch can override it."""
+    handler = CommandHandler()
+    handler.register_command('divide', DivideCommand())
+    result = handler.execute_batch('divide', [1, 2], [3, 3], numeric='decimal:3')
+    assert result.values == [Decimal('0.333'), Decimal('0.667')]
+    handler.commands['divide'].configure(numeric=get_mode('decimal:4'))
+    assert handler.commands['divide'].execute(Decimal(2), Decimal(3)) == Decimal('0.6667')
+
+def test_lazy_command_applies_configuration_on_resolve():
+    """Options set before a lazy command loads are applied when it does."""
+    command = LazyCommand('app.plugins.divide_command:DivideCommand')
+    command.configure(numeric=get_mode('decimal:2'))
+    assert command.execute(Decimal(1), Decimal(3)) == Decimal('0.33')
+
+def test_changing_the_mode_clears_cached_results(monkeypatch):
+    """Results cached under one numeric mode are not served after NUMERIC_MODE changes."""
+    monkeypatch.setenv('RESULT_CACHE_SIZE', '16')
+    monkeypatch.setenv('NUMERIC_MODE', 'decimal:3')
+    app = App()
+    app.load_plugins()
+    assert app.command_handler.dispatch('divide', Decimal(1), Decimal(3)) == Decimal('0.333')
+    monkeypatch.setenv('NUMERIC_MODE', 'fixed:2')
+    app.reload_settings()
+    assert app.command_handler.dispatch('divide', Decimal(1), Decimal(3)) == Decimal('0.33')
+
+@pytest.mark.parametrize('spec', ['decimal:x', 'decimal:6:round_sideways', 'fixed:y', 'float:3', 'binary'])
+def test_invalid_modes_are_rejected(spec):
+    """Unknown mode specs raise ValueError."""
+    with pytest.raises(ValueError, match="Invalid numeric mode"):
+        get_mode(spec)
@@ -0,0 +1,35 @@
+"""Tests for the non-interactive streaming command runner."""
+import io
+from decimal import Decimal
+
+from app import pipeline
+from app.commands import CommandHandler
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+
+HANDLER = CommandHandler()
+HANDLER.register_command('add', AddCommand())
+HANDLER.register_command('divide', DivideCommand())
+
+def test_run_reports_bad_lines_and_continues(tmp_path):
+    """Unknown commands, bad operands and command errors become error lines."""
+    source = tmp_path / 'commands.txt'
+    source.write_text("add 2 3\n\n# comment\nfoo 1 2\nadd x 2\ndivide 4 0\ndivide 9 3\n")
+    output = io.StringIO()
+    stats = pipeline.run(str(source), HANDLER, output)
+    assert output.getvalue().splitlines() == [
+        "5",
+        "Error (line 4): No such command: foo",
+        "Error (line 5): Invalid number input: x is not a valid number.",
+        "Error (line 6): Cannot divide by zero",
+        "3",
+    ]
+    assert (stats['lines'], stats['ok'], stats['errors']) == (5, 2, 3)
+    assert stats['lines_per_second'] > 0
+
+def test_pipeline_is_lazy():
+    """The stages are generators, so nothing is read ahead of what is consumed."""
+    lines = iter(["add 1 1", "add 2 2"])
+    outcomes = pipeline.dispatch(pipeline.parse_lines(enumerate(lines, 1)), HANDLER)
+    assert next(outcomes).value == Decimal(2)
+    assert next(lines) == "add 2 2"
@@ -0,0 +1,45 @@
+"""Tests for the CommandHandler worker pool."""
+from decimal import Decimal
+from multiprocessing import Queue
+
+import pytest
+
+from app.commands import CommandHandler, CommandError
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+
+@pytest.fixture(params=['thread', 'process'])
+def handler(request):
+    """A handler with add/divide registered and a two-worker pool."""
+    command_handler = CommandHandler()
+    command_handler.register_command('add', AddCommand())
+    command_handler.register_command('divide', DivideCommand())
+    command_handler.configure_pool(max_workers=2, kind=request.param, chunksize=3)
+    yield command_handler
+    command_handler.shutdown_pool()
+
+def test_map_command_keeps_order(handler):
+    """Results stream back in input order across chunks and workers."""
+    rows = [(Decimal(i), Decimal(1)) for i in range(20)]
+    results = list(handler.map_command('add', rows))
+    assert [result.index for result in results] == list(range(20))
+    assert [result.value for result in results] == [Decimal(i + 1) for i in range(20)]
+
+def test_worker_errors_are_structured(handler):
+    """A zero divisor fails only its own row and is reported as a CommandError."""
+    rows = [(Decimal(4), Decimal(2)), (Decimal(1), Decimal(0)), (Decimal(9), Decimal(3))]
+    results = list(handler.map_command('divide', rows))
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].error == CommandError('ValueError', 'Cannot divide by zero')
+    assert results[2].value == Decimal(3)
+
+def test_submit_returns_future(handler):
+    """submit() resolves to a single CommandResult."""
+    assert handler.submit('add', Decimal(2), Decimal(3)).result().value == Decimal(5)
+
+def test_execute_multiprocessing_puts_exception_on_queue():
+    """execute_multiprocessing reports errors through the queue instead of raising."""
+    queue = Queue()
+    DivideCommand().execute_multiprocessing(Decimal(1), Decimal(0), queue)
+    result = queue.get(timeout=5)
+    assert isinstance(result, ValueError) and str(result) == "Cannot divide by zero"
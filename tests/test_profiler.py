@@ -0,0 +1,85 @@
+"""Tests for the sampling and deterministic command profiler."""
+import time
+
+import pytest
+
+from app import App
+from app.commands import Command, CommandHandler
+from app.commands.dispatch import DispatchTable
+from app.commands.profiler import profiler
+from app.plugins.add_command import AddCommand
+from app.plugins.profile import ProfileCommand
+
+class SpinCommand(Command):
+    def execute(self, seconds):
+        deadline = time.perf_counter() + float(seconds)
+        while time.perf_counter() < deadline:
+            pass
+        return seconds
+
+@pytest.fixture
+def handler():
+    """A handler with a fast and a slow command; the profiler is reset and switched off afterwards."""
+    command_handler = CommandHandler()
+    command_handler.register_command('add', AddCommand())
+    command_handler.register_command('spin', SpinCommand())
+    profiler.reset()
+    yield command_handler
+    profiler.disable()
+    profiler.reset()
+
+def test_deterministic_mode_records_scoped_commands(handler):
+    """Only the chosen commands are traced, with stacks rooted at the command."""
+    profiler.enable('deterministic', ['add'])
+    table = DispatchTable(handler)
+    assert table.execute('add', ['2', '3']) == 5
+    handler.dispatch('spin', 0.001)
+    stacks = profiler.stacks()
+    assert stacks and all(stack[0] == 'command:add' for stack in stacks)
+    assert any(stack[-1] == 'app.plugins.add_command.execute' for stack in stacks)
+    total, functions = profiler.summary()['add']
+    assert total > 0 and functions
+
+def test_sampling_mode_catches_slow_commands(handler, tmp_path):
+    """The timer thread samples running commands; idle time is not recorded."""
+    profiler.enable('sampling', interval=0.001)
+    handler.dispatch('spin', 0.2)
+    time.sleep(0.05)
+    profiler.disable()
+    assert profiler.samples > 0
+    path = tmp_path / 'profile.folded'
+    summary = profiler.dump(str(path))
+    lines = path.read_text().splitlines()
+    assert lines and all(line.startswith('command:spin;') for line in lines)
+    assert any('test_profiler.execute' in line for line in lines)
+    assert summary.startswith('spin: ')
+
+def test_profile_command_and_setting(handler, tmp_path, monkeypatch, capsys):
+    """The REPL command and the PROFILE setting switch the shared profiler."""
+    command = ProfileCommand()
+    command.execute('on', 'deterministic', 'add')
+    assert profiler.enabled and profiler.mode == 'deterministic' and profiler.commands == {'add'}
+    handler.dispatch('add', 1, 2)
+    command.execute('dump', str(tmp_path / 'out.folded'))
+    assert "Collapsed stacks written" in capsys.readouterr().out
+    assert (tmp_path / 'out.folded').read_text().startswith('command:add')
+    command.execute('off')
+    assert not profiler.enabled
+    monkeypatch.setenv('PROFILE', 'on')
+    monkeypatch.setenv('PROFILE_COMMANDS', 'spin, add')
+    app = App()
+    assert app.settings.profile == 'sampling' and app.settings.profile_commands == ('spin', 'add')
+    assert profiler.enabled and profiler.mode == 'sampling'
+    monkeypatch.setenv('PROFILE', 'off')
+    app.reload_settings()
+    assert not profiler.enabled
+
+def test_sampling_keeps_the_dispatch_table_fast_path(handler, tmp_path, capsys):
+    """Sampled dispatch-table calls are attributed to their command, and a bad dump path is reported."""
+    profiler.enable('sampling', interval=0.001)
+    DispatchTable(handler).execute('spin', ['0.2'])
+    profiler.disable()
+    lines = profiler.collapsed().splitlines()
+    assert lines and all(line.startswith('command:spin;') and 'test_profiler.execute' in line for line in lines)
+    ProfileCommand().execute('dump', str(tmp_path / 'missing' / 'out.folded'))
+    assert "Cannot write the profile" in capsys.readouterr().out
@@ -0,0 +1,85 @@
+"""Tests for hot plugin reload."""
+import sys
+
+import pytest
+
+from app.commands import CommandHandler
+from app.reloader import PluginWatcher, diff_fingerprints, reload_commands
+
+PLUGIN = """from app.commands import Command
+
+class EchoCommand(Command):
+    def execute(self, *args):
+        return {!r}
+"""
+
+@pytest.fixture(name='plugins')
+def fixture_plugins(tmp_path, monkeypatch):
+    """A throwaway plugin package, importable as hotplugins."""
+    root = tmp_path / 'hotplugins'
+    root.mkdir()
+    (root / '__init__.py').write_text('')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    def write(name, text):
+        (root / name).mkdir(exist_ok=True)
+        (root / name / '__init__.py').write_text(text)
+    write.path = str(root)
+    yield write
+    for name in [name for name in sys.modules if name.split('.')[0] == 'hotplugins']:
+        del sys.modules[name]
+
+def test_diff_fingerprints():
+    """Changed, added and removed packages are reported by package name."""
+    old = {'a/__init__.py': [1, 10], 'b/__init__.py': [1, 10], 'c/__init__.py': [1, 10]}
+    new = {'a/__init__.py': [1, 10], 'b/__init__.py': [2, 11], 'd/__init__.py': [1, 10]}
+    assert diff_fingerprints(old, new) == ({'b', 'd'}, {'c'})
+
+def test_poll_reloads_changed_plugin_and_swaps_atomically(plugins):
+    """A changed plugin is re-imported and swapped in; holders of the old command are unaffected."""
+    plugins('echo', PLUGIN.format('v1'))
+    handler = CommandHandler()
+    handler.update_commands(reload_commands(plugins.path, 'hotplugins', ['echo']))
+    in_flight = handler.commands['echo']
+    table = handler.commands
+    changes = []
+    def on_change(changed, removed):
+        changes.append((changed, removed))
+        handler.update_commands(reload_commands(plugins.path, 'hotplugins', changed), removed)
+    watcher = PluginWatcher(plugins.path, on_change)
+    assert not watcher.poll()
+    plugins('echo', PLUGIN.format('version 2'))
+    plugins('extra', PLUGIN.format('extra'))
+    assert watcher.poll()
+    assert changes == [({'echo', 'extra'}, set())]
+    assert handler.dispatch('echo') == 'version 2'
+    assert handler.dispatch('extra') == 'extra'
+    assert in_flight.execute() == 'v1' and table['echo'] is in_flight
+    assert watcher.stats()['polls'] == 2
+
+def test_broken_plugin_keeps_loaded_version(plugins):
+    """A plugin that fails to import is left out, so the old command stays registered."""
+    plugins('echo', PLUGIN.format('v1'))
+    handler = CommandHandler()
+    handler.update_commands(reload_commands(plugins.path, 'hotplugins', ['echo']))
+    plugins('echo', 'raise RuntimeError("half-written")\n' + PLUGIN.format('v2'))
+    handler.update_commands(reload_commands(plugins.path, 'hotplugins', ['echo']))
+    assert handler.dispatch('echo') == 'v1'
+
+def test_slow_polls_stretch_the_interval(plugins):
+    """The effective interval keeps polling within its overhead budget."""
+    watcher = PluginWatcher(plugins.path, lambda changed, removed: None, interval=0.5, max_overhead=0.01)
+    watcher.last_poll_seconds = 0.02
+    assert watcher.effective_interval == pytest.approx(2.0)
+
+def test_entry_point_modules_are_watched_and_win_over_packages(plugins, tmp_path):
+    """Declared modules are fingerprinted too, and a colliding package never replaces them."""
+    entry_points = {'echo': 'hotplugins.echo_command:EchoCommand'}
+    module = tmp_path / 'hotplugins' / 'echo_command.py'
+    module.write_text(PLUGIN.format('declared v1'))
+    plugins('echo', PLUGIN.format('package'))
+    changes = []
+    watcher = PluginWatcher(plugins.path, lambda changed, removed: changes.append(changed), entry_points=entry_points)
+    module.write_text(PLUGIN.format('declared version 2'))
+    assert watcher.poll() and changes == [{'echo'}]
+    commands = reload_commands(plugins.path, 'hotplugins', changes[0], entry_points)
+    assert commands['echo'].execute() == 'declared version 2'
@@ -0,0 +1,66 @@
+"""Tests for the calculation server and client, run on localhost."""
+import threading
+from decimal import Decimal
+
+import pytest
+
+from app.client import CalculationClient, RemoteCommandError
+from app.commands import CommandHandler
+from app.server import create_server, parse_address
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+
+@pytest.fixture(params=['tcp', 'unix'])
+def address(request, tmp_path):
+    """Run a server on an ephemeral TCP port or a Unix socket and yield its address."""
+    handler = CommandHandler()
+    handler.register_command('add', AddCommand())
+    handler.register_command('divide', DivideCommand())
+    bind = ('127.0.0.1', 0) if request.param == 'tcp' else str(tmp_path / 'calc.sock')
+    server = create_server(handler, bind)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+def test_call_reuses_connection(address):
+    """Several calls share one persistent connection."""
+    with CalculationClient(address) as client:
+        assert client.call('add', 2, 3) == Decimal(5)
+        assert client.call('divide', 9, 3) == Decimal(3)
+        with pytest.raises(RemoteCommandError, match="Cannot divide by zero"):
+            client.call('divide', 1, 0)
+        assert client.call('add', 1, 1) == Decimal(2)
+
+def test_pipelined_requests_keep_order(address):
+    """Pipelined requests get one response each, in request order."""
+    with CalculationClient(address) as client:
+        results = client.pipeline([('add', i, 1) for i in range(50)] + [('nope',), ('add', 'x', 1)])
+    assert results[:50] == [Decimal(i + 1) for i in range(50)]
+    assert str(results[50]) == "No such command: nope"
+    assert isinstance(results[51], RemoteCommandError)
+
+def test_parse_address():
+    """host:port selects TCP, anything else is a Unix socket path."""
+    assert parse_address('localhost:9000') == ('localhost', 9000)
+    assert parse_address(':9000') == ('127.0.0.1', 9000)
+    assert parse_address('/tmp/calc.sock') == '/tmp/calc.sock'
+
+def test_every_line_gets_a_response(address):
+    """Blank, comment and undecodable lines are answered, so pipelined clients stay in step."""
+    with CalculationClient(address) as client:
+        results = client.pipeline([('',), ('#', 'note'), ('add', 1, 2)])
+        client._socket.sendall(b'add \xff 1\nadd 2 2\n')  # pylint: disable=protected-access
+        responses = [client._reader.readline() for _ in range(2)]  # pylint: disable=protected-access
+    assert [str(result) for result in results[:2]] == ["Empty request", "Empty request"]
+    assert results[2] == Decimal(3)
+    assert responses == ['ERR Request is not valid UTF-8\n', 'OK 4\n']
+
+def test_unix_address_never_replaces_a_regular_file(tmp_path):
+    """Only a stale socket at the path is unlinked; any other file is left alone."""
+    path = tmp_path / 'calc.sock'
+    path.write_text('keep me')
+    with pytest.raises(FileExistsError):
+        create_server(CommandHandler(), str(path))
+    assert path.read_text() == 'keep me'
@@ -0,0 +1,50 @@
+"""Tests for typed settings, settings snapshots and reloading."""
+import os
+import pickle
+
+import pytest
+
+from app import App
+from app.settings import Settings, load_settings
+
+def test_only_known_keys_are_parsed_and_typed():
+    """Known keys are converted to their types; other keys are ignored."""
+    settings = Settings.from_mapping({'ENVIRONMENT': 'production', 'HISTORY_CAPACITY': '50',
+                                      'METRICS_ENABLED': 'yes', 'RESULT_CACHE_SIZE': '',
+                                      'NUMERIC_MODE_DIVIDE': 'decimal:6', 'API_KEY': 'secret'})
+    assert settings.environment == 'PRODUCTION'
+    assert settings.history_capacity == 50
+    assert settings.metrics_enabled is True
+    assert settings.result_cache_size == 0
+    assert settings.get('NUMERIC_MODE_DIVIDE') == 'decimal:6'
+    assert settings.get('API_KEY', 'unset') == 'unset'
+    assert pickle.loads(pickle.dumps(settings)) == settings
+
+def test_invalid_value_names_the_key():
+    """A value that does not parse raises ValueError naming the setting."""
+    with pytest.raises(ValueError, match="HISTORY_CAPACITY"):
+        Settings.from_mapping({'HISTORY_CAPACITY': 'lots'})
+
+def test_snapshot_round_trip_and_staleness(tmp_path):
+    """A snapshot loads back unchanged and is ignored once .env changes."""
+    dotenv = tmp_path / '.env'
+    dotenv.write_text('HISTORY_CAPACITY=7\n')
+    snapshot = str(tmp_path / 'settings.json')
+    settings = load_settings(snapshot, str(dotenv))._replace(numeric_modes=(('add', 'float'),))
+    settings.save(snapshot, str(dotenv))
+    assert load_settings(snapshot, str(dotenv)) == settings
+    dotenv.write_text('HISTORY_CAPACITY=80\n')
+    assert load_settings(snapshot, str(dotenv), refresh=True).history_capacity == 80
+
+def test_reload_applies_changed_settings(monkeypatch):
+    """reload_settings re-reads the environment and reconfigures the app."""
+    app = App()
+    assert app.get_environment_variable('ENVIRONMENT') == app.settings.environment
+    monkeypatch.setitem(os.environ, 'RESULT_CACHE_SIZE', '16')
+    monkeypatch.setitem(os.environ, 'POOL_KIND', 'thread')
+    app.reload_settings()
+    assert app.command_handler.cache is not None
+    assert app.command_handler.pool_options['kind'] == 'thread'
+    monkeypatch.delitem(os.environ, 'RESULT_CACHE_SIZE')
+    app.reload_settings()
+    assert app.command_handler.cache is None
@@ -0,0 +1,93 @@
+"""Tests for frozen startup images and the startup profile."""
+import logging
+import logging.handlers
+import pickle
+
+from app import App
+from app.settings import Settings
+from app.startup import StartupProfile, freeze, load_image, resolve_logging_config
+
+LOGGING_CONF = '''[loggers]
+keys=root
+
+[handlers]
+keys=fileHandler
+
+[formatters]
+keys=simple
+
+[logger_root]
+level=WARNING
+handlers=fileHandler
+
+[handler_fileHandler]
+class=handlers.RotatingFileHandler
+level=INFO
+formatter=simple
+args=(%r, 'a', 1024, 2)
+
+[formatter_simple]
+format=%%(levelname)s %%(message)s
+'''
+
+def make_sources(tmp_path):
+    """Create a plugins directory and a logging.conf under tmp_path; return their paths."""
+    plugins = tmp_path / 'plugins'
+    plugins.mkdir()
+    conf = tmp_path / 'logging.conf'
+    conf.write_text(LOGGING_CONF % str(tmp_path / 'app.log'))
+    return str(plugins), str(conf)
+
+def test_image_round_trip_and_staleness(tmp_path):
+    """An image loads back unchanged and is ignored once one of its sources changes."""
+    plugins, conf = make_sources(tmp_path)
+    path = str(tmp_path / 'startup.image')
+    image = freeze(path, Settings(history_capacity=7), {'add': 'app.plugins.add_command:AddCommand'},
+                   plugins, conf, str(tmp_path / '.env'))
+    assert load_image(path, plugins, conf, str(tmp_path / '.env')) == image
+    (tmp_path / 'plugins' / 'echo').mkdir()
+    (tmp_path / 'plugins' / 'echo' / '__init__.py').write_text('')
+    assert load_image(path, plugins, conf, str(tmp_path / '.env')) is None
+
+def test_image_from_another_version_is_ignored(tmp_path):
+    """The header is checked before the image itself is unpickled."""
+    plugins, conf = make_sources(tmp_path)
+    path = tmp_path / 'startup.image'
+    with open(path, 'wb') as output:
+        pickle.dump({'version': 0}, output)
+        pickle.dump('not an image', output)
+    assert load_image(str(path), plugins, conf) is None
+    path.write_bytes(b'garbage')
+    assert load_image(str(path), plugins, conf) is None
+
+def test_resolved_logging_config_matches_file_config(tmp_path):
+    """The dictConfig translation builds the same handlers, levels and formats as fileConfig."""
+    _, conf = make_sources(tmp_path)
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    try:
+        logging.config.dictConfig(resolve_logging_config(conf))
+        handler, = root.handlers
+        assert isinstance(handler, logging.handlers.RotatingFileHandler)
+        assert (handler.maxBytes, handler.backupCount, handler.level) == (1024, 2, logging.INFO)
+        assert handler.formatter._fmt == '%(levelname)s %(message)s'
+        assert root.level == logging.WARNING
+        handler.close()
+    finally:
+        root.handlers[:], root.level = saved
+    assert resolve_logging_config(str(tmp_path / 'missing.conf')) is None
+
+def test_app_starts_from_image(tmp_path, monkeypatch):
+    """With STARTUP_IMAGE set, App takes its settings and command table from the image."""
+    path = str(tmp_path / 'startup.image')
+    App().freeze(path)
+    monkeypatch.setenv('STARTUP_IMAGE', path)
+    monkeypatch.setenv('HISTORY_CAPACITY', '3')
+    profile = StartupProfile()
+    app = App(profile)
+    app.load_plugins()
+    assert app.image is not None and app.settings == app.image.settings
+    assert set(app.command_handler.commands) == set(app.image.registry)
+    assert [phase for phase, _ in profile.phases][-1] == 'load plugins'
+    assert app.reload_settings().history_capacity == 3
+    assert app.image is None